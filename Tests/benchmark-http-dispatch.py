@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark of real HTTP dispatch against a local stand-in bidder.
+
+Usage: python benchmark-http-dispatch.py [requests] [server_delay_ms] [concurrency ...]
+"""
+
+import sys
+import os
+import time
+import json
+import socket
+import asyncio
+import threading
+from datetime import datetime
+
+# Add the backend directory to the path so we can import the dispatch module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from aiohttp import web
+
+def start_stand_in_server(delay_ms: float):
+    """Start a local bidder answering every POST with a bid after delay_ms"""
+    async def handle(request):
+        await request.read()
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        if request.method == 'POST':
+            return web.json_response({"id": "1", "cur": "USD", "seatbid": [{"bid": [{"id": "b1", "price": 1.25}]}]})
+        return web.Response(text="ok")
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port, backlog=1024).start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/bid"
+
+def run_benchmark(url: str, count: int, concurrency: int):
+    from app.api.dispatch import HttpDispatcher
+
+    batch = [{
+        "target_url": url,
+        "timestamp": datetime.utcnow().isoformat(),
+        "referrer": "https://example.com/page",
+        "rtb_device": {"ua": "Mozilla/5.0 (Linux; Android 14; SM-S921B)", "ip": "3.1.2.3"},
+        "rtb_data": {"id": str(i), "imp": [{"id": "1", "banner": {"w": 300, "h": 250}}], "at": 2}
+    } for i in range(count)]
+    dispatcher = HttpDispatcher(concurrency=concurrency)
+    try:
+        dispatcher.dispatch_batch(batch[:min(count, concurrency)])  # warm up the connection pool
+        start = time.perf_counter()
+        dispatcher.dispatch_batch(batch)
+        elapsed = time.perf_counter() - start
+    finally:
+        dispatcher.close()
+    latencies = sorted(record['response_time'] for record in batch)
+    failures = sum(1 for record in batch if not record['success'])
+    return {
+        "concurrency": concurrency,
+        "requests": count,
+        "requests_per_second": round(count / elapsed, 1),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "failures": failures
+    }
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    levels = [int(level) for level in sys.argv[3:]] or [1, 10, 50, 200]
+    url = start_stand_in_server(delay_ms)
+    print(f"🧪 Dispatching {count} bid requests to a stand-in bidder with {delay_ms}ms latency")
+    for concurrency in levels:
+        print(json.dumps(run_benchmark(url, count, concurrency)))
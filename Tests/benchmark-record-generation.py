@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of per-record generation and encoding cost: uncompiled vs. compiled record
+templates, and dicts vs. slotted TrafficRecords.
+
+The uncompiled path rebuilds the constant fields and walks the rtb_config defaults for
+every record, as generate_traffic_data did before templates.
+
+Usage: python benchmark-record-generation.py [records]
+"""
+
+import sys
+import os
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def make_config(traffic_module, profiles, UserProfile, CampaignAdids):
+    profile_ids = []
+    for i, brand in enumerate(("samsung", "apple", "google")):
+        profile = UserProfile(id=f"bench-profile-{i}", name=f"Profile {i}", description="Benchmark profile",
+                              demographics={"interests": ["sports", "music", "tech"],
+                                            "countries": ["United States", "Canada", "Germany"]},
+                              device_preferences={"device_brand": brand},
+                              referrers={"sports|Canada": ["https://chatgpt.com/c/1"]})
+        profiles[profile.id] = profile
+        profile_ids.append(profile.id)
+    config = traffic_module.TrafficConfig(
+        campaign_id="bench-records",
+        target_url="https://example.com",
+        requests_per_minute=1000,
+        duration_minutes=60,
+        geo_locations=["United States", "Canada"],
+        rtb_config={"device_brand": "samsung", "bidfloor": 0.5},
+        user_profile_ids=profile_ids,
+        profile_user_counts={pid: 1000 * (i + 1) for i, pid in enumerate(profile_ids)}
+    )
+    config.user_profiles = [profiles[pid].__dict__ for pid in profile_ids]
+    traffic_module.campaign_adids[config.campaign_id] = CampaignAdids(99, config.profile_user_counts)
+    return config
+
+def uncompiled_record(traffic_module, config, timestamp, rng):
+    traffic_data = {"id": str(int((timestamp - datetime(1970, 1, 1)).total_seconds() * 1000)),
+                    "timestamp": timestamp.isoformat(),
+                    "campaign_id": config.campaign_id,
+                    "target_url": config.target_url,
+                    "requests_per_minute": config.requests_per_minute,
+                    "duration_minutes": config.duration_minutes,
+                    "geo_locations": config.geo_locations,
+                    "rtb_config": config.rtb_config,
+                    "config": config.config,
+                    "user_profile_ids": config.user_profile_ids,
+                    "profile_user_counts": config.profile_user_counts,
+                    "total_profile_users": config.total_profile_users}
+    for required in ("id", "timestamp", "campaign_id", "target_url"):
+        if not traffic_data.get(required):
+            raise ValueError(f"Missing required field: {required}")
+    selected_profile = traffic_module.get_profile_sampler(config).sample(rng)
+    traffic_module.assign_profile_referrer(traffic_data, config, selected_profile, rng)
+    traffic_module.add_rtb_fields(traffic_data, traffic_module.generate_rtb_data(
+        config.rtb_config, config, profile_id=selected_profile.get("id"),
+        country=traffic_data["selected_country"], rng=rng))
+    return traffic_data
+
+def per_record(function, count):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / count * 1e6
+
+def main():
+    logging.disable(logging.INFO)
+    import app.api.traffic as traffic_module
+    from app.api.profiles import profiles, UserProfile
+    from app.api.adids import CampaignAdids
+    from app.api.record_template import get_record_template
+    from app.api.traffic_store import encode_record
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    config = make_config(traffic_module, profiles, UserProfile, CampaignAdids)
+    start = datetime(2025, 1, 1)
+    timestamps = [start + timedelta(milliseconds=60 * i) for i in range(count)]
+    template = get_record_template(config)
+    rng = random.Random(1)
+
+    results = [
+        ("uncompiled record", per_record(lambda: [uncompiled_record(traffic_module, config, t, rng) for t in timestamps], count)),
+        ("template fill", per_record(lambda: [template.fill("1", t.isoformat(), template.pick_profile(rng), rng) for t in timestamps], count)),
+        ("generate_traffic_data", per_record(lambda: [traffic_module.generate_traffic_data(config, t) for t in timestamps], count)),
+        ("generate_traffic_data, seeded", per_record(lambda: [traffic_module.generate_traffic_data(config, t, index=i) for i, t in enumerate(timestamps)], count)),
+        ("generate_traffic_batch", per_record(lambda: traffic_module.generate_traffic_batch(config, count, timestamps=timestamps), count)),
+        ("generate_traffic_batch, seeded", per_record(lambda: traffic_module.generate_traffic_batch(config, count, timestamps=timestamps, indices=list(range(count))), count)),
+        ("generate_traffic_batch, records", per_record(lambda: traffic_module.generate_traffic_batch(config, count, timestamps=timestamps, as_records=True), count)),
+    ]
+    dicts = traffic_module.generate_traffic_batch(config, count, timestamps=timestamps)
+    records = traffic_module.generate_traffic_batch(config, count, timestamps=timestamps, as_records=True)
+    results += [
+        ("encode dict", per_record(lambda: [encode_record(record) for record in dicts], count)),
+        ("encode TrafficRecord", per_record(lambda: [record.encode() for record in records], count)),
+    ]
+    print(f"Per-record cost over {count} records with RTB data:")
+    for name, micros in results:
+        print(f"  {name:32} {micros:8.2f} µs")
+    print(f"  template speedup                 {results[0][1] / results[1][1]:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script to verify derived ADID populations and the paged ADID endpoint
+"""
+
+import re
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+ADID_FORMAT = re.compile(r'^\d{8}-\d{4}-\d{4}-\d{4}$')
+
+def test_adid_population():
+    """Test that ADIDs are derived deterministically and paged by the API"""
+
+    print("🧪 Testing ADID Population...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.adids import CampaignAdids
+
+        print("✅ Successfully imported backend app")
+
+        adids = CampaignAdids(seed=1234, profile_user_counts={"p1": 5_000_000})
+        population = adids.population("p1")
+        if len(population) != 5_000_000 or not ADID_FORMAT.match(population.adid(4_999_999)):
+            print(f"❌ Unexpected population: {len(population)}, {population.adid(4_999_999)}")
+            return False
+        if population.adid(42) != CampaignAdids(seed=1234, profile_user_counts={"p1": 100}).population("p1").adid(42):
+            print("❌ ADIDs are not derived deterministically from the seed")
+            return False
+        page = population.page(0, 1000)
+        if len(set(page)) != 1000:
+            print("❌ ADIDs of a page are not unique")
+            return False
+        print("✅ 5M-user population derives unique, stable ADIDs on demand")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        try:
+            client = app.test_client()
+            profile = client.post('/api/profiles/', json={
+                "name": "ADID profile",
+                "description": "Profile for ADID test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "ADID campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 250},
+                "requests_per_minute": 60,
+                "duration_minutes": 1,
+                "config": {"fast_forward": True}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            client.post('/api/traffic/generate', json={"campaign_id": campaign_id})
+            start = time.time()
+            while campaign_id in traffic_module.active_threads and time.time() - start < 60:
+                time.sleep(0.1)
+
+            if campaign_id in traffic_module.campaign_adids:
+                print("❌ ADID population was not freed after generation")
+                return False
+            print("✅ ADID population freed when generation ended")
+
+            first = client.get(f'/api/traffic/campaigns/{campaign_id}/adids?limit=100').get_json()
+            last = client.get(f'/api/traffic/campaigns/{campaign_id}/adids?profile_id={profile["id"]}&offset=200&limit=100').get_json()
+            if (first['total'][profile['id']] != 250 or len(first['adids'][profile['id']]) != 100
+                    or first['next_offset'] != 100 or len(last['adids'][profile['id']]) != 50 or last['next_offset'] is not None):
+                print(f"❌ Unexpected pages: {first['total']}, {first['next_offset']}, {last['next_offset']}")
+                return False
+            print("✅ ADID endpoint pages through the population")
+
+            traffic = client.get(f'/api/traffic/generated/{campaign_id}').get_json()
+            all_adids = set(client.get(f'/api/traffic/campaigns/{campaign_id}/adids?limit=1000').get_json()['adids'][profile['id']])
+            used = {value['rtb_user']['id'] for value in traffic.values() if isinstance(value, dict) and 'rtb_user' in value}
+            if not used or not used <= all_adids:
+                print("❌ Generated requests use ADIDs outside the population")
+                return False
+            print(f"✅ {len(used)} ADIDs used by generated requests all belong to the population")
+
+            print("\n🎉 ADID population test passed!")
+            return True
+
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir)
+            print(f"🧹 Cleaned up temporary directory: {temp_dir}")
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_adid_population()
+    sys.exit(0 if success else 1)
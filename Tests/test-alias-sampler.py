@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the alias sampler used for weighted profile selection
+"""
+
+import sys
+import os
+import random
+from collections import Counter
+
+# Add the backend directory to the path so we can import the sampling module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_alias_sampler():
+    """Test that picks follow the weights and samplers are cached until weights change"""
+
+    print("🧪 Testing Alias Sampler...")
+
+    try:
+        from app.api.sampling import AliasSampler, get_sampler, discard_samplers
+
+        print("✅ Successfully imported sampling module")
+
+        weights = [1_000_000, 3_000_000, 0, 6_000_000]
+        sampler = AliasSampler(["a", "b", "c", "d"], weights)
+        if len(sampler) != 3:
+            print(f"❌ Zero-weight items should be dropped, table has {len(sampler)} items")
+            return False
+        print("✅ Table holds one entry per weighted item")
+
+        rng = random.Random(42)
+        counts = Counter(sampler.sample_many(100000, rng))
+        expected = {"a": 0.1, "b": 0.3, "d": 0.6}
+        for item, share in expected.items():
+            actual = counts[item] / 100000
+            if abs(actual - share) > 0.01:
+                print(f"❌ {item} picked {actual:.3f} of the time, expected {share}")
+                return False
+        if counts["c"]:
+            print("❌ Zero-weight item was picked")
+            return False
+        print(f"✅ Picks follow the weights: {dict(counts)}")
+
+        first = get_sampler("campaign", "profiles", ["a", "b"], ["a", "b"], [1, 2])
+        second = get_sampler("campaign", "profiles", ["a", "b"], ["a", "b"], [1, 2])
+        third = get_sampler("campaign", "profiles", ["a", "b"], ["a", "b"], [1, 3])
+        if first is not second or third is first:
+            print("❌ Sampler should be reused until the weights change")
+            return False
+        if get_sampler("campaign", "empty", ["a"], ["a"], [0]) is not None:
+            print("❌ Sampler without weights should be None")
+            return False
+        discard_samplers("campaign")
+        if get_sampler("campaign", "profiles", ["a", "b"], ["a", "b"], [1, 3]) is third:
+            print("❌ Discarded sampler was reused")
+            return False
+        discard_samplers("campaign")
+        print("✅ Samplers are cached per campaign and rebuilt when weights change")
+
+        print("\n🎉 Alias sampler test passed!")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Failed to import sampling module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_alias_sampler()
+    sys.exit(0 if success else 1)
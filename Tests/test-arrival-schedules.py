@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the precomputed arrival schedules (Poisson, diurnal, peak-hour and burst traffic)
+"""
+
+import sys
+import os
+import time
+import random
+import tempfile
+import shutil
+from collections import Counter
+from datetime import datetime
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_arrival_schedules():
+    """Test that arrival processes shape the per-minute rate and keep the campaign's mean rate"""
+
+    print("🧪 Testing Arrival Schedules...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.arrivals import ArrivalSchedule, parse_peak_hours, arrival_processes
+
+        print("✅ Successfully imported arrival schedule module")
+
+        if (parse_peak_hours("18-22") != [18, 19, 20, 21] or parse_peak_hours("22:00-02:00") != [0, 1, 22, 23]
+                or parse_peak_hours(["9", "evening"]) != [9, 18, 19, 20, 21]):
+            print("❌ Peak hours not parsed")
+            return False
+        if parse_peak_hours("0-24") != list(range(24)):
+            print("❌ 0-24 should cover the whole day")
+            return False
+        for spec in ("18-18", "9,18:00-18:30"):
+            try:
+                parse_peak_hours(spec)
+                print(f"❌ The empty range in {spec!r} should be rejected")
+                return False
+            except ValueError:
+                pass
+        for process in ("gaussian", 5, [1], ["poisson", None], {"name": "poisson"}):
+            try:
+                arrival_processes({"arrival_process": process})
+                print(f"❌ Arrival process {process!r} should be rejected")
+                return False
+            except ValueError:
+                pass
+        print("✅ Peak hours and process names are parsed and validated")
+
+        midnight = datetime(2025, 1, 1)
+        uniform = ArrivalSchedule.build({}, 120, 3, midnight, seed=1)
+        times = [uniform.time_of(i, i) for i in range(len(uniform))]
+        if list(uniform.counts) != [120, 120, 120] or times != sorted(times) or uniform.time_of(360) != uniform.end_time:
+            print(f"❌ Unexpected uniform schedule: {list(uniform.counts)}")
+            return False
+        print("✅ Uniform schedule spaces 360 arrivals evenly over 3 minutes")
+
+        poisson = ArrivalSchedule.build({"arrival_process": "poisson"}, 100, 120, midnight, seed=7)
+        mean = len(poisson) / 120
+        variance = sum((count - mean) ** 2 for count in poisson.counts) / 120
+        again = ArrivalSchedule.build({"arrival_process": "poisson"}, 100, 120, midnight, seed=7)
+        if not (90 <= mean <= 110 and 0.6 <= variance / mean <= 1.5) or list(again.counts) != list(poisson.counts):
+            print(f"❌ Poisson counts look wrong: mean {mean:.1f}, variance {variance:.1f}")
+            return False
+        if [again.time_of(i) for i in range(500)] != [poisson.time_of(i) for i in range(500)]:
+            print("❌ Seeded Poisson arrival times are not reproducible")
+            return False
+        print(f"✅ Poisson counts have mean {mean:.1f} and dispersion {variance / mean:.2f}")
+
+        diurnal = ArrivalSchedule.build({"arrival_process": "diurnal"}, 60, 24 * 60, midnight, seed=1)
+        evening, night = diurnal.counts[20 * 60], diurnal.counts[4 * 60]
+        if len(diurnal) != 60 * 24 * 60 or not evening > 6 * night:
+            print(f"❌ Diurnal curve not applied: {evening} vs {night} at 20:00 and 04:00")
+            return False
+        print(f"✅ Diurnal curve keeps the daily total and gives {evening}/min at 20:00 vs {night}/min at 04:00")
+
+        profile = {"id": "p", "behavioral_patterns": {"peak_hours": "18-22"}}
+        peak = ArrivalSchedule.build({"arrival_process": "peak_hours", "peak_boost": 3}, 60, 24 * 60, midnight,
+                                     user_profiles=[profile])
+        if peak.counts[19 * 60] != 3 * peak.counts[10 * 60]:
+            print(f"❌ Profile peak hours not boosted: {peak.counts[19 * 60]} vs {peak.counts[10 * 60]}")
+            return False
+        print("✅ Peak hours of the profiles' behavioral patterns are boosted")
+
+        burst = ArrivalSchedule.build({"arrival_process": "burst", "burst_every_minutes": 10,
+                                       "burst_length_minutes": 2, "burst_factor": 5}, 100, 30, midnight)
+        if abs(burst.counts[0] - 5 * burst.counts[5]) > 5 or burst.counts[11] != burst.counts[0] or len(burst) != 3000:
+            print(f"❌ Burst trains not applied: {list(burst.counts)}")
+            return False
+        print(f"✅ Burst trains run at {burst.counts[0]}/min against {burst.counts[5]}/min in between")
+
+        # Random access gives the same times as walking the schedule in order
+        offsets = random.sample(range(len(diurnal)), 1000)
+        walked = {i: diurnal.time_of(i) for i in sorted(offsets)}
+        if any(diurnal.time_of(i) != walked[i] for i in offsets if not diurnal.jitter):
+            print("❌ Random access disagrees with the cursor")
+            return False
+        start = time.perf_counter()
+        for i in range(100000):
+            diurnal.time_of(i, i)
+        per_lookup = (time.perf_counter() - start) / 100000 * 1e6
+        print(f"✅ Sequential lookups take {per_lookup:.2f}µs each")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            client = app.test_client()
+            profile = client.post('/api/profiles/', json={
+                "name": "Bursty profile",
+                "description": "Profile for arrival schedule test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]},
+                "behavioral_patterns": {"browsing_frequency": "high", "peak_hours": "evening"}
+            }).get_json()
+            if profile.get("behavioral_patterns", {}).get("peak_hours") != "evening":
+                print("❌ Profiles should keep their behavioral patterns")
+                return False
+            session = client.post('/api/sessions/', json={
+                "name": "Bursty campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 50},
+                "requests_per_minute": 60,
+                "duration_minutes": 20,
+                "config": {"arrival_process": ["burst", "poisson"], "burst_every_minutes": 10,
+                           "burst_length_minutes": 1, "burst_factor": 6}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            response = client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id, "fast_forward": True, "virtual_start_time": "2025-01-01T00:00:00"
+            }).get_json()
+            if response['config']['arrival_process'] != ["burst", "poisson"]:
+                print(f"❌ Arrival process not reported: {response['config']}")
+                return False
+            start = time.time()
+            while campaign_id in traffic_module.active_threads and time.time() - start < 60:
+                time.sleep(0.2)
+
+            records = traffic_module.load_campaign_traffic(campaign_id).values()
+            per_minute = Counter(int(record['id'].split('-')[0]) // 60000 for record in records)
+            first_minute = min(per_minute)
+            in_burst = sum(per_minute[first_minute + m] for m in (0, 10)) / 2
+            between = sum(per_minute[first_minute + m] for m in range(20) if m not in (0, 10)) / 18
+            if not in_burst > 3 * between:
+                print(f"❌ Campaign did not follow the burst schedule: {in_burst:.0f} vs {between:.0f} per minute")
+                return False
+            print(f"✅ Fast-forward campaign followed the schedule: {in_burst:.0f}/min in bursts vs {between:.0f}/min")
+
+            # Invalid arrival options are rejected before the campaign starts
+            invalid_options = [("arrival_process", 5), ("arrival_process", [1]), ("diurnal_curve", [[1]]), ("diurnal_curve", "flat"), ("peak_hours", "9-x"),
+                               ("peak_hours", "18-18"), ("peak_boost", -1), ("burst_factor", "big"),
+                               ("burst_every_minutes", "often")]
+            for option, value in invalid_options:
+                session = client.post('/api/sessions/', json={
+                    "name": f"Invalid {option}",
+                    "target_url": "https://example.com",
+                    "user_profile_ids": [profile['id']],
+                    "profile_user_counts": {profile['id']: 50},
+                    "config": {option: value}
+                }).get_json()
+                client.put(f"/api/traffic/campaigns/{session['id']}/status", json={"status": "running"})
+                response = client.post('/api/traffic/generate', json={"campaign_id": session['id']})
+                if response.status_code != 400 or session['id'] in traffic_module.active_threads:
+                    print(f"❌ {option}={value!r} should be rejected with 400, got {response.status_code}")
+                    return False
+            print(f"✅ {len(invalid_options)} invalid arrival options are rejected with 400")
+
+            print("\n🎉 Arrival schedules test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import arrival schedule module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_arrival_schedules()
+    sys.exit(0 if success else 1)
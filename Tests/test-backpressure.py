@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test script to verify backpressure measurements, overload policies and overload reporting
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_backpressure():
+    """Test that overloaded live campaigns are detected, classified and handled by their policy"""
+
+    print("🧪 Testing Backpressure...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.backpressure import (Backpressure, overload_policy, STATE_OK, STATE_TARGET_SLOW,
+                                          STATE_SATURATED)
+
+        print("✅ Successfully imported backpressure module")
+
+        try:
+            overload_policy({"overload_policy": "panic"})
+            print("❌ Unknown overload policies should be rejected")
+            return False
+        except ValueError:
+            pass
+
+        # Drop skips late arrivals only
+        monitor = Backpressure({"overload_policy": "drop", "max_lag_seconds": 1})
+        if not monitor.admit(0.5) or monitor.admit(1.5) or monitor.dropped_requests != 1:
+            print("❌ Drop policy should skip arrivals more than max_lag_seconds late")
+            return False
+
+        # The overload cause follows where the loop spends its time
+        monitor = Backpressure({"max_lag_seconds": 1})
+        monitor.admit(0.1)
+        monitor.observe(2, 10, 0.2, 0.001, 0.0, 0.001)
+        healthy = monitor.state
+        monitor.admit(3.0)
+        for _ in range(50):
+            monitor.observe(10, 10, 0.2, 0.001, 0.3, 0.001)
+        slow_target = monitor.state
+        monitor = Backpressure({"max_lag_seconds": 1})
+        monitor.admit(3.0)
+        for _ in range(50):
+            monitor.observe(1, 10, 0.2, 0.001, 0.0, 0.2)
+        if (healthy, slow_target, monitor.state) != (STATE_OK, STATE_TARGET_SLOW, STATE_SATURATED):
+            print(f"❌ Unexpected overload states: {healthy}, {slow_target}, {monitor.state}")
+            return False
+
+        # Shed halves the rate while overloaded and thins arrivals accordingly
+        monitor = Backpressure({"overload_policy": "shed", "max_lag_seconds": 1})
+        monitor.admit(5.0)
+        for _ in range(3):
+            monitor._last_adjustment -= 1
+            monitor.observe(1, 10, 0.2, 0.001, 0.0, 0.2)
+        admitted = sum(monitor.admit(5.0) for _ in range(800))
+        if monitor.rate_factor != 0.125 or admitted != 100:
+            print(f"❌ Shedding at factor {monitor.rate_factor} admitted {admitted} of 800 arrivals")
+            return False
+        print("✅ Policies and overload classification behave as configured")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        original_save = traffic_module.save_live_requests
+        try:
+            client = app.test_client()
+            profile = client.post('/api/profiles/', json={
+                "name": "Overload profile",
+                "description": "Profile for backpressure test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+
+            def run_live(policy, config, seconds=4):
+                """Run a live campaign for a few seconds and return its status while running and at the end"""
+                session = client.post('/api/sessions/', json={
+                    "name": f"Overload {policy}",
+                    "target_url": "https://example.com",
+                    "user_profile_ids": [profile['id']],
+                    "profile_user_counts": {profile['id']: 50},
+                    "requests_per_minute": config.pop("rpm"),
+                    "duration_minutes": 1,
+                    "config": {"randomize_timing": False, "overload_policy": policy, "max_lag_seconds": 1, **config}
+                }).get_json()
+                campaign_id = session['id']
+                client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+                client.post('/api/traffic/generate', json={"campaign_id": campaign_id})
+                time.sleep(seconds)
+                status = client.get(f'/api/traffic/status/{campaign_id}').get_json()['data']
+                client.post(f'/api/traffic/stop/{campaign_id}')
+                deadline = time.time() + 10
+                while any(t.name.endswith(campaign_id) and t.is_alive() for t in threading.enumerate()):
+                    if time.time() > deadline:
+                        break
+                    time.sleep(0.1)
+                return status
+
+            session = client.post('/api/sessions/', json={
+                "name": "Overload invalid", "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']], "profile_user_counts": {profile['id']: 50}
+            }).get_json()
+            client.put(f"/api/traffic/campaigns/{session['id']}/status", json={"status": "running"})
+            if client.post('/api/traffic/generate', json={"campaign_id": session['id'], "overload_policy": "panic"}).status_code != 400:
+                print("❌ Invalid overload policies should be rejected with 400")
+                return False
+            invalid_options = [("max_lag_seconds", "abc"), ("max_lag_seconds", -1), ("min_rate_factor", None),
+                               ("min_rate_factor", 0), ("min_rate_factor", 1.5)]
+            for option, value in invalid_options:
+                invalid = client.post('/api/sessions/', json={
+                    "name": f"Overload invalid {option}", "target_url": "https://example.com",
+                    "user_profile_ids": [profile['id']], "profile_user_counts": {profile['id']: 50},
+                    "config": {"overload_policy": "shed", option: value}
+                }).get_json()
+                client.put(f"/api/traffic/campaigns/{invalid['id']}/status", json={"status": "running"})
+                response = client.post('/api/traffic/generate', json={"campaign_id": invalid['id']})
+                if response.status_code != 400 or invalid['id'] in traffic_module.active_threads:
+                    print(f"❌ {option}={value!r} should be rejected with 400, got {response.status_code}")
+                    return False
+            print("✅ Invalid overload policies, lags and rate factors are rejected with 400")
+
+            # A window of 2 requests of ~275ms can't carry 100 req/s: the target is the bottleneck
+            status = run_live("none", {"rpm": 6000, "max_in_flight": 2})
+            overload = status.get("overload") or {}
+            if overload.get("state") != STATE_TARGET_SLOW or overload.get("lag_seconds", 0) < 1:
+                print(f"❌ Slow target not reported: {overload}")
+                return False
+            print(f"✅ Slow target reported {overload['lag_seconds']}s behind schedule with {overload['queue_depth']}/{overload['queue_limit']} in flight")
+
+            status = run_live("drop", {"rpm": 6000, "max_in_flight": 2})
+            overload = status.get("overload") or {}
+            if overload.get("dropped_requests", 0) == 0 or overload.get("lag_seconds", 99) > 2:
+                print(f"❌ Drop policy did not keep the lag bounded: {overload}")
+                return False
+            print(f"✅ Drop policy skipped {overload['dropped_requests']} late arrivals, lag {overload['lag_seconds']}s")
+
+            status = run_live("shed", {"rpm": 6000, "max_in_flight": 2})
+            overload = status.get("overload") or {}
+            if overload.get("shed_requests", 0) == 0 or overload.get("rate_factor", 1) >= 1:
+                print(f"❌ Shed policy did not lower the rate: {overload}")
+                return False
+            print(f"✅ Shed policy lowered the rate to {overload['rate_factor']} of the schedule")
+
+            status = run_live("pause", {"rpm": 6000, "max_in_flight": 4})
+            overload = status.get("overload") or {}
+            if overload.get("paused_seconds", 0) <= 0:
+                print(f"❌ Pause policy never paused: {overload}")
+                return False
+            print(f"✅ Pause policy paused for {overload['paused_seconds']}s and dropped {overload['dropped_requests']} arrivals")
+
+            # Slow writes with a wide window: the generator itself is the bottleneck
+            def slow_save(*args, **kwargs):
+                time.sleep(0.25)
+                return original_save(*args, **kwargs)
+            traffic_module.save_live_requests = slow_save
+            status = run_live("none", {"rpm": 1200, "max_in_flight": 100})
+            traffic_module.save_live_requests = original_save
+            overload = status.get("overload") or {}
+            if overload.get("state") != STATE_SATURATED or overload.get("write_latency_ms", 0) < 100:
+                print(f"❌ Saturated generator not reported: {overload}")
+                return False
+            print(f"✅ Saturated generator reported with {overload['write_latency_ms']:.0f}ms writes per request")
+
+            print("\n🎉 Backpressure test passed!")
+            return True
+        finally:
+            traffic_module.save_live_requests = original_save
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backpressure module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_backpressure()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify batched traffic generation and simulation
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_batch_generation():
+    """Test that a batch matches single-record generation field for field"""
+
+    print("🧪 Testing Batch Generation...")
+
+    try:
+        from app.api.traffic import (TrafficConfig, generate_traffic_data, generate_traffic_batch,
+                                     simulate_request_batch, campaign_adids)
+        from app.api.adids import CampaignAdids
+
+        print("✅ Successfully imported traffic module")
+
+        profile = {
+            "id": "profile-1",
+            "demographics": {"interests": ["sports"], "countries": ["United States"]},
+            "referrers": {"sports|United States": ["https://sports.example.com"]}
+        }
+        config = TrafficConfig(
+            campaign_id="batch-test",
+            target_url="https://example.com",
+            requests_per_minute=60,
+            duration_minutes=1,
+            rtb_config={"device_brand": "samsung"},
+            user_profile_ids=["profile-1"],
+            profile_user_counts={"profile-1": 5},
+            user_profiles=[profile]
+        )
+        campaign_adids["batch-test"] = CampaignAdids(seed=7, profile_user_counts={"profile-1": 2})
+        profile_adids = campaign_adids["batch-test"].population("profile-1").page()
+
+        start = datetime(2025, 1, 1)
+        timestamps = [start + timedelta(milliseconds=i // 2) for i in range(10)]
+        batch = generate_traffic_batch(config, 10, timestamps=timestamps)
+
+        if len(batch) != 10:
+            print(f"❌ Expected 10 records, got {len(batch)}")
+            return False
+        print("✅ Batch has 10 records")
+
+        single = generate_traffic_data(config, now=start)
+        missing = set(single) - set(batch[0])
+        if missing:
+            print(f"❌ Batch records are missing fields: {missing}")
+            return False
+        print("✅ Batch records have the same fields as single records")
+
+        ids = [record['id'] for record in batch]
+        if len(set(ids)) != len(ids):
+            print(f"❌ Duplicate IDs in batch: {ids}")
+            return False
+        print(f"✅ IDs are unique within the batch: {ids[:4]}...")
+
+        if batch[0]['referrer'] != "https://sports.example.com" or batch[0]['rtb_user'].get('id') not in profile_adids:
+            print(f"❌ Profile data not applied: {batch[0]['referrer']}, {batch[0]['rtb_user']}")
+            return False
+        print("✅ Profile referrer and ADID applied")
+
+        columns = generate_traffic_batch(config, 10, timestamps=timestamps, columnar=True)
+        if not all(len(column) == 10 for column in columns.values()) or columns['timestamp'][0] != start.isoformat():
+            print("❌ Columnar batch has uneven or wrong columns")
+            return False
+        print(f"✅ Columnar batch has {len(columns)} columns of 10 values")
+
+        simulate_request_batch(batch, timestamps)
+        for record, request_time in zip(batch, timestamps):
+            response_time = datetime.fromisoformat(record['timestamp'])
+            if 'success' not in record or not (request_time < response_time <= request_time + timedelta(seconds=0.5)):
+                print(f"❌ Unexpected simulated response: {record.get('success')}, {record['timestamp']}")
+                return False
+        print("✅ Simulated responses follow the request times")
+
+        del campaign_adids["batch-test"]
+
+        print("\n🎉 Batch generation test passed!")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Failed to import traffic module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_batch_generation()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the status of many campaigns in one request
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_batch_status():
+    """Test POST /status:batch by campaign IDs and for all running campaigns"""
+
+    print("🧪 Testing Batch Status...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        original_summary = traffic_module.get_campaign_traffic_summary
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_ids = [client.post('/api/sessions/', json={
+                "name": f"Batch campaign {i}",
+                "target_url": "https://example.com"
+            }).get_json()['id'] for i in range(3)]
+            for count, campaign_id in zip((10, 4), campaign_ids):
+                traffic_module.get_campaign_store(campaign_id).append_batch(
+                    [{"id": f"r{i}", "success": i % 2 == 0, "timestamp": f"2025-01-01T00:00:{i:02d}"} for i in range(count)])
+            traffic_module.active_threads[campaign_ids[1]] = 'thread'
+
+            response = client.post('/api/traffic/status:batch', json={"campaign_ids": campaign_ids + ['unknown']})
+            body = response.get_json()
+            statuses = body['data']
+            if (response.status_code != 200 or set(statuses) != set(campaign_ids) or body['not_found'] != ['unknown']
+                    or statuses[campaign_ids[0]]['total_requests'] != 10 or statuses[campaign_ids[0]]['success_rate'] != 50.0
+                    or statuses[campaign_ids[0]]['last_request_time'] != '2025-01-01T00:00:09'
+                    or statuses[campaign_ids[2]]['total_requests'] != 0 or not statuses[campaign_ids[1]]['is_running']):
+                print(f"❌ Unexpected batch status: {response.status_code} {body}")
+                return False
+            print("✅ One request returns the status and counters of every campaign asked for")
+
+            running = client.post('/api/traffic/status:batch', json={"running": True}).get_json()['data']
+            if list(running) != [campaign_ids[1]] or running[campaign_ids[1]]['total_requests'] != 4:
+                print(f"❌ Unexpected running campaigns: {running}")
+                return False
+            print("✅ running: true returns the running campaigns")
+
+            # Unchanged campaigns are answered from memory
+            def read_forbidden(campaign_id):
+                raise AssertionError(f"Traffic of unchanged campaign {campaign_id} read again")
+
+            traffic_module.get_campaign_traffic_summary = read_forbidden
+            response = client.post('/api/traffic/status:batch', json={"campaign_ids": campaign_ids})
+            traffic_module.get_campaign_traffic_summary = original_summary
+            if response.status_code != 200:
+                print(f"❌ Unchanged campaigns should not be read again: {response.get_json()}")
+                return False
+            traffic_module.get_campaign_store(campaign_ids[0]).append({"id": "r10", "success": True})
+            statuses = client.post('/api/traffic/status:batch', json={"campaign_ids": campaign_ids}).get_json()['data']
+            if statuses[campaign_ids[0]]['total_requests'] != 11 or statuses[campaign_ids[1]]['total_requests'] != 4:
+                print(f"❌ New records are missing from the batch status: {statuses}")
+                return False
+            print("✅ Unchanged campaigns come from memory and new records show up at once")
+
+            for payload in ({}, {"campaign_ids": "all"}, {"campaign_ids": [1, 2]},
+                            {"campaign_ids": [f"c{i}" for i in range(traffic_module.BATCH_STATUS_LIMIT + 1)]}):
+                if client.post('/api/traffic/status:batch', json=payload).status_code != 400:
+                    print(f"❌ Invalid request {str(payload)[:60]} should be rejected")
+                    return False
+            print("✅ Invalid and oversized requests are rejected")
+
+            print("\n🎉 Batch status test passed!")
+            return True
+        finally:
+            traffic_module.get_campaign_traffic_summary = original_summary
+            traffic_module.active_threads.clear()
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_batch_status()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that campaigns resume exactly from their checkpoints
+"""
+
+import json
+import sys
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_checkpoint_resume():
+    """Test checkpoints, store manifests and exact resume"""
+
+    print("🧪 Testing Checkpoint Resume...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.traffic_store import CampaignStore, MANIFEST_FILENAME
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        profile = client.post('/api/profiles/', json={
+            "name": "Checkpoint profile",
+            "description": "Profile for checkpoint resume test",
+            "demographics": {"interests": ["sports", "music"], "countries": ["United States", "Canada"]}
+        }).get_json()
+
+        def create_campaign(requests_per_minute, duration_minutes):
+            return client.post('/api/sessions/', json={
+                "name": "Checkpoint campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 500},
+                "requests_per_minute": requests_per_minute,
+                "duration_minutes": duration_minutes,
+                "rtb_config": {"device_brand": "samsung"}
+            }).get_json()['id']
+
+        def wait_for_generator(campaign_id, timeout=120):
+            start = time.time()
+            while any(thread.name == f"traffic_generator_{campaign_id}" for thread in threading.enumerate()):
+                if time.time() - start > timeout:
+                    raise RuntimeError("Campaign did not finish in time")
+                time.sleep(0.1)
+
+        def read_records(campaign_id):
+            store = CampaignStore(os.path.join(traffic_module.TRAFFIC_DATA_DIR, campaign_id))
+            return store, [json.dumps(record, sort_keys=True) for record in store.iter_records()]
+
+        def start_fast_forward(campaign_id):
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            return client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id,
+                "fast_forward": True,
+                "virtual_start_time": "2025-01-01T00:00:00",
+                "arrival_process": "poisson",
+                "checkpoint_interval_seconds": 0,
+                "seed": 11
+            })
+
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        original_report = traffic_module.report_fast_forward_progress
+        reference_dir = tempfile.mkdtemp()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            # Reference: an uninterrupted fast-forward run
+            campaign_id = create_campaign(600, 5)
+            traffic_module.TRAFFIC_DATA_DIR = reference_dir
+            start_fast_forward(campaign_id)
+            wait_for_generator(campaign_id)
+            _, reference = read_records(campaign_id)
+
+            # Same campaign in a fresh directory, stopped after its second batch and resumed
+            traffic_module.TRAFFIC_DATA_DIR = temp_dir
+            batches = []
+
+            def stop_after_two_batches(config, *args):
+                original_report(config, *args)
+                batches.append(1)
+                if config.campaign_id == campaign_id and len(batches) == 2:
+                    traffic_module.active_threads[campaign_id] = 'stopped'
+
+            traffic_module.report_fast_forward_progress = stop_after_two_batches
+            start_fast_forward(campaign_id)
+            wait_for_generator(campaign_id)
+            traffic_module.report_fast_forward_progress = original_report
+            traffic_module.active_threads.pop(campaign_id, None)
+
+            campaign_dir = os.path.join(temp_dir, campaign_id)
+            with open(os.path.join(campaign_dir, 'checkpoint.json')) as f:
+                checkpoint = json.load(f)
+            if checkpoint['status'] != 'stopped' or checkpoint['next_index'] != 2000 or checkpoint['max_seq'] != 2000:
+                print(f"❌ Unexpected checkpoint: {checkpoint['status']} at {checkpoint['next_index']}, seq {checkpoint['max_seq']}")
+                return False
+            if not os.path.exists(os.path.join(campaign_dir, 'segments', MANIFEST_FILENAME)):
+                print("❌ The store manifest should be saved with the checkpoint")
+                return False
+            print(f"✅ Stopped run checkpointed at record {checkpoint['next_index']} of {len(reference)}")
+
+            response = client.post(f'/api/traffic/resume/{campaign_id}')
+            body = response.get_json()
+            if response.status_code != 200 or body.get('next_seq') != 2001:
+                print(f"❌ Resume failed: {response.status_code} {body}")
+                return False
+            wait_for_generator(campaign_id)
+            store, resumed = read_records(campaign_id)
+            if resumed != reference:
+                diff = next((i for i, (a, b) in enumerate(zip(resumed, reference)) if a != b), min(len(resumed), len(reference)))
+                print(f"❌ Resumed run differs from the uninterrupted one at record {diff} ({len(resumed)} vs {len(reference)})")
+                return False
+            with open(os.path.join(campaign_dir, 'status.json')) as f:
+                status = json.load(f)
+            if status['status'] != 'completed' or status['total_requests'] != len(reference) or status['first_index'] != 0:
+                print(f"❌ Unexpected final status: {status['status']}, {status['total_requests']} requests")
+                return False
+            print(f"✅ Resumed run wrote exactly the {len(reference)} records of the uninterrupted run")
+
+            if client.post(f'/api/traffic/resume/{campaign_id}').status_code != 400:
+                print("❌ Completed campaigns should not resume")
+                return False
+            print("✅ Completed campaigns are not resumed")
+
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            for interval in ([1], {"seconds": 1}, "nan", "inf", -1):
+                response = client.post('/api/traffic/generate', json={"campaign_id": campaign_id,
+                                                                      "checkpoint_interval_seconds": interval})
+                if response.status_code != 400:
+                    print(f"❌ checkpoint_interval_seconds={interval!r} should be rejected with 400, got {response.status_code}")
+                    return False
+            print("✅ Invalid checkpoint intervals are rejected with 400")
+
+            # Reopening uses the manifest and reads only what was appended after it
+            scanned = CampaignStore(campaign_dir)
+            if (scanned.total_requests, scanned.max_seq) != (len(reference), len(reference)):
+                print("❌ Store reopened from its manifest has wrong counters")
+                return False
+            appended = json.loads(reference[-1])
+            appended.pop('seq')
+            scanned.append(appended)
+            scanned.close()
+            reopened = CampaignStore(campaign_dir)
+            if reopened.total_requests != len(reference) + 1 or reopened.max_seq != len(reference) + 1:
+                print("❌ Records appended after the manifest are not counted")
+                return False
+            reopened.save_manifest()
+            stream_dir = os.path.join(campaign_dir, 'segments', 'main')
+            last_segment = sorted(os.listdir(stream_dir))[-1]
+            with open(os.path.join(stream_dir, last_segment), 'rb+') as f:
+                f.truncate(0)
+            rescanned = CampaignStore(campaign_dir)
+            if rescanned.total_requests >= len(reference):
+                print("❌ A stale manifest should make the store rescan its segments")
+                return False
+            print("✅ Store manifest is extended by appended records and discarded when stale")
+
+            # Live runs continue the sequence without gaps or duplicates
+            live_id = create_campaign(600, 1)
+            client.put(f'/api/traffic/campaigns/{live_id}/status', json={"status": "running"})
+            client.post('/api/traffic/generate', json={"campaign_id": live_id, "checkpoint_interval_seconds": 0.2})
+            time.sleep(1.0)
+            client.post(f'/api/traffic/stop/{live_id}')
+            wait_for_generator(live_id)
+            _, first_part = read_records(live_id)
+            response = client.post(f'/api/traffic/resume/{live_id}')
+            if response.status_code != 200 or response.get_json().get('next_seq') != len(first_part) + 1:
+                print(f"❌ Live resume failed: {response.status_code} {response.get_json()}")
+                return False
+            time.sleep(1.0)
+            client.post(f'/api/traffic/stop/{live_id}')
+            wait_for_generator(live_id)
+            _, live_records = read_records(live_id)
+            seqs = [json.loads(record)['seq'] for record in live_records]
+            if len(live_records) <= len(first_part) or seqs != list(range(1, len(seqs) + 1)):
+                print(f"❌ Live resume broke the sequence: {len(first_part)} then {len(live_records)} records")
+                return False
+            print(f"✅ Live campaign resumed at seq {len(first_part) + 1} and continued to {len(seqs)} without gaps")
+
+            print("\n🎉 Checkpoint resume test passed!")
+            return True
+        finally:
+            traffic_module.report_fast_forward_progress = original_report
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            shutil.rmtree(reference_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_checkpoint_resume()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script to verify ETags and 304 responses of the polled campaign endpoints
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_conditional_requests():
+    """Test If-None-Match on /status, /monitor, /campaigns/<id>/info and /api/sessions/"""
+
+    print("🧪 Testing Conditional Requests...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        original_summary = traffic_module.get_campaign_traffic_summary
+        original_load = traffic_module.load_campaign_traffic
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = client.post('/api/sessions/', json={
+                "name": "Conditional campaign",
+                "target_url": "https://example.com",
+                "requests_per_minute": 60,
+                "duration_minutes": 1
+            }).get_json()['id']
+            store = traffic_module.get_campaign_store(campaign_id)
+            store.append_batch([{"id": f"r{i}", "success": i % 2 == 0} for i in range(10)])
+
+            def read_forbidden(*args, **kwargs):
+                raise AssertionError("Traffic read for a request that should be answered with 304")
+
+            urls = [f'/api/traffic/status/{campaign_id}', f'/api/traffic/monitor/{campaign_id}',
+                    f'/api/traffic/campaigns/{campaign_id}/info', '/api/sessions/']
+            etags = {}
+            for url in urls:
+                response = client.get(url)
+                etag, _ = response.get_etag()
+                if response.status_code != 200 or not etag or not response.cache_control.no_cache:
+                    print(f"❌ {url} should send an ETag and Cache-Control: no-cache")
+                    return False
+                etags[url] = etag
+
+            # Unchanged campaigns are answered without reading their traffic
+            traffic_module.get_campaign_traffic_summary = read_forbidden
+            traffic_module.load_campaign_traffic = read_forbidden
+            for url in urls:
+                response = client.get(url, headers={"If-None-Match": f'"{etags[url]}"'})
+                if response.status_code != 304 or response.data or response.get_etag()[0] != etags[url]:
+                    print(f"❌ {url} should answer a matching If-None-Match with an empty 304")
+                    return False
+                compressed = client.get(url, headers={"If-None-Match": f'W/"{etags[url]}"', "Accept-Encoding": "gzip"})
+                if compressed.status_code != 304:
+                    print(f"❌ {url} should match the weak ETag of its compressed response")
+                    return False
+            traffic_module.get_campaign_traffic_summary = original_summary
+            traffic_module.load_campaign_traffic = original_load
+            print("✅ Matching If-None-Match is answered with 304 before any traffic is read")
+
+            # Every change to what the endpoints report changes their ETags
+            def changed(description):
+                for url in urls:
+                    response = client.get(url, headers={"If-None-Match": f'"{etags[url]}"'})
+                    if response.status_code != 200 or response.get_etag()[0] == etags[url]:
+                        print(f"❌ {url} kept its ETag after {description}")
+                        return False
+                    etags[url] = response.get_etag()[0]
+                print(f"✅ ETags change after {description}")
+                return True
+
+            store.append({"id": "r10", "success": True})
+            if not changed("a new record"):
+                return False
+            body = client.get(f'/api/traffic/status/{campaign_id}').get_json()
+            if body['data']['total_requests'] != 11:
+                print(f"❌ Unexpected status after a new record: {body}")
+                return False
+            traffic_module.update_campaign_status(campaign_id, "stopped")
+            if not changed("a status update"):
+                return False
+            traffic_module.active_threads[campaign_id] = 'thread'
+            try:
+                if not changed("the generator starting"):
+                    return False
+            finally:
+                traffic_module.active_threads.pop(campaign_id, None)
+
+            client.put(f'/api/sessions/{campaign_id}', json={"name": "Renamed campaign"})
+            for url in (f'/api/traffic/campaigns/{campaign_id}/info', '/api/sessions/'):
+                response = client.get(url, headers={"If-None-Match": f'"{etags[url]}"'})
+                if response.status_code != 200 or b'Renamed campaign' not in response.data:
+                    print(f"❌ {url} should change after the session is updated")
+                    return False
+            print("✅ Session updates change the campaign info and session list ETags")
+
+            print("\n🎉 Conditional requests test passed!")
+            return True
+        finally:
+            traffic_module.get_campaign_traffic_summary = original_summary
+            traffic_module.load_campaign_traffic = original_load
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_conditional_requests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that seeded campaigns generate reproducible traffic
+"""
+
+import json
+import sys
+import os
+import time
+import tempfile
+import shutil
+from collections import Counter
+from datetime import datetime
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_deterministic_generation():
+    """Test that record i of a campaign is a pure function of its seed and i"""
+
+    print("🧪 Testing Deterministic Generation...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.profiles import profiles
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        profile = client.post('/api/profiles/', json={
+            "name": "Seeded profile",
+            "description": "Profile for deterministic generation test",
+            "demographics": {"interests": ["sports", "music"], "countries": ["United States", "Canada"]},
+            "device_preferences": {"device_brand": "samsung"}
+        }).get_json()
+        session = client.post('/api/sessions/', json={
+            "name": "Seeded campaign",
+            "target_url": "https://example.com",
+            "user_profile_ids": [profile['id']],
+            "profile_user_counts": {profile['id']: 500},
+            "requests_per_minute": 120,
+            "duration_minutes": 2,
+            "rtb_config": {"device_brand": "samsung"}
+        }).get_json()
+        campaign_id = session['id']
+
+        if client.post('/api/traffic/generate', json={"campaign_id": campaign_id, "seed": "not-a-seed"}).status_code != 400:
+            print("❌ Invalid seeds should be rejected")
+            return False
+
+        def run_campaign(seed, workers=1, campaign_id=campaign_id):
+            """Run the campaign in fast-forward in a fresh data directory and return its records"""
+            temp_dir = tempfile.mkdtemp()
+            traffic_module.TRAFFIC_DATA_DIR = temp_dir
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id,
+                "fast_forward": True,
+                "virtual_start_time": "2025-01-01T00:00:00",
+                "workers": workers,
+                "seed": seed
+            })
+            start = time.time()
+            while campaign_id in traffic_module.active_threads:
+                if time.time() - start > 120:
+                    raise RuntimeError("Campaign did not finish in time")
+                time.sleep(0.2)
+            store = traffic_module.get_campaign_store(campaign_id)
+            records = [json.dumps(record, sort_keys=True) for record in store.iter_records()]
+            store.close()
+            with open(os.path.join(temp_dir, campaign_id, 'status.json')) as f:
+                status = json.load(f)
+            return temp_dir, records, status
+
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dirs = []
+        try:
+            dir_a, first_run, status = run_campaign(42)
+            dir_b, second_run, _ = run_campaign(42)
+            dir_c, other_seed, _ = run_campaign(43)
+            temp_dirs += [dir_a, dir_b, dir_c]
+            if status.get('seed') != 42 or len(first_run) != 240:
+                print(f"❌ Unexpected run: seed {status.get('seed')}, {len(first_run)} records")
+                return False
+            if first_run != second_run:
+                diff = next(i for i, (a, b) in enumerate(zip(first_run, second_run)) if a != b)
+                print(f"❌ Runs with the same seed differ at record {diff}")
+                return False
+            print(f"✅ Two runs with seed 42 produced the same {len(first_run)} records")
+            if sum(1 for a, b in zip(first_run, other_seed) if a == b) > 0:
+                print("❌ Runs with different seeds should differ")
+                return False
+            print("✅ A different seed produces different records")
+
+            # Any slice can be regenerated on its own from the seed and the record indices
+            first_record = json.loads(first_run[0])
+            config = traffic_module.TrafficConfig(**{key: first_record[key] for key in (
+                'campaign_id', 'target_url', 'requests_per_minute', 'duration_minutes', 'geo_locations',
+                'rtb_config', 'config', 'user_profile_ids', 'profile_user_counts', 'total_profile_users')})
+            config.campaign_referrers = session.get('campaign_referrers', {})
+            config.user_profiles = [profiles[profile['id']].__dict__]
+            traffic_module.TRAFFIC_DATA_DIR = dir_a
+            traffic_module.campaign_adids[campaign_id] = traffic_module.load_campaign_adids(campaign_id)
+            try:
+                regenerated = traffic_module.regenerate_traffic_batch(
+                    config, datetime(2025, 1, 1), 0, list(range(150, 160)))
+            finally:
+                traffic_module.campaign_adids.pop(campaign_id, None)
+                traffic_module.discard_campaign_pools(campaign_id)
+            for index, record in zip(range(150, 160), regenerated):
+                stored = json.loads(first_run[index])
+                if stored.pop('seq') != index + 1 or json.dumps(record, sort_keys=True) != json.dumps(stored, sort_keys=True):
+                    print(f"❌ Regenerated record {index} does not match the stored one")
+                    return False
+            print("✅ Records 150-159 regenerated on their own match the stored ones")
+
+            dir_d, sharded_a, _ = run_campaign(7, workers=2)
+            dir_e, sharded_b, _ = run_campaign(7, workers=2)
+            temp_dirs += [dir_d, dir_e]
+            if len(sharded_a) != 240 or sharded_a != sharded_b:
+                print("❌ Sharded runs with the same seed and worker count differ")
+                return False
+            seqs = [json.loads(record)['seq'] for record in sharded_a]
+            times = [json.loads(record)['timestamp'] for record in sharded_a]
+            if seqs != list(range(1, 241)) or times != sorted(times):
+                print("❌ Merged shards are not in arrival order")
+                return False
+            print("✅ Sharded runs with the same seed are reproducible and merge in arrival order")
+
+            # Worker processes don't share the profile store, only the profiles of the config
+            apple_profile = client.post('/api/profiles/', json={
+                "name": "Apple profile",
+                "description": "Profile with device preferences for sharded runs",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]},
+                "device_preferences": {"device_brand": "apple", "operating_system": "ios"}
+            }).get_json()
+            apple_campaign = client.post('/api/sessions/', json={
+                "name": "Apple campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [apple_profile['id']],
+                "profile_user_counts": {apple_profile['id']: 500},
+                "requests_per_minute": 60,
+                "duration_minutes": 2,
+                "rtb_config": {"device_brand": "samsung"}
+            }).get_json()['id']
+            makes = {}
+            for workers in (1, 2):
+                temp_dir, records, _ = run_campaign(42, workers=workers, campaign_id=apple_campaign)
+                temp_dirs.append(temp_dir)
+                makes[workers] = Counter(json.loads(record)['rtb_device']['make'] for record in records)
+            if makes[1] != makes[2] or set(makes[1]) != {'Apple'}:
+                print(f"❌ Device makes differ between 1 and 2 workers: {makes[1]} {makes[2]}")
+                return False
+            print(f"✅ Worker processes apply the profiles' device preferences: {dict(makes[2])}")
+
+            print("\n🎉 Deterministic generation test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            for temp_dir in temp_dirs:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_deterministic_generation()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pre-generated device and IP pools used for RTB data
+"""
+
+import sys
+import os
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_device_pools():
+    """Test that pooled devices and IPs follow device preferences and countries"""
+
+    print("🧪 Testing Device Pools...")
+
+    try:
+        from app.api.device_pools import CampaignDevicePools, COUNTRY_IP_PREFIXES, discard_campaign_pools, device_pool_size
+        from app.api.traffic import TrafficConfig, generate_rtb_data
+
+        print("✅ Successfully imported device pool module")
+
+        pools = CampaignDevicePools({"device_brand": "samsung", "device_models": []}, ["Canada"], size=50)
+        apple_profile = {"id": "apple-users", "device_preferences": {"device_brand": "apple", "operating_system": "ios"}}
+        devices = [pools.pick_device("apple-users", apple_profile) for _ in range(200)]
+        if len(pools.device_pool("apple-users")) != 50:
+            print(f"❌ Pool size not applied: {len(pools.device_pool('apple-users'))}")
+            return False
+        if any(device["make"] != "Apple" or "iPhone OS" not in device["ua"] for device in devices):
+            print("❌ Apple profile got non-Apple devices")
+            return False
+        print("✅ Devices follow the profile's device preferences")
+
+        campaign_devices = {pools.pick_device(None)["make"] for _ in range(200)}
+        if campaign_devices != {"Samsung"}:
+            print(f"❌ Campaign fallback should only use Samsung devices: {campaign_devices}")
+            return False
+        print("✅ Profiles without preferences fall back to the campaign rtb_config")
+
+        models = CampaignDevicePools({"device_brand": "mixed", "device_models": ["Galaxy S24", "Pixel 8"]}, [], size=50)
+        picked_models = {models.pick_device(None)["model"] for _ in range(200)}
+        if picked_models != {"Galaxy S24", "Pixel 8"}:
+            print(f"❌ Device models not honoured: {picked_models}")
+            return False
+        print("✅ Device models are honoured")
+
+        prefixes = set(COUNTRY_IP_PREFIXES["Canada"])
+        if any(int(pools.pick_ip().split(".")[0]) not in prefixes for _ in range(200)):
+            print("❌ IPs do not come from the campaign's country")
+            return False
+        japan = set(COUNTRY_IP_PREFIXES["Japan"])
+        if any(int(pools.pick_ip("Japan").split(".")[0]) not in japan for _ in range(200)):
+            print("❌ IPs do not come from the requested country")
+            return False
+        print("✅ IPs come from the address blocks of the country")
+
+        config = TrafficConfig(campaign_id="pool-test", target_url="https://example.com",
+                               rtb_config={"device_brand": "google"}, geo_locations=["Japan"],
+                               config={"device_pool_size": 10})
+        rtb_data = generate_rtb_data(config.rtb_config, config)
+        device = rtb_data["device"]
+        if device["make"] != "Google" or int(device["ip"].split(".")[0]) not in japan or not device["ua"]:
+            print(f"❌ Unexpected RTB device: {device}")
+            return False
+        discard_campaign_pools("pool-test")
+        print(f"✅ RTB device drawn from the campaign pools: {device['model']} / {device['ip']}")
+
+        if device_pool_size({}) != 1000 or device_pool_size({"device_pool_size": "20"}) != 20:
+            print("❌ Pool sizes not parsed")
+            return False
+        for size in (0, -5, "many", None, [10]):
+            try:
+                device_pool_size({"device_pool_size": size})
+                print(f"❌ Pool size {size!r} should be rejected")
+                return False
+            except ValueError:
+                pass
+        print("✅ Invalid pool sizes are rejected")
+
+        print("\n🎉 Device pools test passed!")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Failed to import device pool module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_device_pools()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script to verify distributed generation with local worker nodes
+"""
+
+import sys
+import os
+import time
+import socket
+import tempfile
+import shutil
+import subprocess
+
+# Add the backend directory to the path so we can import the traffic module
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.append(BACKEND_DIR)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_worker_node(data_dir):
+    """Start a backend on a free localhost port to act as a worker node"""
+    port = free_port()
+    env = dict(os.environ, TRAFFIC_DATA_DIR=data_dir, LOGS_DIR=data_dir)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app.main', 'run', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+def test_distributed_generation():
+    """Test that a coordinator splits a campaign across nodes and aggregates their counters"""
+
+    print("🧪 Testing Distributed Generation...")
+
+    try:
+        import requests
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.traffic_store import CampaignStore
+
+        print("✅ Successfully imported backend app")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = os.path.join(temp_dir, 'coordinator')
+        os.makedirs(traffic_module.TRAFFIC_DATA_DIR)
+        workers = [start_worker_node(os.path.join(temp_dir, f'node{k}')) for k in range(2)]
+
+        try:
+            for _, url in workers:
+                for _ in range(100):
+                    try:
+                        requests.get(f"{url}/api/cluster/ping", timeout=1)
+                        break
+                    except requests.RequestException:
+                        time.sleep(0.2)
+
+            client = app.test_client()
+            for _, url in workers:
+                response = client.post('/api/cluster/nodes', json={"url": url})
+                if response.status_code != 200:
+                    print(f"❌ Could not register node {url}: {response.get_json()}")
+                    return False
+            print(f"✅ Registered {len(workers)} worker nodes")
+
+            profile = client.post('/api/profiles/', json={
+                "name": "Distributed profile",
+                "description": "Profile for distributed test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "Distributed campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 400},
+                "requests_per_minute": 600,
+                "duration_minutes": 2,
+                "config": {"randomize_timing": False}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+            client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id,
+                "fast_forward": True,
+                "distributed": True,
+                "virtual_start_time": "2025-01-01T00:00:00"
+            })
+
+            start = time.time()
+            while campaign_id in traffic_module.active_threads:
+                if time.time() - start > 120:
+                    print("❌ Distributed run did not finish in time")
+                    return False
+                time.sleep(0.2)
+            print(f"✅ Distributed run finished in {time.time() - start:.1f}s")
+
+            status = client.get(f'/api/traffic/status/{campaign_id}').get_json()['data']
+            if status['total_requests'] != 1200 or len(status.get('nodes', {})) != 2:
+                print(f"❌ Unexpected aggregated status: {status.get('total_requests')}, {status.get('nodes')}")
+                return False
+            print("✅ /status aggregates the counters of both nodes")
+
+            # Each node stored its share in its own stream
+            adids = set()
+            for k in range(2):
+                node_store = CampaignStore(os.path.join(temp_dir, f'node{k}', campaign_id))
+                records = list(node_store.iter_stream(f'node-{k}'))
+                if len(records) != 600:
+                    print(f"❌ Node {k} stored {len(records)} records instead of 600")
+                    return False
+                adids.update(record['rtb_user']['id'] for record in records)
+
+            stats = client.get(f'/api/traffic/stats/{campaign_id}').get_json()['data']
+            estimate = stats['unique_adids_estimate']
+            if not stats.get('distributed') or abs(estimate - len(adids)) > 0.05 * len(adids):
+                print(f"❌ Unexpected distributed stats: estimate {estimate}, actual {len(adids)}")
+                return False
+            print(f"✅ /stats merges node sketches: ~{estimate} unique ADIDs (actual {len(adids)})")
+
+            print("\n🎉 Distributed generation test passed!")
+            return True
+
+        finally:
+            for process, _ in workers:
+                process.terminate()
+                process.wait(timeout=10)
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir)
+            print(f"🧹 Cleaned up temporary directory: {temp_dir}")
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_distributed_generation()
+    sys.exit(0 if success else 1)
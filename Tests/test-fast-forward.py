@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script to verify fast-forward generation against a virtual clock
+"""
+
+import json
+import sys
+import os
+import time
+import tempfile
+import shutil
+from datetime import datetime
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_fast_forward():
+    """Test that a fast-forward run materialises the whole campaign without waiting"""
+
+    print("🧪 Testing Fast-Forward Generation...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        try:
+            client = app.test_client()
+
+            # Create a profile and a 3 minute campaign at 120 requests per minute
+            profile = client.post('/api/profiles/', json={
+                "name": "Fast forward profile",
+                "description": "Profile for fast-forward test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "Fast forward campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 50},
+                "requests_per_minute": 120,
+                "duration_minutes": 3,
+                "config": {"randomize_timing": False}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+
+            print(f"✅ Created campaign {campaign_id}")
+
+            start = time.time()
+            response = client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id,
+                "fast_forward": True,
+                "virtual_start_time": "2025-01-01T00:00:00"
+            })
+            if response.status_code != 200 or not response.get_json()['config']['fast_forward']:
+                print(f"❌ Fast-forward generation did not start: {response.get_json()}")
+                return False
+
+            while campaign_id in traffic_module.active_threads:
+                if time.time() - start > 120:
+                    print("❌ Fast-forward run did not finish in time")
+                    return False
+                time.sleep(0.2)
+            elapsed = time.time() - start
+            print(f"✅ Fast-forward run finished in {elapsed:.1f}s for a 180s campaign")
+
+            status = client.get(f'/api/traffic/status/{campaign_id}').get_json()['data']
+            if status['total_requests'] != 360:
+                print(f"❌ Expected 360 requests, got {status['total_requests']}")
+                return False
+            print(f"✅ Status reports {status['total_requests']} requests")
+
+            with open(os.path.join(temp_dir, campaign_id, 'status.json')) as f:
+                status_file = json.load(f)
+            if status_file.get('status') != 'completed' or not status_file.get('virtual_time'):
+                print(f"❌ Unexpected final status: {status_file}")
+                return False
+            print(f"✅ Final status is completed at virtual time {status_file['virtual_time']}")
+
+            # Timestamps follow the configured pacing on the virtual timeline
+            traffic = client.get(f'/api/traffic/generated/{campaign_id}').get_json()
+            records = [value for key, value in traffic.items() if isinstance(value, dict) and 'seq' in value]
+            records.sort(key=lambda record: record['seq'])
+            first = datetime.fromisoformat(records[0]['timestamp'])
+            last = datetime.fromisoformat(records[-1]['timestamp'])
+            if not (first.year == 2025 and 175 <= (last - first).total_seconds() <= 181):
+                print(f"❌ Timestamps do not span the virtual campaign: {first} - {last}")
+                return False
+            print(f"✅ Timestamps span {first} - {last}")
+
+            print("\n🎉 Fast-forward test passed!")
+            return True
+
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir)
+            print(f"🧹 Cleaned up temporary directory: {temp_dir}")
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_fast_forward()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script to verify real HTTP dispatch of generated requests to target_url
+"""
+
+import json
+import sys
+import os
+import time
+import socket
+import asyncio
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from aiohttp import web
+
+def start_stand_in_server(received):
+    """Start a local bidder that records every request and bids on even RTB IDs"""
+    async def handle(request):
+        body = await request.read()
+        received.append({"method": request.method, "headers": dict(request.headers), "body": body})
+        if request.method != 'POST':
+            return web.Response(text="ok")
+        rtb_request = json.loads(body)
+        if int(rtb_request["id"][-1], 16) % 2:
+            return web.Response(status=204)
+        return web.json_response({"id": rtb_request["id"], "cur": "EUR",
+                                  "seatbid": [{"bid": [{"id": f"bid-{rtb_request['id']}", "price": 2.5}]}]})
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port).start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/bid"
+
+def test_http_dispatch():
+    """Test that HTTP dispatch sends OpenRTB requests and records the real responses"""
+
+    print("🧪 Testing HTTP Dispatch...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.dispatch import HttpDispatcher, build_http_request
+
+        print("✅ Successfully imported backend app")
+
+        received = []
+        url = start_stand_in_server(received)
+
+        # A plain request is a GET carrying the generated headers
+        method, _, headers, body = build_http_request({"target_url": url, "referrer": "https://ref.example",
+                                                       "rtb_device": {"ua": "UA/1.0", "ip": "1.2.3.4"}})
+        if method != 'GET' or body is not None or headers["Referer"] != "https://ref.example" or headers["X-Forwarded-For"] != "1.2.3.4":
+            print(f"❌ Unexpected plain request: {method} {headers}")
+            return False
+        print("✅ Requests without RTB data are plain GETs")
+
+        dispatcher = HttpDispatcher(concurrency=4, timeout=2)
+        try:
+            failed = dispatcher.dispatch({"target_url": "http://127.0.0.1:1/closed"})
+        finally:
+            dispatcher.close()
+        if failed["success"] or failed["status_code"] is not None or not failed.get("error"):
+            print(f"❌ Connection failure not recorded: {failed}")
+            return False
+        print("✅ Connection failures are recorded as unsuccessful requests")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        try:
+            client = app.test_client()
+
+            profile = client.post('/api/profiles/', json={
+                "name": "Dispatch profile",
+                "description": "Profile for HTTP dispatch test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "Dispatch campaign",
+                "target_url": url,
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 50},
+                "requests_per_minute": 120,
+                "duration_minutes": 1,
+                "rtb_config": {"device_brand": "samsung"},
+                "config": {"randomize_timing": False, "dispatch_mode": "http", "http_concurrency": 8,
+                           "http_headers": {"X-Campaign-Test": "yes"}}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+
+            start = time.time()
+            client.post('/api/traffic/generate', json={"campaign_id": campaign_id, "fast_forward": True})
+            while campaign_id in traffic_module.active_threads:
+                if time.time() - start > 60:
+                    print("❌ Dispatch run did not finish in time")
+                    return False
+                time.sleep(0.2)
+
+            if len(received) != 120:
+                print(f"❌ Expected 120 bid requests at the stand-in server, got {len(received)}")
+                return False
+            bid_requests = received
+            if any(r["method"] != "POST" or r["headers"].get("x-openrtb-version") != "2.5"
+                   or r["headers"].get("X-Campaign-Test") != "yes" for r in bid_requests):
+                print("❌ Bid requests are missing the OpenRTB or custom headers")
+                return False
+            print(f"✅ Stand-in server received {len(bid_requests)} OpenRTB POSTs")
+
+            records = {record["rtb_id"]: record for record in traffic_module.load_campaign_traffic(campaign_id).values()}
+            for request in bid_requests:
+                rtb_request = json.loads(request["body"])
+                record = records.get(rtb_request["id"])
+                if record is None or request["headers"]["User-Agent"] != record["rtb_device"]["ua"]:
+                    print(f"❌ Bid request {rtb_request['id']} does not match a generated record")
+                    return False
+                if rtb_request["device"]["ip"] != request["headers"]["X-Forwarded-For"]:
+                    print("❌ X-Forwarded-For does not carry the device IP")
+                    return False
+                bids = int(rtb_request["id"][-1], 16) % 2 == 0
+                expected_status = 200 if bids else 204
+                if record["status_code"] != expected_status or (record["win_price"] == 2.5) != bids:
+                    print(f"❌ Record does not hold the real response: {record['status_code']} {record['win_price']}")
+                    return False
+                if bids and (record["currency"] != "EUR" or record["bid_id"] != f"bid-{rtb_request['id']}"):
+                    print(f"❌ Bid response not parsed: {record['bid_id']} {record['currency']}")
+                    return False
+            print("✅ Records hold the real status codes and bid responses")
+
+            latencies = [record["response_time"] for record in records.values()]
+            if not all(0 < latency < 2000 for latency in latencies):
+                print(f"❌ Unexpected latencies: {min(latencies)}-{max(latencies)}ms")
+                return False
+            print(f"✅ Real latencies recorded ({min(latencies)}-{max(latencies)}ms)")
+
+            invalid_options = [("dispatch_mode", "HTTP"), ("dispatch_mode", "htpp"), ("http_concurrency", 0), ("http_concurrency", "many"), ("http_limit_per_host", -1),
+                               ("http_timeout", "slow"), ("http_timeout", 0), ("http_headers", ["X-Test"])]
+            for option, value in invalid_options:
+                session = client.post('/api/sessions/', json={
+                    "name": f"Invalid {option}",
+                    "target_url": url,
+                    "user_profile_ids": [profile['id']],
+                    "profile_user_counts": {profile['id']: 50},
+                    "config": {"dispatch_mode": "http", option: value}
+                }).get_json()
+                client.put(f"/api/traffic/campaigns/{session['id']}/status", json={"status": "running"})
+                response = client.post('/api/traffic/generate', json={"campaign_id": session['id']})
+                if response.status_code != 400 or session['id'] in traffic_module.active_threads:
+                    print(f"❌ {option}={value!r} should be rejected with 400, got {response.status_code}")
+                    return False
+            print(f"✅ {len(invalid_options)} invalid HTTP options are rejected with 400")
+
+            print("\n🎉 HTTP dispatch test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_http_dispatch()
+    sys.exit(0 if success else 1)
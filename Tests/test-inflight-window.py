@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that live requests complete asynchronously within an in-flight window
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_inflight_window():
+    """Test that request latency no longer caps the rate of a live campaign"""
+
+    print("🧪 Testing In-Flight Request Window...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.inflight import InFlightWindow, MIN_IN_FLIGHT
+
+        print("✅ Successfully imported backend app")
+
+        # Auto-tuned windows follow Little's law: arrival rate x mean latency, with headroom
+        config = traffic_module.TrafficConfig(campaign_id="window-test", target_url="https://example.com",
+                                              requests_per_minute=6000)
+        window = InFlightWindow(config)
+        window.mean_latency = 0.25
+        if window.limit != 51:
+            print(f"❌ Expected an auto-tuned window of 51 at 100 req/s and 250ms, got {window.limit}")
+            return False
+        config.requests_per_minute = 6
+        if InFlightWindow(config).limit != MIN_IN_FLIGHT:
+            print("❌ Slow campaigns should keep the minimum window")
+            return False
+        print("✅ Auto-tuned window follows Little's law")
+
+        # A fixed window blocks once it is full and hands back completions
+        window = InFlightWindow(config, max_in_flight=20)
+        completed = []
+        peak = 0
+        start = time.time()
+        for i in range(100):
+            completed.extend(window.submit({"id": str(i), "timestamp": "2025-01-01T00:00:00"}))
+            peak = max(peak, len(window))
+        completed.extend(window.drain())
+        elapsed = time.time() - start
+        if peak > 20 or len(completed) != 100 or len({r["id"] for r in completed}) != 100:
+            print(f"❌ Window of 20 peaked at {peak} and completed {len(completed)} requests")
+            return False
+        if not all("status_code" in r and r["response_time"] > 0 for r in completed):
+            print("❌ Completed requests are missing their response")
+            return False
+        # 100 requests of ~275ms mean latency, 20 at a time, take ~1.4s instead of ~27s inline
+        if elapsed > 5:
+            print(f"❌ Requests did not overlap: {elapsed:.1f}s")
+            return False
+        print(f"✅ 100 simulated requests completed in {elapsed:.1f}s with at most {peak} in flight")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        try:
+            client = app.test_client()
+
+            profile = client.post('/api/profiles/', json={
+                "name": "Window profile",
+                "description": "Profile for in-flight window test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "Window campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 50},
+                "requests_per_minute": 600,
+                "duration_minutes": 1,
+                "config": {"randomize_timing": False}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+
+            client.post('/api/traffic/generate', json={"campaign_id": campaign_id})
+            time.sleep(5)
+            status = client.get(f'/api/traffic/status/{campaign_id}').get_json()['data']
+            client.post(f'/api/traffic/stop/{campaign_id}')
+            deadline = time.time() + 10
+            while any(t.name.endswith(campaign_id) and t.is_alive() for t in threading.enumerate()):
+                if time.time() > deadline:
+                    break
+                time.sleep(0.1)
+
+            if "max_in_flight" not in status:
+                print(f"❌ Status does not report the in-flight window: {status}")
+                return False
+            saved = traffic_module.get_campaign_store(campaign_id).counters()["total_requests"]
+            # At 10 req/s with inline latency the campaign managed fewer than 15 requests in 5s
+            if saved < 30:
+                print(f"❌ Expected about 50 requests in 5s at 600 RPM, got {saved}")
+                return False
+            print(f"✅ Live campaign kept its rate: {saved} requests in 5s at 600 RPM (window {status['max_in_flight']})")
+
+            for value in ("lots", 0, [4]):
+                session = client.post('/api/sessions/', json={
+                    "name": "Invalid window",
+                    "target_url": "https://example.com",
+                    "user_profile_ids": [profile['id']],
+                    "profile_user_counts": {profile['id']: 50},
+                    "config": {"max_in_flight": value}
+                }).get_json()
+                client.put(f"/api/traffic/campaigns/{session['id']}/status", json={"status": "running"})
+                response = client.post('/api/traffic/generate', json={"campaign_id": session['id']})
+                if response.status_code != 400 or session['id'] in traffic_module.active_threads:
+                    print(f"❌ max_in_flight={value!r} should be rejected with 400, got {response.status_code}")
+                    return False
+            print("✅ Invalid max_in_flight values are rejected with 400")
+
+            print("\n🎉 In-flight window test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_inflight_window()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the server-sent events stream of live campaign monitoring
+"""
+
+import json
+import sys
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_monitor_stream():
+    """Test snapshots, coalesced deltas and keep-alives of /monitor/<id>/stream"""
+
+    print("🧪 Testing Monitor Stream...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.etags import bump_campaign_version
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        original_heartbeat = traffic_module.MONITOR_STREAM_HEARTBEAT
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = 'streamed-campaign'
+            store = traffic_module.get_campaign_store(campaign_id)
+            store.append_batch([{"id": f"r{i}", "success": i % 2 == 0} for i in range(10)])
+
+            def commit(count, delay=0.0):
+                # What a generator does for every batch it writes
+                time.sleep(delay)
+                store.append_batch([{"id": f"c{time.time()}-{i}", "success": True} for i in range(count)])
+                bump_campaign_version(campaign_id)
+
+            def read_events(response):
+                """Yield (event, data) pairs, and (None, comment) for comments"""
+                for chunk in response.response:
+                    for block in chunk.decode().split('\n\n'):
+                        if block.startswith(':'):
+                            yield None, block
+                        elif block.startswith('event: '):
+                            event, data = block.split('\n')
+                            yield event[len('event: '):], json.loads(data[len('data: '):])
+
+            response = client.get(f'/api/traffic/monitor/{campaign_id}/stream?max_rate=20', buffered=False)
+            if response.mimetype != 'text/event-stream' or 'Content-Encoding' in response.headers:
+                print("❌ The monitor stream should be an uncompressed text/event-stream")
+                return False
+            events = read_events(response)
+            event, snapshot = next(events)
+            if event != 'snapshot' or snapshot['total_requests'] != 10 or snapshot['success_rate'] != 50.0:
+                print(f"❌ Unexpected first event: {event} {snapshot}")
+                return False
+            print("✅ Stream opens with a snapshot of the campaign status")
+
+            threading.Thread(target=commit, args=(5, 0.2)).start()
+            start = time.time()
+            event, delta = next(events)
+            if (event != 'delta' or delta['total_requests'] != 15 or delta['new_requests'] != 5
+                    or 'campaign_id' in delta or 'requests_per_minute' not in delta):
+                print(f"❌ Unexpected delta: {event} {delta}")
+                return False
+            print(f"✅ Committed records arrive as a delta {time.time() - start:.2f}s after the commit started")
+            response.close()
+
+            # Commits faster than max_rate are coalesced
+            response = client.get(f'/api/traffic/monitor/{campaign_id}/stream?max_rate=2', buffered=False)
+            events = read_events(response)
+            next(events)
+
+            def burst():
+                for _ in range(20):
+                    commit(1, 0.05)
+
+            burst_thread = threading.Thread(target=burst)
+            burst_thread.start()
+            deltas = []
+            start = time.time()
+            while sum(delta['new_requests'] for delta in deltas) < 20:
+                event, delta = next(events)
+                deltas.append(delta)
+            elapsed = time.time() - start
+            burst_thread.join()
+            response.close()
+            if len(deltas) > elapsed * 2 + 1 or len(deltas) >= 20:
+                print(f"❌ {len(deltas)} events in {elapsed:.2f}s exceed the max rate")
+                return False
+            print(f"✅ 20 commits were coalesced into {len(deltas)} events in {elapsed:.2f}s")
+
+            # Idle streams send keep-alive comments
+            traffic_module.MONITOR_STREAM_HEARTBEAT = 0.3
+            response = client.get(f'/api/traffic/monitor/{campaign_id}/stream', buffered=False)
+            events = read_events(response)
+            next(events)
+            event, comment = next(events)
+            response.close()
+            if event is not None or 'keep-alive' not in comment:
+                print(f"❌ Expected a keep-alive comment, got {event}")
+                return False
+            print("✅ Idle streams send keep-alive comments")
+
+            for max_rate in ('0', '100', 'fast'):
+                if client.get(f'/api/traffic/monitor/{campaign_id}/stream?max_rate={max_rate}').status_code != 400:
+                    print(f"❌ max_rate={max_rate} should be rejected")
+                    return False
+            print("✅ Invalid max_rate values are rejected")
+
+            print("\n🎉 Monitor stream test passed!")
+            return True
+        finally:
+            traffic_module.MONITOR_STREAM_HEARTBEAT = original_heartbeat
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_monitor_stream()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that compiled record templates produce the same records as the uncompiled path
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def build_uncompiled_record(traffic_module, config, timestamp, index, seed):
+    """Record ``index`` built the way generate_traffic_data did before templates"""
+    from app.api.seeding import record_rng
+
+    rng = record_rng(seed, index)
+    traffic_data = {"id": str(int((timestamp - datetime(1970, 1, 1)).total_seconds() * 1000)),
+                    "timestamp": timestamp.isoformat()}
+    traffic_data.update({
+        "campaign_id": config.campaign_id,
+        "target_url": config.target_url,
+        "requests_per_minute": config.requests_per_minute,
+        "duration_minutes": config.duration_minutes,
+        "geo_locations": config.geo_locations,
+        "rtb_config": config.rtb_config,
+        "config": config.config,
+        "user_profile_ids": config.user_profile_ids,
+        "profile_user_counts": config.profile_user_counts,
+        "total_profile_users": config.total_profile_users
+    })
+    selected_profile = traffic_module.get_profile_sampler(config).sample(rng)
+    traffic_module.assign_profile_referrer(traffic_data, config, selected_profile, rng)
+    if config.rtb_config:
+        traffic_module.add_rtb_fields(traffic_data, traffic_module.generate_rtb_data(
+            config.rtb_config, config, profile_id=selected_profile.get("id"),
+            country=traffic_data["selected_country"], rng=rng))
+    return traffic_data
+
+def test_record_template():
+    """Test that template records match uncompiled records field for field and in key order"""
+
+    print("🧪 Testing Record Templates...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.profiles import profiles
+        from app.api.adids import CampaignAdids
+        from app.api.record_template import get_record_template, discard_record_template
+
+        print("✅ Successfully imported record template module")
+
+        client = app.test_client()
+        profile_ids = []
+        for name, brand in (("Sports fans", "samsung"), ("Music fans", "apple")):
+            profile = client.post('/api/profiles/', json={
+                "name": name,
+                "description": "Profile for record template test",
+                "demographics": {"interests": ["sports", "music"], "countries": ["United States", "Canada"]},
+                "device_preferences": {"device_brand": brand},
+                "referrers": {"sports|Canada": ["https://chatgpt.com/c/1", "https://perplexity.ai/s/2"]}
+            }).get_json()
+            profile_ids.append(profile['id'])
+
+        def make_config(campaign_id, rtb_config):
+            config = traffic_module.TrafficConfig(
+                campaign_id=campaign_id,
+                target_url="https://example.com",
+                requests_per_minute=60,
+                duration_minutes=10,
+                geo_locations=["United States", "Canada"],
+                rtb_config=rtb_config,
+                user_profile_ids=profile_ids,
+                profile_user_counts={profile_ids[0]: 300, profile_ids[1]: 100},
+                campaign_referrers={"music|United States": ["https://gemini.google.com/app/3"]}
+            )
+            config.user_profiles = [profiles[pid].__dict__ for pid in profile_ids]
+            traffic_module.campaign_adids[campaign_id] = CampaignAdids(1234, config.profile_user_counts)
+            return config
+
+        start = datetime(2025, 1, 1)
+        cases = {
+            "pooled devices": {"device_brand": "samsung", "bidfloor": 0.5, "site_domain": "news.example"},
+            "fixed device": {"ua": "TestAgent/1.0", "ip": "10.0.0.1", "user_id": "fixed-user", "cur": ["EUR"]},
+            "no RTB": {}
+        }
+        for name, rtb_config in cases.items():
+            campaign_id = f"template-{name.replace(' ', '-')}"
+            config = make_config(campaign_id, rtb_config)
+            timestamps = [start + timedelta(seconds=i) for i in range(300)]
+            expected = [json.dumps(build_uncompiled_record(traffic_module, config, timestamps[i], i, 1234))
+                        for i in range(300)]
+            single = [json.dumps(traffic_module.generate_traffic_data(config, timestamps[i], index=i))
+                      for i in range(300)]
+            batch = [json.dumps(record) for record in traffic_module.generate_traffic_batch(
+                config, 300, timestamps=timestamps, indices=list(range(300)))]
+            if single != expected or batch != expected:
+                mismatch = next(i for i in range(300) if single[i] != expected[i] or batch[i] != expected[i])
+                print(f"❌ Record {mismatch} differs with {name}:\n   {expected[mismatch]}\n   {single[mismatch]}")
+                return False
+            print(f"✅ Template records match uncompiled records with {name}")
+
+        records = traffic_module.generate_traffic_batch(config, 50, timestamps=[start] * 50, indices=list(range(50)))
+        if not any(record["referrer"] for record in records):
+            print("❌ Referrers not assigned")
+            return False
+
+        config = make_config("template-cache", {"device_brand": "google"})
+        template = get_record_template(config)
+        if get_record_template(config) is not template:
+            print("❌ Template should be compiled once per config")
+            return False
+        other = make_config("template-cache", {"device_brand": "apple"})
+        if get_record_template(other) is template:
+            print("❌ Another config should get its own template")
+            return False
+        discard_record_template("template-cache")
+        print("✅ Templates are compiled once per campaign config")
+
+        try:
+            traffic_module.generate_traffic_data(traffic_module.TrafficConfig(campaign_id="template-bad", target_url=""))
+            print("❌ Configs without a target URL should be rejected")
+            return False
+        except ValueError:
+            print("✅ Invalid configs are rejected at compile time")
+
+        print("\n🎉 Record template test passed!")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Failed to import record template module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_record_template()
+    sys.exit(0 if success else 1)
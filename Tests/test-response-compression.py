@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script to verify negotiated response compression and precompressed segment downloads
+"""
+
+import gzip
+import json
+import sys
+import os
+import random
+import zlib
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_response_compression():
+    """Test gzip/deflate negotiation, streamed compression and sealed segment splicing"""
+
+    print("🧪 Testing Response Compression...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.compression import crc32_combine, COMPRESSION_MIN_SIZE
+        from app.api.traffic_store import SegmentWriter, close_store, list_segments, read_sealed, COMPRESSED_SUFFIX, MANIFEST_FILENAME
+
+        print("✅ Successfully imported backend app")
+
+        for _ in range(20):
+            first = os.urandom(random.randint(0, 5000))
+            second = os.urandom(random.randint(1, 5000))
+            if crc32_combine(zlib.crc32(first), zlib.crc32(second), len(second)) != zlib.crc32(first + second):
+                print("❌ crc32_combine does not match the CRC of the concatenation")
+                return False
+        print("✅ crc32_combine matches the CRC of concatenated blocks")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            # Small segments so the campaign has many sealed ones
+            campaign_id = 'compressed-campaign'
+            store = traffic_module.get_campaign_store(campaign_id)
+            store.writers['main'] = SegmentWriter(os.path.join(store.segments_dir, 'main'), max_segment_size=50000,
+                                                  on_seal=None)
+            for batch in range(20):
+                store.append_batch([{"id": f"{batch}-{i}", "success": random.random() < 0.7,
+                                     "payload": "z" * random.randint(10, 400)} for i in range(100)])
+            segments = list_segments(os.path.join(store.segments_dir, 'main'))
+            print(f"✅ Wrote 2000 records to {len(segments)} segments")
+
+            # Buffered JSON above the threshold, in both encodings
+            for i in range(5):
+                client.post('/api/profiles/', json={
+                    "name": f"Compression profile {i}",
+                    "description": "Profile for compression test " * 10,
+                    "demographics": {"interests": ["sports", "music"], "countries": ["United States"]}
+                })
+            plain = client.get('/api/profiles/')
+            if len(plain.data) < COMPRESSION_MIN_SIZE or 'Content-Encoding' in plain.headers:
+                print("❌ Responses should stay uncompressed without Accept-Encoding")
+                return False
+            for encoding, decompress in (('gzip', gzip.decompress), ('deflate', zlib.decompress)):
+                response = client.get('/api/profiles/', headers={"Accept-Encoding": encoding})
+                if (response.headers.get('Content-Encoding') != encoding or 'Accept-Encoding' not in response.vary
+                        or decompress(response.data) != plain.data):
+                    print(f"❌ Unexpected {encoding} response")
+                    return False
+            print(f"✅ {len(plain.data)} byte JSON response is compressed with gzip or deflate as accepted")
+
+            small = client.get('/api/traffic/status/unknown-campaign', headers={"Accept-Encoding": "gzip"})
+            if 'Content-Encoding' in small.headers:
+                print("❌ Responses below the size threshold should not be compressed")
+                return False
+            print("✅ Responses below the size threshold are sent as they are")
+
+            # Streamed downloads compressed chunk by chunk
+            def document(data):
+                parsed = json.loads(data)
+                parsed.pop('download_time')
+                return parsed
+
+            reference = client.get(f'/api/traffic/download/{campaign_id}?format=json').data
+            response = client.get(f'/api/traffic/download/{campaign_id}?format=json', headers={"Accept-Encoding": "deflate"})
+            if response.headers.get('Content-Encoding') != 'deflate' or document(zlib.decompress(response.data)) != document(reference):
+                print("❌ Streamed JSON download should be deflate compressed")
+                return False
+            print("✅ Streamed downloads are compressed as they are sent")
+
+            # Gzip NDJSON downloads splice the precompressed sealed segments
+            def without_time(data):
+                lines = data.split(b'\n')
+                trailer = json.loads(lines[-2])['trailer']
+                trailer.pop('download_time')
+                return lines[:-2], trailer
+
+            reference = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson').data
+            response = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson', headers={"Accept-Encoding": "gzip"})
+            # gzip.decompress checks the spliced CRC and size
+            if response.headers.get('Content-Encoding') != 'gzip' or without_time(gzip.decompress(response.data)) != without_time(reference):
+                print("❌ Spliced gzip download differs from the uncompressed one")
+                return False
+            # Segments rolled without a sealer are sealed by the first download
+            sealed = read_sealed(os.path.join(store.segments_dir, 'main'))
+            if len(sealed) != len(segments) - 1 or not all(os.path.exists(path + COMPRESSED_SUFFIX) for path in segments[:-1]):
+                print(f"❌ Expected {len(segments) - 1} sealed segments, found {len(sealed)}")
+                return False
+            print(f"✅ Gzip download splices {len(sealed)} precompressed segments with a valid CRC")
+
+            # Records appended after sealing are compressed on the fly behind the sealed ones
+            store.append_batch([{"id": f"late-{i}", "success": True, "payload": "w" * 300} for i in range(500)])
+            reference = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson').data
+            response = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson', headers={"Accept-Encoding": "gzip"})
+            lines, trailer = without_time(gzip.decompress(response.data))
+            if (lines, trailer) != without_time(reference) or trailer['total_requests'] != 2500:
+                print("❌ Gzip download after new writes differs from the uncompressed one")
+                return False
+            print("✅ Records after the sealed segments are compressed as they are sent")
+
+            # Writers opened after a roll, from the manifest or from the files, never append to a sealed segment
+            stream_dir = os.path.join(store.segments_dir, 'main')
+            total = 2500
+            for reopen in ('manifest', 'files'):
+                store.writer().roll()
+                client.get(f'/api/traffic/download/{campaign_id}?format=ndjson', headers={"Accept-Encoding": "gzip"}).data
+                store.save_manifest()
+                close_store(os.path.join(temp_dir, campaign_id))
+                if reopen == 'files':
+                    # As if the writer stopped before starting its next segment
+                    os.remove(list_segments(stream_dir)[-1])
+                    os.remove(os.path.join(store.segments_dir, MANIFEST_FILENAME))
+                store = traffic_module.get_campaign_store(campaign_id)
+                store.append_batch([{"id": f"{reopen}-{i}", "success": True} for i in range(3)])
+                total += 3
+                reference = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson').data
+                response = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson', headers={"Accept-Encoding": "gzip"})
+                lines, trailer = without_time(gzip.decompress(response.data))
+                if (lines, trailer) != without_time(reference) or trailer['total_requests'] != total:
+                    print(f"❌ Gzip download after reopening from the {reopen} differs from the uncompressed one")
+                    return False
+            sealed = read_sealed(stream_dir)
+            if any(os.path.getsize(os.path.join(stream_dir, name)) != info['size'] for name, info in sealed.items()):
+                print("❌ Sealed segments changed after they were sealed")
+                return False
+            print("✅ Stores reopened after a roll append to a new segment, never to a sealed one")
+
+            print("\n🎉 Response compression test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_response_compression()
+    sys.exit(0 if success else 1)
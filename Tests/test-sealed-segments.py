@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the manifest and Range downloads of sealed traffic segments
+"""
+
+import hashlib
+import sys
+import os
+import zlib
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_sealed_segments():
+    """Test /segments/<id> and ranged, conditional downloads of its segments"""
+
+    print("🧪 Testing Sealed Segments...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = 'sealed-campaign'
+            store = traffic_module.get_campaign_store(campaign_id)
+            for segment in range(3):
+                store.append_batch([{"id": f"r{segment}-{i}", "success": i % 3 != 0} for i in range(500)])
+                if segment < 2:
+                    store.writer().roll()
+
+            body = client.get(f'/api/traffic/segments/{campaign_id}').get_json()
+            segments = body['data']['streams']['main']
+            if (len(segments) != 2 or body['data']['sealed_records'] != 1000 or body['data']['total_requests'] != 1500
+                    or segments[0]['first_seq'] != 1 or segments[1]['last_seq'] != 1000
+                    or segments[0]['successful_requests'] != 333):
+                print(f"❌ Unexpected manifest: {body}")
+                return False
+            print("✅ The manifest lists the sealed segments with sizes, seq ranges and checksums")
+
+            segment = segments[0]
+            response = client.get(segment['url'])
+            data = response.data
+            if (response.status_code != 200 or len(data) != segment['size']
+                    or hashlib.sha256(data).hexdigest() != segment['sha256'] or response.headers.get('Accept-Ranges') != 'bytes'
+                    or not response.cache_control.immutable or 'Content-Encoding' in response.headers):
+                print(f"❌ Unexpected segment download: {response.status_code} {response.headers}")
+                return False
+            print(f"✅ Segment downloads as {len(data)} immutable bytes matching its SHA-256")
+
+            # Parallel ranges of a segment join into the whole segment
+            middle = segment['size'] // 2
+            parts = [client.get(segment['url'], headers={"Range": f"bytes={start}-{end}"})
+                     for start, end in ((0, middle - 1), (middle, segment['size'] - 1))]
+            if ([part.status_code for part in parts] != [206, 206] or b''.join(part.data for part in parts) != data
+                    or parts[1].headers['Content-Range'] != f"bytes {middle}-{segment['size'] - 1}/{segment['size']}"):
+                print(f"❌ Unexpected range responses: {[part.headers.get('Content-Range') for part in parts]}")
+                return False
+            print("✅ Byte ranges fetched in parallel join into the segment")
+
+            etag = response.get_etag()[0]
+            resumed = client.get(segment['url'], headers={"Range": f"bytes={middle}-", "If-Range": f'"{etag}"'})
+            restarted = client.get(segment['url'], headers={"Range": f"bytes={middle}-", "If-Range": '"stale"'})
+            cached = client.get(segment['url'], headers={"If-None-Match": f'"{etag}"'})
+            if (resumed.status_code != 206 or resumed.data != data[middle:] or restarted.status_code != 200
+                    or restarted.data != data or cached.status_code != 304):
+                print(f"❌ Unexpected conditional responses: {resumed.status_code} {restarted.status_code} {cached.status_code}")
+                return False
+            unsatisfiable = client.get(segment['url'], headers={"Range": f"bytes={segment['size'] + 10}-"})
+            if unsatisfiable.status_code != 416:
+                print(f"❌ Ranges past the end should return 416, got {unsatisfiable.status_code}")
+                return False
+            print("✅ If-Range resumes a matching download and restarts a changed one")
+
+            compressed = client.get(segment['compressed_url']).data
+            if len(compressed) != segment['compressed_size'] or zlib.decompressobj(-zlib.MAX_WBITS).decompress(compressed) != data:
+                print("❌ The compressed segment should inflate to the segment")
+                return False
+            print("✅ Compressed segments inflate to the sealed bytes")
+
+            # A sealed segment whose file changed is sealed again instead of dropped
+            with open(os.path.join(store.segments_dir, 'main', segment['name']), 'ab') as f:
+                f.write(b'{"id":"appended","success":true,"seq":1501}\n')
+            segments = client.get(f'/api/traffic/segments/{campaign_id}').get_json()['data']['streams']['main']
+            response = client.get(segments[0]['url'])
+            if (len(segments) != 2 or segments[0]['records'] != 501 or response.status_code != 200
+                    or hashlib.sha256(response.data).hexdigest() != segments[0]['sha256']):
+                print(f"❌ A changed sealed segment should be sealed again: {[s['records'] for s in segments]} {response.status_code}")
+                return False
+            print("✅ Sealed segments whose file changed are sealed again with new checksums")
+
+            for url in (f'/api/traffic/segments/{campaign_id}/main/000003.ndjson',
+                        f'/api/traffic/segments/{campaign_id}/main/sealed.json',
+                        f'/api/traffic/segments/{campaign_id}/other/000001.ndjson',
+                        '/api/traffic/segments/no-campaign', '/api/traffic/segments/no-campaign/main/000001.ndjson'):
+                if client.get(url).status_code != 404:
+                    print(f"❌ {url} should not be served")
+                    return False
+            print("✅ Open segments, other files and unknown campaigns are not served")
+
+            print("\n🎉 Sealed segments test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_sealed_segments()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify a campaign split across worker processes
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_sharded_generation():
+    """Test that worker processes write disjoint shards that merge into one campaign"""
+
+    print("🧪 Testing Sharded Generation...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        temp_dir = tempfile.mkdtemp()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        try:
+            client = app.test_client()
+            profile = client.post('/api/profiles/', json={
+                "name": "Sharded profile",
+                "description": "Profile for sharding test",
+                "demographics": {"interests": ["sports"], "countries": ["United States"]}
+            }).get_json()
+            session = client.post('/api/sessions/', json={
+                "name": "Sharded campaign",
+                "target_url": "https://example.com",
+                "user_profile_ids": [profile['id']],
+                "profile_user_counts": {profile['id']: 1000},
+                "requests_per_minute": 600,
+                "duration_minutes": 2,
+                "config": {"randomize_timing": False}
+            }).get_json()
+            campaign_id = session['id']
+            client.put(f'/api/traffic/campaigns/{campaign_id}/status', json={"status": "running"})
+
+            for workers in ("many", 0, -2):
+                if client.post('/api/traffic/generate', json={"campaign_id": campaign_id, "workers": workers}).status_code != 400:
+                    print(f"❌ workers={workers!r} should be rejected with 400")
+                    return False
+            print("✅ Invalid worker counts are rejected")
+
+            response = client.post('/api/traffic/generate', json={
+                "campaign_id": campaign_id,
+                "fast_forward": True,
+                "workers": 2,
+                "virtual_start_time": "2025-01-01T00:00:00"
+            }).get_json()
+            if response['config']['workers'] != 2:
+                print(f"❌ Workers option not applied: {response['config']}")
+                return False
+
+            start = time.time()
+            while campaign_id in traffic_module.active_threads:
+                if time.time() - start > 120:
+                    print("❌ Sharded run did not finish in time")
+                    return False
+                time.sleep(0.2)
+            print(f"✅ Sharded run finished in {time.time() - start:.1f}s")
+
+            status = client.get(f'/api/traffic/status/{campaign_id}').get_json()['data']
+            if status['total_requests'] != 1200:
+                print(f"❌ Expected 1200 merged requests, got {status['total_requests']}")
+                return False
+            print("✅ Parent merged the worker counters")
+
+            store = traffic_module.get_campaign_store(campaign_id)
+            if not {'shard-0', 'shard-1'} <= set(store.stream_names()):
+                print(f"❌ Missing shard streams: {store.stream_names()}")
+                return False
+            seqs = [record['seq'] for record in store.iter_records()]
+            if len(seqs) != 1200 or len(set(seqs)) != 1200 or seqs != sorted(seqs):
+                print("❌ Merged records do not have unique, ordered sequence numbers")
+                return False
+            print("✅ Each worker wrote its own stream and readers merge them in seq order")
+
+            shard_adids = [{record['rtb_user']['id'] for record in store.iter_stream(f'shard-{k}')} for k in range(2)]
+            if not all(shard_adids) or shard_adids[0] & shard_adids[1]:
+                print("❌ Workers share ADIDs")
+                return False
+            print(f"✅ Workers used disjoint ADID slices ({len(shard_adids[0])} / {len(shard_adids[1])} ADIDs)")
+
+            print("\n🎉 Sharded generation test passed!")
+            return True
+
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir)
+            print(f"🧹 Cleaned up temporary directory: {temp_dir}")
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_sharded_generation()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streamed campaign traffic downloads
+"""
+
+import json
+import sys
+import os
+import tempfile
+import shutil
+import tracemalloc
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_streaming_download():
+    """Test NDJSON and JSON array downloads streamed in constant memory"""
+
+    print("🧪 Testing Streaming Download...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = 'download-campaign'
+            os.makedirs(os.path.join(temp_dir, campaign_id))
+            with open(os.path.join(temp_dir, campaign_id, 'traffic.json'), 'w') as f:
+                json.dump({"legacy_1": {"id": "legacy_1", "success": True}}, f)
+            store = traffic_module.get_campaign_store(campaign_id)
+            for batch in range(20):
+                store.append_batch([{"id": f"{batch}-{i}", "success": i % 4 != 0, "payload": "p" * 1500}
+                                    for i in range(1000)])
+            store_size = sum(os.path.getsize(os.path.join(store.segments_dir, 'main', name))
+                             for name in os.listdir(os.path.join(store.segments_dir, 'main')))
+            print(f"✅ Wrote 20000 records, {store_size // (1024 * 1024)}MB of segments")
+
+            # NDJSON arrives chunk by chunk while memory stays flat
+            tracemalloc.start()
+            response = client.get(f'/api/traffic/download/{campaign_id}?format=ndjson', buffered=False)
+            if not response.is_streamed or response.mimetype != 'application/x-ndjson':
+                print("❌ NDJSON downloads should be streamed")
+                return False
+            lines = 0
+            tail = b''
+            successful = 0
+            for chunk in response.response:
+                data = tail + chunk
+                complete, _, tail = data.rpartition(b'\n')
+                for line in complete.split(b'\n') if complete else []:
+                    record = json.loads(line)
+                    if 'trailer' in record:
+                        trailer = record['trailer']
+                    else:
+                        lines += 1
+                        successful += record.get('success', False)
+            response.close()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if lines != 20001 or trailer['total_requests'] != 20001 or trailer['successful_requests'] != successful:
+                print(f"❌ Unexpected NDJSON download: {lines} lines, trailer {trailer}")
+                return False
+            print(f"✅ NDJSON download has {lines} records and a trailer with the totals")
+            if peak > store_size // 4:
+                print(f"❌ Streaming peaked at {peak // 1024}KB for {store_size // 1024}KB of records")
+                return False
+            print(f"✅ Memory peaked at {peak // 1024}KB for {store_size // 1024}KB of records")
+
+            document = json.loads(client.get(f'/api/traffic/download/{campaign_id}?format=json').data)
+            if (len(document['traffic_data']) != 20001 or document['total_requests'] != 20001
+                    or document['traffic_data'][1]['seq'] != 1 or document['campaign_id'] != campaign_id):
+                print("❌ Unexpected JSON array download")
+                return False
+            print("✅ JSON array download parses as one document with its totals at the end")
+
+            if client.get(f'/api/traffic/download/{campaign_id}?format=xml').status_code != 400:
+                print("❌ Unknown formats should be rejected")
+                return False
+            if client.get('/api/traffic/download/missing-campaign?format=ndjson').status_code != 404:
+                print("❌ Campaigns without traffic should return 404")
+                return False
+            legacy = client.get(f'/api/traffic/download/{campaign_id}').get_json()
+            if legacy['data']['total_requests'] != 20001:
+                print("❌ Downloads without a format should keep the legacy response")
+                return False
+            print("✅ Unknown formats, missing campaigns and legacy downloads behave as expected")
+
+            # Two worker streams still writing, the first one lagging
+            live_id = 'live-download-campaign'
+            live_store = traffic_module.get_campaign_store(live_id)
+            streams = ["shard-0", "shard-1"]
+            for shard, stream in enumerate(streams):
+                live_store.writer(stream, seq_start=shard + 1, seq_stride=2)
+
+            def download_seqs():
+                lines = client.get(f'/api/traffic/download/{live_id}?format=ndjson').data.splitlines()
+                return [json.loads(line)['seq'] for line in lines[:-1]], json.loads(lines[-1])['trailer']
+
+            live_store.begin_live_streams(streams, 0)
+            try:
+                live_store.append_batch([{"id": "lagging"} for _ in range(2)], stream="shard-0")
+                live_store.append_batch([{"id": "ahead"} for _ in range(4)], stream="shard-1")
+                while_writing, trailer = download_seqs()
+                live_store.append_batch([{"id": "lagging"} for _ in range(2)], stream="shard-0")
+            finally:
+                live_store.end_live_streams(streams)
+            finished, _ = download_seqs()
+            if while_writing != [1, 2, 3] or trailer['total_requests'] != 3 or finished != list(range(1, 9)):
+                print(f"❌ Unexpected downloads while a stream lags: {while_writing} then {finished}")
+                return False
+            print("✅ Downloads of a campaign still writing stop below the seqs a lagging stream has yet to write")
+
+            print("\n🎉 Streaming download test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_streaming_download()
+    sys.exit(0 if success else 1)
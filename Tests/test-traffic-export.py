@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the streamed CSV/TSV export of flattened traffic tables
+"""
+
+import csv
+import io
+import sys
+import os
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_traffic_export():
+    """Test /export/<id> tables, formats, chunking and filters"""
+
+    print("🧪 Testing Traffic Export...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.traffic_export import EXPORT_CHUNK_SIZE
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = 'export-campaign'
+            config = traffic_module.TrafficConfig(
+                campaign_id=campaign_id,
+                target_url="https://example.com",
+                requests_per_minute=60,
+                duration_minutes=10,
+                geo_locations=["United States", "Canada"],
+                rtb_config={"device_brand": "samsung", "bidfloor": 0.5, "site_domain": "news.example"}
+            )
+            start = datetime(2025, 1, 1)
+            times = [start + timedelta(seconds=i) for i in range(2000)]
+            records = traffic_module.simulate_request_batch(
+                traffic_module.generate_traffic_batch(config, 2000, timestamps=times), times)
+            store = traffic_module.get_campaign_store(campaign_id)
+            store.append_batch(records)
+            # A record without RTB fields has a row in records and requests only
+            store.append({"id": "plain", "timestamp": "2025-01-02T00:00:00", "success": False, "status_code": 500})
+
+            def export(query):
+                response = client.get(f'/api/traffic/export/{campaign_id}?{query}')
+                text = response.get_data(as_text=True)
+                delimiter = '\t' if 'format=tsv' in query else ','
+                return response, list(csv.reader(io.StringIO(text), delimiter=delimiter))
+
+            response, rows = export('table=records')
+            header, body = rows[0], rows[1:]
+            column_types = dict(pair.split(':') for pair in response.headers['X-Column-Types'].split(','))
+            if (response.mimetype != 'text/csv' or len(body) != 2001 or list(column_types) != header
+                    or column_types['response_time'] != 'number'):
+                print(f"❌ Unexpected records export: {response.mimetype} {len(body)} rows {header[:5]}")
+                return False
+            first = dict(zip(header, body[0]))
+            if (first['seq'] != '1' or first['rtb_id'] != records[0]['rtb_id'] or first['device_make'] != 'Samsung'
+                    or first['site_domain'] != 'news.example' or first['imp_count'] != '1'
+                    or first['success'] not in ('true', 'false') or first['rtb_currency'] != 'USD'):
+                print(f"❌ Unexpected flattened record: {first}")
+                return False
+            last = dict(zip(header, body[-1]))
+            if last['id'] != 'plain' or last['rtb_id'] != '' or last['status_code'] != '500':
+                print(f"❌ Unexpected record without RTB fields: {last}")
+                return False
+            print("✅ Records are flattened into typed columns, one row each")
+
+            tables = {table: export(f'table={table}&format=tsv')[1] for table in ('requests', 'impressions', 'devices', 'users')}
+            request_ids = {row[tables['requests'][0].index('rtb_id')] for row in tables['requests'][1:]} - {''}
+            for table in ('impressions', 'devices', 'users'):
+                header, body = tables[table][0], tables[table][1:]
+                if header[0] != 'rtb_id' or len(body) != 2000 or {row[0] for row in body} != request_ids:
+                    print(f"❌ {table} should have one row per bid request, joined on rtb_id: {header} {len(body)}")
+                    return False
+            if 'device_ua' in tables['requests'][0] or tables['impressions'][0][1:3] != ['imp_id', 'imp_banner.w']:
+                print(f"❌ Unexpected related table columns: {tables['requests'][0]} {tables['impressions'][0]}")
+                return False
+            print("✅ Requests, impressions, devices and users export as related tables joined on rtb_id")
+
+            response = client.get(f'/api/traffic/export/{campaign_id}?table=records', buffered=False)
+            chunks = [len(chunk) for chunk in response.response]
+            response.close()
+            if len(chunks) < 3 or max(chunks) > 2 * EXPORT_CHUNK_SIZE:
+                print(f"❌ The export should be streamed in bounded chunks, got {len(chunks)} of up to {max(chunks)} bytes")
+                return False
+            print(f"✅ The export streams in {len(chunks)} chunks of at most {max(chunks)} bytes")
+
+            _, rows = export('table=devices&success=false')
+            failed = sum(1 for record in records if not record['success'])
+            if len(rows) - 1 != failed:
+                print(f"❌ Filtered export returned {len(rows) - 1} rows for {failed} failed requests")
+                return False
+            print("✅ Exports take the record filters")
+
+            # Two worker streams still writing, the first one lagging
+            live_id = 'live-export-campaign'
+            live_store = traffic_module.get_campaign_store(live_id)
+            streams = ["shard-0", "shard-1"]
+            for shard, stream in enumerate(streams):
+                live_store.writer(stream, seq_start=shard + 1, seq_stride=2)
+
+            def exported_seqs():
+                text = client.get(f'/api/traffic/export/{live_id}?table=records').get_data(as_text=True)
+                return [int(row['seq']) for row in csv.DictReader(io.StringIO(text))]
+
+            live_store.begin_live_streams(streams, 0)
+            try:
+                live_store.append_batch([{"id": "lagging", "success": True} for _ in range(2)], stream="shard-0")
+                live_store.append_batch([{"id": "ahead", "success": True} for _ in range(3)], stream="shard-1")
+                while_writing = exported_seqs()
+                live_store.append_batch([{"id": "lagging", "success": True}], stream="shard-0")
+            finally:
+                live_store.end_live_streams(streams)
+            finished = exported_seqs()
+            if while_writing != [1, 2, 3] or finished != list(range(1, 7)):
+                print(f"❌ Unexpected exports while a stream lags: {while_writing} then {finished}")
+                return False
+            print("✅ Exports of a campaign still writing stop below the seqs a lagging stream has yet to write")
+
+            for query, status in (('format=xlsx', 400), ('table=bids', 400), ('success=maybe', 400)):
+                if client.get(f'/api/traffic/export/{campaign_id}?{query}').status_code != status:
+                    print(f"❌ {query} should be rejected")
+                    return False
+            if client.get('/api/traffic/export/no-campaign').status_code != 404:
+                print("❌ Campaigns without traffic should return 404")
+                return False
+            print("✅ Invalid formats, tables and unknown campaigns are rejected")
+
+            print("\n🎉 Traffic export test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_traffic_export()
+    sys.exit(0 if success else 1)
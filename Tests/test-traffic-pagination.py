@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script to verify cursor pagination of generated campaign traffic
+"""
+
+import json
+import sys
+import os
+import random
+import tempfile
+import shutil
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_traffic_pagination():
+    """Test limit/cursor pages over the segment store and legacy files"""
+
+    print("🧪 Testing Traffic Pagination...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.traffic_store import CampaignStore, SegmentWriter, seek_after, list_segments
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            # Two interleaved streams with small segments, as written by two worker processes
+            campaign_id = 'paged-campaign'
+            campaign_dir = os.path.join(temp_dir, campaign_id)
+            store = traffic_module.get_campaign_store(campaign_id)
+            for shard in range(2):
+                stream = f"shard-{shard}"
+                store.writers[stream] = SegmentWriter(os.path.join(store.segments_dir, stream),
+                                                      max_segment_size=20000, seq_start=shard + 1, seq_stride=2)
+
+            def append(count):
+                for _ in range(count // 100):
+                    for shard in range(2):
+                        store.append_batch([{"id": f"r{random.random()}", "success": random.random() < 0.8,
+                                             "payload": "x" * random.randint(10, 200)} for _ in range(50)],
+                                           stream=f"shard-{shard}")
+
+            append(3000)
+            segments = sum(len(list_segments(os.path.join(store.segments_dir, f"shard-{shard}"))) for shard in range(2))
+            print(f"✅ Wrote 3000 records to {segments} segments in 2 streams")
+
+            # Walk the pages and check the sequence
+            def walk(cursor=None, limit=337):
+                seqs = []
+                while True:
+                    query = f"limit={limit}" + (f"&cursor={cursor}" if cursor is not None else "")
+                    body = client.get(f'/api/traffic/generated/{campaign_id}?{query}').get_json()
+                    seqs += [record['seq'] for record in body['data']]
+                    cursor = body['pagination']['next_cursor']
+                    if not body['pagination']['has_more']:
+                        return seqs, cursor, body
+
+            seqs, cursor, body = walk()
+            if seqs != list(range(1, 3001)) or body['metadata']['total_requests'] != 3000:
+                print(f"❌ Pages returned {len(seqs)} records out of order or with gaps")
+                return False
+            print("✅ Pages cover seq 1-3000 in order, without gaps or duplicates")
+
+            # Cursors stay valid while the campaign writes
+            append(1000)
+            more, cursor, _ = walk(cursor)
+            if more != list(range(3001, 4001)):
+                print(f"❌ Continuing from cursor {cursor} returned {len(more)} records")
+                return False
+            print("✅ A cursor from before new writes continues with exactly the new records")
+
+            # A lagging stream still writes seqs below the last record of the other one
+            streams = ["shard-0", "shard-1"]
+            store.begin_live_streams(streams, 4000)
+            try:
+                store.append_batch([{"id": "lagging"} for _ in range(2)], stream="shard-0")
+                store.append_batch([{"id": "ahead"} for _ in range(5)], stream="shard-1")
+                first, cursor, _ = walk(4000, limit=5)
+                store.append_batch([{"id": "lagging"} for _ in range(3)], stream="shard-0")
+                second, cursor, _ = walk(cursor, limit=5)
+            finally:
+                store.end_live_streams(streams)
+            rest, cursor, _ = walk(cursor, limit=5)
+            if first != [4001, 4002, 4003] or second != list(range(4004, 4010)) or rest != [4010]:
+                print(f"❌ Pages while a stream lags returned {first} {second} {rest}")
+                return False
+            print("✅ Pages hold back the records a lagging stream may still write below")
+
+            # A fresh store positions cursors by bisecting segments, without the page hints
+            reopened = CampaignStore(campaign_dir)
+            for after in [0, 1, 2, 999, 1000, 2047, 3999, 4000] + random.sample(range(4000), 20):
+                page, has_more = reopened.read_page(after, 25)
+                expected = list(range(after + 1, min(after + 26, 4011)))
+                if [record['seq'] for record in page] != expected or has_more != (after + 25 < 4010):
+                    print(f"❌ Page after seq {after} is wrong")
+                    return False
+            print("✅ Any seq is a valid cursor for a store opened from scratch")
+
+            # Byte bisect of one large segment
+            big_dir = os.path.join(temp_dir, 'big-segment')
+            writer = SegmentWriter(big_dir)
+            writer.append_batch([{"id": str(i), "payload": "y" * (i % 300)} for i in range(5000)])
+            writer.close()
+            path = list_segments(big_dir)[0]
+            with open(path, 'rb') as f:
+                lines = f.readlines()
+            offsets = [0]
+            for line in lines:
+                offsets.append(offsets[-1] + len(line))
+            for after in [0, 1, 2500, 4999, 5000]:
+                if seek_after(path, after) != offsets[after]:
+                    print(f"❌ Bisect after seq {after} landed at the wrong offset")
+                    return False
+            print("✅ Bisecting a segment finds the exact record offset")
+
+            # Legacy files page by position
+            legacy_id = 'legacy-campaign'
+            os.makedirs(os.path.join(temp_dir, legacy_id))
+            with open(os.path.join(temp_dir, legacy_id, 'traffic.json'), 'w') as f:
+                json.dump({f"request_{i}": {"id": f"request_{i}", "success": True} for i in range(5)}, f)
+            body = client.get(f'/api/traffic/generated/{legacy_id}?limit=2&cursor=2').get_json()
+            if [record['id'] for record in body['data']] != ['request_2', 'request_3'] or body['pagination']['next_cursor'] != '4':
+                print(f"❌ Unexpected legacy page: {body}")
+                return False
+            print("✅ Legacy traffic files page by position")
+
+            if client.get(f'/api/traffic/generated/{campaign_id}?cursor=abc').status_code != 400:
+                print("❌ Invalid cursors should be rejected")
+                return False
+            unpaged = client.get(f'/api/traffic/generated/{legacy_id}').get_json()
+            if 'request_4' not in unpaged or 'pagination' in unpaged:
+                print("❌ Requests without limit or cursor should keep the full response")
+                return False
+            print("✅ Invalid cursors are rejected and unpaged requests are unchanged")
+
+            print("\n🎉 Traffic pagination test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_traffic_pagination()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script to verify filtered and projected reads of campaign traffic
+"""
+
+import json
+import sys
+import os
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_traffic_query():
+    """Test the fields projection and the filters of /generated/<id> and /since"""
+
+    print("🧪 Testing Traffic Query...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        import app.api.traffic_store as store_module
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+
+        class CountingJson:
+            """The json module, counting the records decoded by this thread and not the segment sealer"""
+            def __init__(self):
+                self.decoded = 0
+                self.thread = threading.current_thread()
+
+            def loads(self, data, *args, **kwargs):
+                if threading.current_thread() is self.thread:
+                    self.decoded += 1
+                return json.loads(data, *args, **kwargs)
+
+            def __getattr__(self, name):
+                return getattr(json, name)
+
+        try:
+            campaign_id = 'query-campaign'
+            store = traffic_module.get_campaign_store(campaign_id)
+
+            def record(i, country, success):
+                return {"id": f"r{i}", "timestamp": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                        "selected_profile_id": f"profile-{i % 3}", "selected_country": country,
+                        "success": success, "status_code": 200 if success else (500 if i % 2 else 404),
+                        "response_time": float(i)}
+
+            # Two sealed segments of a single country each, then a mixed open one
+            store.append_batch([record(i, "US", True) for i in range(100)])
+            store.writer().roll()
+            store.append_batch([record(i, "DE", i % 4 != 0) for i in range(100, 200)])
+            store.writer().roll()
+            store.append_batch([record(i, "US" if i % 2 else "DE", i % 5 != 0) for i in range(200, 300)])
+            sealed = store.sealed_segments('main')
+            if len(sealed) != 2 or sealed[1][1]['zone']['values']['selected_country'] != ['DE']:
+                print(f"❌ Sealed segments should carry zone maps: {[info.get('zone') for _, info in sealed]}")
+                return False
+            print("✅ Sealed segments carry zone maps of the filtered fields")
+
+            counting = CountingJson()
+            store_module.json = counting
+            try:
+                body = client.get(f'/api/traffic/generated/{campaign_id}?selected_country=DE&limit=1000').get_json()
+            finally:
+                store_module.json = json
+            expected = [i for i in range(100, 300) if i < 200 or i % 2 == 0]
+            if [int(entry['id'][1:]) for entry in body['data']] != expected or body['pagination']['has_more']:
+                print(f"❌ Unexpected records of selected_country=DE: {len(body['data'])}")
+                return False
+            if counting.decoded != len(expected):
+                print(f"❌ {counting.decoded} records decoded for {len(expected)} matches")
+                return False
+            print(f"✅ selected_country=DE decoded only its {len(expected)} matching records")
+
+            queries = {
+                'success=false&status_code=500': lambda i: not (i < 100 or (i < 200 and i % 4) or (i >= 200 and i % 5)) and i % 2 == 1,
+                'status_code=404,500': lambda i: (100 <= i < 200 and i % 4 == 0) or (i >= 200 and i % 5 == 0),
+                'min_response_time=50&max_response_time=120': lambda i: 50 <= i <= 120,
+                'start_time=2025-01-01T00:04:10&end_time=2025-01-01T00:04:20&selected_profile_id=profile-1':
+                    lambda i: 250 <= i <= 260 and i % 3 == 1,
+            }
+            for query, matches in queries.items():
+                body = client.get(f'/api/traffic/generated/{campaign_id}?{query}&limit=1000').get_json()
+                expected = [i for i in range(300) if matches(i)]
+                if [int(entry['id'][1:]) for entry in body['data']] != expected:
+                    print(f"❌ Unexpected records of {query}: {[entry['id'] for entry in body['data']][:10]}")
+                    return False
+            print("✅ Status, success, profile, response time and time range filters return the matching records")
+
+            body = client.get(f'/api/traffic/generated/{campaign_id}?fields=id,status_code&limit=2').get_json()
+            if body['data'] != [{"id": "r0", "status_code": 200}, {"id": "r1", "status_code": 200}]:
+                print(f"❌ Unexpected projection: {body['data']}")
+                return False
+            print("✅ fields= projects the records")
+
+            # Filtered pages continue at the cursor
+            ids = []
+            cursor = '0'
+            while True:
+                body = client.get(f'/api/traffic/generated/{campaign_id}?success=false&limit=20&cursor={cursor}').get_json()
+                ids += [entry['id'] for entry in body['data']]
+                cursor = body['pagination']['next_cursor']
+                if not body['pagination']['has_more']:
+                    break
+            if len(ids) != 45 or len(set(ids)) != 45:
+                print(f"❌ Paging the failed records returned {len(ids)} records")
+                return False
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/250?success=false&fields=id').get_json()
+            if body['data'] != [{"id": f"r{i}"} for i in range(250, 300, 5)] or body['next_seq'] != 300:
+                print(f"❌ Unexpected filtered records since seq 250: {body}")
+                return False
+            print("✅ Filtered pages and records since a seq continue where the scan stopped")
+
+            # Two worker streams write interleaved seqs after 300, the first one lagging
+            streams = ["shard-0", "shard-1"]
+            for shard, stream in enumerate(streams):
+                store.writer(stream, seq_start=301 + shard, seq_stride=2)
+
+            def failed(count, stream):
+                store.append_batch([{"id": stream, "success": False} for _ in range(count)], stream=stream)
+
+            def since(seq):
+                body = client.get(f'/api/traffic/generated/{campaign_id}/since/{seq}?success=false&fields=seq').get_json()
+                return [entry['seq'] for entry in body['data']], body['next_seq']
+
+            store.begin_live_streams(streams, 300)
+            try:
+                failed(2, "shard-0")
+                failed(3, "shard-1")
+                lagging, cursor = since(300)
+                body = client.get(f'/api/traffic/generated/{campaign_id}?success=false&cursor=300').get_json()
+                page = [entry['seq'] for entry in body['data']]
+                failed(1, "shard-0")
+                caught_up, cursor = since(cursor)
+            finally:
+                store.end_live_streams(streams)
+            finished, cursor = since(cursor)
+            if (lagging != [301, 302, 303] or page != lagging or body['pagination']['next_cursor'] != '303'
+                    or caught_up != [304, 305] or finished != [306] or cursor != 306):
+                print(f"❌ Filtered reads while a stream lags returned {lagging} {page} {caught_up} {finished}")
+                return False
+            print("✅ Filtered reads stop below the seqs a lagging stream has yet to write")
+
+            for query in ('success=maybe', 'status_code=ok', 'min_response_time=fast', 'start_time=yesterday', 'fields=,'):
+                if client.get(f'/api/traffic/generated/{campaign_id}?{query}').status_code != 400:
+                    print(f"❌ {query} should be rejected")
+                    return False
+            print("✅ Invalid filters are rejected")
+
+            print("\n🎉 Traffic query test passed!")
+            return True
+        finally:
+            store_module.json = json
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_traffic_query()
+    sys.exit(0 if success else 1)
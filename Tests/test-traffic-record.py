@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script to verify slotted traffic records and their direct JSON encoder
+"""
+
+import sys
+import os
+import json
+import time
+import pickle
+import tempfile
+import shutil
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_traffic_record():
+    """Test that slotted records encode to the same bytes as dicts and convert back to the legacy shape"""
+
+    print("🧪 Testing Traffic Records...")
+
+    try:
+        import app.api.traffic as traffic_module
+        from app.api.profiles import profiles, UserProfile
+        from app.api.adids import CampaignAdids
+        from app.api.traffic_record import TrafficRecord
+        from app.api.traffic_store import CampaignStore, encode_record
+
+        print("✅ Successfully imported traffic record module")
+
+        profile = UserProfile(id="record-profile", name="Record profile", description="Profile for record test",
+                              demographics={"interests": ["sports", "música"], "countries": ["United States", "Canada"]},
+                              device_preferences={"device_brand": "apple"},
+                              referrers={"sports|Canada": ["https://chatgpt.com/c/ü"]})
+        profiles[profile.id] = profile
+
+        def make_config(campaign_id, rtb_config):
+            config = traffic_module.TrafficConfig(
+                campaign_id=campaign_id, target_url="https://example.com/ä", requests_per_minute=60,
+                duration_minutes=10, rtb_config=rtb_config, config={"fast_forward": True, "ratio": 0.1},
+                user_profile_ids=[profile.id], profile_user_counts={profile.id: 100}
+            )
+            config.user_profiles = [profile.__dict__]
+            traffic_module.campaign_adids[campaign_id] = CampaignAdids(77, config.profile_user_counts)
+            return config
+
+        start = datetime(2025, 1, 1)
+        timestamps = [start + timedelta(seconds=i) for i in range(200)]
+        for name, rtb_config in {"pooled devices": {"device_brand": "apple", "bidfloor": 1.5},
+                                 "fixed device": {"ua": "Agent/1.0", "ip": "10.0.0.1"},
+                                 "no RTB": {}}.items():
+            config = make_config(f"record-{name.replace(' ', '-')}", rtb_config)
+            indices = list(range(200))
+            records = traffic_module.generate_traffic_batch(config, 200, timestamps=timestamps, indices=indices,
+                                                            as_records=True)
+            dicts = traffic_module.generate_traffic_batch(config, 200, timestamps=timestamps, indices=indices)
+            if not all(isinstance(record, TrafficRecord) for record in records):
+                print("❌ as_records should return slotted records")
+                return False
+            seed = traffic_module.get_campaign_seed(config)
+            traffic_module.simulate_request_batch(records, timestamps, seed, indices)
+            traffic_module.simulate_request_batch(dicts, timestamps, seed, indices)
+            records[3]['error'] = dicts[3]['error'] = "timeout ✗"
+            for seq, (record, expected) in enumerate(zip(records, dicts), 1):
+                record['seq'] = expected['seq'] = seq
+            if [record.to_dict() for record in records] != dicts:
+                print(f"❌ Records don't convert to the legacy dict shape with {name}")
+                return False
+            if [record.encode() for record in records] != [encode_record(record) for record in dicts]:
+                mismatch = next(i for i in range(200) if records[i].encode() != encode_record(dicts[i]))
+                print(f"❌ Record {mismatch} encodes differently with {name}:\n   {records[mismatch].encode()}\n   {encode_record(dicts[mismatch])}")
+                return False
+            print(f"✅ Records encode to the same bytes as dicts with {name}")
+
+        record, expected = records[0], dicts[0]
+        checks = [
+            record['target_url'] == "https://example.com/ä",
+            record.get('rtb_device') is None and 'rtb_data' not in record,
+            record.get('missing', 'default') == 'default',
+            set(record.keys()) == set(expected.keys()),
+            record == expected,
+            pickle.loads(pickle.dumps(record)) == expected and type(pickle.loads(pickle.dumps(record))) is dict,
+        ]
+        record['config'] = {"overridden": True}
+        expected['config'] = {"overridden": True}
+        checks.append(record.encode() == encode_record(expected))
+        if not all(checks):
+            print(f"❌ Mapping interface checks failed: {checks}")
+            return False
+        print("✅ Records behave as mappings and pickle as legacy dicts")
+
+        config = make_config("record-store", {"device_brand": "samsung"})
+        temp_dir = tempfile.mkdtemp()
+        try:
+            store = CampaignStore(temp_dir)
+            records = traffic_module.generate_traffic_batch(config, 100, timestamps=timestamps[:100],
+                                                            indices=list(range(100)), as_records=True)
+            traffic_module.complete_request_batch(config, records, timestamps[:100], list(range(100)))
+            store.append_batch(records)
+            stored = list(store.iter_records())
+            last_request = store.counters()["last_request"]
+            store.close()
+            if stored != [record.to_dict() for record in records] or type(last_request) is not dict:
+                print("❌ Stored records differ from the generated ones")
+                return False
+            json.dumps(last_request)
+            print("✅ Stored records read back in the legacy shape")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        count = 5000
+        stamps = [start + timedelta(milliseconds=i) for i in range(count)]
+        tracemalloc.start()
+        dicts = traffic_module.generate_traffic_batch(config, count, timestamps=stamps)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        records = traffic_module.generate_traffic_batch(config, count, timestamps=stamps, as_records=True)
+        record_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        if not record_bytes < dict_bytes:
+            print(f"❌ Records should take less memory than dicts: {record_bytes} vs {dict_bytes} bytes")
+            return False
+        started = time.perf_counter()
+        for record in dicts:
+            encode_record(record)
+        dict_micros = (time.perf_counter() - started) / count * 1e6
+        started = time.perf_counter()
+        for record in records:
+            record.encode()
+        record_micros = (time.perf_counter() - started) / count * 1e6
+        print(f"✅ Per record: {record_bytes // count} vs {dict_bytes // count} bytes in memory, "
+              f"{record_micros:.1f} vs {dict_micros:.1f} µs to encode (slotted vs dict)")
+
+        print("\n🎉 Traffic record test passed!")
+        return True
+
+    except ImportError as e:
+        print(f"❌ Failed to import traffic record module: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_traffic_record()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the records since a sequence number and long-polling for new ones
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+# Add the backend directory to the path so we can import the traffic module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def test_traffic_since():
+    """Test GET /generated/<id>/since/<seq> with and without waiting"""
+
+    print("🧪 Testing Traffic Since...")
+
+    try:
+        from app.main import app
+        import app.api.traffic as traffic_module
+        from app.api.etags import bump_campaign_version
+
+        print("✅ Successfully imported backend app")
+
+        client = app.test_client()
+        original_traffic_dir = traffic_module.TRAFFIC_DATA_DIR
+        temp_dir = tempfile.mkdtemp()
+        traffic_module.TRAFFIC_DATA_DIR = temp_dir
+        try:
+            campaign_id = 'since-campaign'
+            store = traffic_module.get_campaign_store(campaign_id)
+            store.append_batch([{"id": f"r{i}", "success": True} for i in range(250)])
+
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/200').get_json()
+            if ([record['seq'] for record in body['data']] != list(range(201, 251)) or body['next_seq'] != 250
+                    or body['high_water_mark'] != 250 or body['has_more']):
+                print(f"❌ Unexpected records since seq 200: {len(body['data'])} records, {body['next_seq']}")
+                return False
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/0?limit=100').get_json()
+            if len(body['data']) != 100 or body['next_seq'] != 100 or not body['has_more'] or body['high_water_mark'] != 250:
+                print("❌ Records since seq 0 should stop at the limit")
+                return False
+            print("✅ Only records after the given seq are returned, with the high-water mark")
+
+            # Nothing new: an immediate answer without a timeout, a wait with one
+            start = time.time()
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/250').get_json()
+            if body['data'] or body['next_seq'] != 250 or time.time() - start > 0.5:
+                print("❌ Requests without a timeout should return at once")
+                return False
+            start = time.time()
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/250?timeout=0.5').get_json()
+            elapsed = time.time() - start
+            if body['data'] or elapsed < 0.45:
+                print(f"❌ A request with nothing new should wait for its timeout, returned after {elapsed:.2f}s")
+                return False
+            print(f"✅ Without new records a long-poll returns empty after its {elapsed:.2f}s timeout")
+
+            def commit():
+                time.sleep(0.3)
+                store.append_batch([{"id": f"n{i}", "success": False} for i in range(3)])
+                bump_campaign_version(campaign_id)
+
+            threading.Thread(target=commit).start()
+            start = time.time()
+            body = client.get(f'/api/traffic/generated/{campaign_id}/since/250?timeout=10').get_json()
+            elapsed = time.time() - start
+            if [record['seq'] for record in body['data']] != [251, 252, 253] or body['high_water_mark'] != 253 or elapsed > 2:
+                print(f"❌ Long-poll should return the new records when they are written ({elapsed:.2f}s)")
+                return False
+            print(f"✅ Long-poll returned the 3 new records {elapsed:.2f}s after it started")
+
+            # Two worker streams write interleaved seqs after 253, the first one lagging
+            streams = ["shard-0", "shard-1"]
+            for shard, stream in enumerate(streams):
+                store.writer(stream, seq_start=254 + shard, seq_stride=2)
+            store.begin_live_streams(streams, 253)
+            try:
+                store.append_batch([{"id": "lagging"}], stream="shard-0")
+                store.append_batch([{"id": "ahead"} for _ in range(3)], stream="shard-1")
+                lagging = client.get(f'/api/traffic/generated/{campaign_id}/since/253').get_json()
+                store.append_batch([{"id": "lagging"} for _ in range(3)], stream="shard-0")
+                caught_up = client.get(f"/api/traffic/generated/{campaign_id}/since/{lagging['next_seq']}").get_json()
+            finally:
+                store.end_live_streams(streams)
+            finished = client.get(f"/api/traffic/generated/{campaign_id}/since/{caught_up['next_seq']}").get_json()
+            if ([record['seq'] for record in lagging['data']] != [254] or lagging['high_water_mark'] != 254
+                    or [record['seq'] for record in caught_up['data']] != list(range(255, 260))
+                    or caught_up['high_water_mark'] != 259
+                    or [record['seq'] for record in finished['data']] != [260] or finished['high_water_mark'] != 260):
+                print(f"❌ Unexpected records while a stream lags: {lagging} {caught_up} {finished}")
+                return False
+            print("✅ next_seq and the high-water mark stay below the seqs a lagging stream has yet to write")
+
+            body = client.get('/api/traffic/generated/no-campaign/since/0').get_json()
+            if body['data'] or body['high_water_mark'] != 0:
+                print("❌ Campaigns without records should return nothing")
+                return False
+            for query in ('limit=abc', 'timeout=soon'):
+                if client.get(f'/api/traffic/generated/{campaign_id}/since/0?{query}').status_code != 400:
+                    print(f"❌ {query} should be rejected")
+                    return False
+            print("✅ Empty campaigns and invalid parameters are handled")
+
+            print("\n🎉 Traffic since test passed!")
+            return True
+        finally:
+            traffic_module.TRAFFIC_DATA_DIR = original_traffic_dir
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    except ImportError as e:
+        print(f"❌ Failed to import backend app: {e}")
+        print("   Make sure you're running this from the Tests directory")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_traffic_since()
+    sys.exit(0 if success else 1)
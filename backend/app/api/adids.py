@@ -0,0 +1,135 @@
+"""
+Advertising IDs of campaign users, derived on demand.
+
+A campaign used to hold one formatted ADID string per simulated user, which for
+campaigns with millions of users cost hundreds of MB that were never freed. The
+ADID of user ``i`` of a profile is now a hash of the campaign seed, the profile
+ID and ``i``, formatted only when emitted. A campaign only stores its seed and
+the user count of each profile, so it can be dropped from memory when
+generation ends and rebuilt from ``adids.json`` later.
+"""
+
+import os
+import json
+import random
+import hashlib
+from typing import Any, Dict, List, Optional
+from .logging_config import get_logger
+from .seeding import new_seed
+
+logger = get_logger('Adids')
+
+ADIDS_FILENAME = 'adids.json'
+
+
+def format_adid(value: int) -> str:
+    """Format a 64-bit value like generate_adid: 8 digits and three groups of 4 digits"""
+    head = 10000000 + value % 90000000
+    value //= 90000000
+    parts = []
+    for _ in range(3):
+        parts.append(1000 + value % 9000)
+        value //= 9000
+    return f"{head}-{parts[0]}-{parts[1]}-{parts[2]}"
+
+
+class AdidPopulation:
+    """ADIDs of the users of one profile, indexed 0..size-1.
+
+    ``start`` and ``stop`` restrict sampling to a slice of the users, e.g. the
+    share of one worker process.
+    """
+
+    def __init__(self, seed: int, size: int, start: int = 0, stop: Optional[int] = None):
+        self.seed = seed
+        self.size = max(0, int(size))
+        self.start = start
+        self.stop = self.size if stop is None else min(stop, self.size)
+        self._key = seed.to_bytes(16, 'big', signed=False)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def value(self, index: int) -> int:
+        digest = hashlib.blake2b(index.to_bytes(8, 'big'), digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, 'big')
+
+    def adid(self, index: int) -> str:
+        if not 0 <= index < self.size:
+            raise IndexError(f"User index {index} out of range for {self.size} users")
+        return format_adid(self.value(index))
+
+    def __getitem__(self, index: int) -> str:
+        return self.adid(index)
+
+    def sample(self, rng: random.Random = random) -> Optional[str]:
+        """Pick the ADID of a random user of the slice"""
+        if self.stop <= self.start:
+            return None
+        return format_adid(self.value(self.start + int(rng.random() * (self.stop - self.start))))
+
+    def shard(self, index: int, count: int) -> 'AdidPopulation':
+        """Return the population restricted to the index-th of count contiguous slices of the users"""
+        return AdidPopulation(self.seed, self.size, self.size * index // count, self.size * (index + 1) // count)
+
+    def page(self, offset: int = 0, limit: int = 100) -> List[str]:
+        end = min(self.size, offset + limit)
+        return [format_adid(self.value(index)) for index in range(max(0, offset), end)]
+
+
+def profile_seed(campaign_seed: int, profile_id: str) -> int:
+    digest = hashlib.blake2b(f"{campaign_seed}:{profile_id}".encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class CampaignAdids:
+    """ADID populations of every profile of a campaign"""
+
+    def __init__(self, seed: Optional[int] = None, profile_user_counts: Optional[Dict[str, int]] = None):
+        self.seed = seed if seed is not None else new_seed()
+        self.populations: Dict[str, AdidPopulation] = {}
+        for profile_id, count in (profile_user_counts or {}).items():
+            self.set_count(profile_id, count)
+
+    def set_count(self, profile_id: str, count: int):
+        """Set the number of users of a profile; existing users keep their ADIDs"""
+        self.populations[profile_id] = AdidPopulation(profile_seed(self.seed, profile_id), count)
+
+    def population(self, profile_id: str) -> Optional[AdidPopulation]:
+        return self.populations.get(profile_id)
+
+    def counts(self) -> Dict[str, int]:
+        return {profile_id: population.size for profile_id, population in self.populations.items()}
+
+    def shard(self, index: int, count: int) -> 'CampaignAdids':
+        """Return a copy whose profiles only sample the index-th of count disjoint slices of their users"""
+        sharded = CampaignAdids(self.seed)
+        sharded.populations = {profile_id: population.shard(index, count)
+                               for profile_id, population in self.populations.items()}
+        return sharded
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seed": self.seed, "profile_user_counts": self.counts()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CampaignAdids':
+        return cls(int(data['seed']), data.get('profile_user_counts', {}))
+
+    def save(self, campaign_dir: str):
+        os.makedirs(campaign_dir, exist_ok=True)
+        path = os.path.join(campaign_dir, ADIDS_FILENAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, campaign_dir: str) -> Optional['CampaignAdids']:
+        path = os.path.join(campaign_dir, ADIDS_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"[Adids] Could not load {path}: {str(e)}")
+            return None
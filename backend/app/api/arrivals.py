@@ -0,0 +1,315 @@
+"""
+Arrival schedules of campaign requests.
+
+At campaign start the configured arrival processes are compiled into a
+per-minute table of arrival counts whose mean is the campaign's
+``requests_per_minute``. The pacer then looks up the time of the next request
+in that table, walking it with a cursor, so shaped traffic costs one table
+lookup per send however elaborate the shape.
+
+``config['arrival_process']`` names one process or a list of them:
+
+- ``uniform`` (default): evenly spaced arrivals, jittered within their slot
+  when ``randomize_timing`` is on.
+- ``poisson``: per-minute counts drawn from a Poisson distribution and
+  uniformly random arrival times within the minute.
+- ``diurnal``: rate follows a piecewise-linear curve over the hour of day,
+  ``diurnal_curve`` = ``[[hour, weight], ...]``.
+- ``peak_hours``: rate multiplied by ``peak_boost`` during ``peak_hours``
+  (e.g. ``"9-11,18-22"``), by default the peak hours of the campaign profiles'
+  ``behavioral_patterns``.
+- ``burst``: trains of ``burst_length_minutes`` at ``burst_factor`` times the
+  rate every ``burst_every_minutes``.
+
+Shapes multiply, so ``["diurnal", "peak_hours", "poisson"]`` is a Poisson
+process following a daily curve with boosted peak hours. Campaigns without a
+duration repeat a one-day schedule.
+"""
+
+import math
+import random
+import bisect
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from .logging_config import get_logger
+from .seeding import SCHEDULE_STREAM, derive_rng, record_rng
+
+logger = get_logger('Arrivals')
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_DIURNAL_CURVE = [[0, 0.35], [4, 0.2], [8, 0.8], [12, 1.1], [17, 1.3], [20, 1.6], [23, 0.7], [24, 0.35]]
+DEFAULT_PEAK_BOOST = 2.0
+DEFAULT_BURST_EVERY = 60
+DEFAULT_BURST_LENGTH = 5
+DEFAULT_BURST_FACTOR = 5.0
+MAX_JITTER = 0.4  # share of a slot
+
+NAMED_PERIODS = {
+    'morning': (6, 10),
+    'midday': (11, 14),
+    'afternoon': (12, 17),
+    'evening': (18, 22),
+    'night': (22, 2),
+    'late_night': (0, 4),
+}
+
+
+def parse_peak_hours(spec: Any) -> List[int]:
+    """Parse peak hours given as hours, ranges ("18-22", "18:00-22:00"), period names or lists of them"""
+    if spec is None or spec == '':
+        return []
+    if isinstance(spec, int):
+        return [spec % 24]
+    if isinstance(spec, (list, tuple)):
+        return sorted({hour for part in spec for hour in parse_peak_hours(part)})
+    hours = set()
+    for part in str(spec).replace(';', ',').split(','):
+        part = part.strip().lower().replace(' ', '_')
+        if not part:
+            continue
+        if part in NAMED_PERIODS:
+            start, end = NAMED_PERIODS[part]
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text.split(':')[0]), int(end_text.split(':')[0])
+            if start == end:
+                # Would otherwise wrap around to the whole day
+                raise ValueError(f"Empty peak hour range {part!r}")
+        else:
+            start = int(part.split(':')[0])
+            end = start + 1
+        # Ranges are end-exclusive and may wrap around midnight
+        hour = start % 24
+        while True:
+            hours.add(hour)
+            hour = (hour + 1) % 24
+            if hour == end % 24:
+                break
+    return sorted(hours)
+
+
+def profile_peak_hours(user_profiles: Sequence[Dict[str, Any]]) -> List[int]:
+    """Union of the peak hours of the profiles' behavioral patterns"""
+    hours = set()
+    for profile in user_profiles or []:
+        patterns = profile.get('behavioral_patterns') or {}
+        try:
+            hours.update(parse_peak_hours(patterns.get('peak_hours')))
+        except ValueError:
+            logger.warning(f"[Arrivals] Ignoring peak hours {patterns.get('peak_hours')!r} of profile {profile.get('id')}")
+    return sorted(hours)
+
+
+def diurnal_shape(options: Dict[str, Any], user_profiles) -> Callable[[int, datetime], float]:
+    points = sorted((float(hour), float(weight)) for hour, weight in options.get('diurnal_curve') or DEFAULT_DIURNAL_CURVE)
+    if any(weight < 0 for _, weight in points):
+        raise ValueError("diurnal_curve weights must not be negative")
+    hours = [hour for hour, _ in points]
+
+    def weight(minute: int, moment: datetime) -> float:
+        hour = moment.hour + moment.minute / 60
+        i = bisect.bisect_right(hours, hour)
+        if i == 0:
+            return points[0][1]
+        if i == len(points):
+            return points[-1][1]
+        (h0, w0), (h1, w1) = points[i - 1], points[i]
+        return w0 + (w1 - w0) * (hour - h0) / (h1 - h0) if h1 > h0 else w1
+    return weight
+
+
+def peak_hours_shape(options: Dict[str, Any], user_profiles) -> Callable[[int, datetime], float]:
+    spec = options.get('peak_hours')
+    peak = set(parse_peak_hours(spec) if spec else profile_peak_hours(user_profiles))
+    boost = float(options.get('peak_boost', DEFAULT_PEAK_BOOST))
+    if boost < 0:
+        raise ValueError("peak_boost must not be negative")
+    return lambda minute, moment: boost if moment.hour in peak else 1.0
+
+
+def burst_shape(options: Dict[str, Any], user_profiles) -> Callable[[int, datetime], float]:
+    every = max(1, int(options.get('burst_every_minutes', DEFAULT_BURST_EVERY)))
+    length = max(0, int(options.get('burst_length_minutes', DEFAULT_BURST_LENGTH)))
+    factor = float(options.get('burst_factor', DEFAULT_BURST_FACTOR))
+    if factor < 0:
+        raise ValueError("burst_factor must not be negative")
+    return lambda minute, moment: factor if minute % every < length else 1.0
+
+
+# Rate shapes by name: build(options, user_profiles) -> weight(campaign minute, time of that minute)
+RATE_SHAPES: Dict[str, Callable] = {
+    'diurnal': diurnal_shape,
+    'peak_hours': peak_hours_shape,
+    'burst': burst_shape,
+}
+ARRIVAL_PROCESSES = {'uniform', 'poisson', *RATE_SHAPES}
+
+
+def arrival_processes(options: Dict[str, Any]) -> List[str]:
+    """Return the configured arrival process names, validated"""
+    names = options.get('arrival_process') or ['uniform']
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',')]
+    if not isinstance(names, (list, tuple)):
+        raise ValueError(f"arrival_process must be a name or a list of names, not {names!r}")
+    unknown = [name for name in names if not isinstance(name, str) or name not in ARRIVAL_PROCESSES]
+    if unknown:
+        raise ValueError(f"Unknown arrival process {', '.join(map(str, unknown))}; expected one of {', '.join(sorted(ARRIVAL_PROCESSES))}")
+    return list(names)
+
+
+def rate_shapes(options: Dict[str, Any], user_profiles: Sequence[Dict[str, Any]] = ()) -> Dict[str, Callable]:
+    """Build every rate shape from the options, so invalid ones raise ValueError even if unused"""
+    shapes = {}
+    for name, build in RATE_SHAPES.items():
+        try:
+            shapes[name] = build(options, user_profiles)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid {name} arrival options: {e}")
+    return shapes
+
+
+def poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    # Knuth's multiplication method
+    limit, k, p = math.exp(-lam), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+class ArrivalSchedule:
+    """Arrival times of the requests of one run, from a table of per-minute counts"""
+
+    def __init__(self, counts: Sequence[int], start_time: datetime, seed: Optional[int] = None,
+                 poisson_times: bool = False, jitter: bool = True, cyclic: bool = False):
+        self.start_time = start_time
+        self.seed = seed
+        self.poisson_times = poisson_times
+        self.jitter = jitter
+        self.cyclic = cyclic
+        self.counts = array('l', counts)
+        self.starts = array('l', [0])
+        for count in self.counts:
+            self.starts.append(self.starts[-1] + count)
+        self.total = self.starts[-1]
+        self.minutes = len(self.counts)
+        self.end_time = start_time + timedelta(minutes=self.minutes)
+        self._cursor = 0
+        self._minute_times: Tuple[Tuple[int, int], List[float]] = ((-1, -1), [])
+
+    @classmethod
+    def build(cls, options: Dict[str, Any], requests_per_minute: float, duration_minutes: Optional[int],
+              start_time: datetime, seed: Optional[int] = None,
+              user_profiles: Sequence[Dict[str, Any]] = ()) -> 'ArrivalSchedule':
+        """Compile the arrival processes of a campaign into per-minute counts"""
+        names = arrival_processes(options)
+        shapes = rate_shapes(options, user_profiles)
+        minutes = int(duration_minutes) if duration_minutes else MINUTES_PER_DAY
+        weights = [1.0] * minutes
+        for name in names:
+            if name not in shapes:
+                continue
+            shape = shapes[name]
+            for minute in range(minutes):
+                weights[minute] *= shape(minute, start_time + timedelta(minutes=minute))
+        total_weight = sum(weights)
+        scale = requests_per_minute * minutes / total_weight if total_weight > 0 else 0.0
+
+        counts = []
+        if 'poisson' in names:
+            rng = derive_rng(seed, 'arrival-counts') if seed is not None else random
+            counts = [poisson(rng, weight * scale) for weight in weights]
+        else:
+            # Round the running total so fractional rates still add up
+            expected = 0.0
+            emitted = 0
+            for weight in weights:
+                expected += weight * scale
+                count = int(round(expected)) - emitted
+                counts.append(count)
+                emitted += count
+        return cls(counts, start_time, seed, poisson_times='poisson' in names,
+                   jitter=bool(options.get('randomize_timing', True)), cyclic=not duration_minutes)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def minute_of(self, offset: int) -> int:
+        """Minute holding the ``offset``-th arrival of a cycle"""
+        cursor = self._cursor
+        starts = self.starts
+        # Requests are paced in order, so the answer is almost always the cursor's minute or the next
+        if starts[cursor] <= offset < starts[cursor + 1]:
+            return cursor
+        if cursor + 2 <= self.minutes and starts[cursor + 1] <= offset < starts[cursor + 2]:
+            minute = cursor + 1
+        else:
+            minute = bisect.bisect_right(starts, offset) - 1
+        self._cursor = minute
+        return minute
+
+    def time_of(self, offset: int, index: Optional[int] = None) -> datetime:
+        """Arrival time of the ``offset``-th request of the run, the record with ``index`` in its campaign.
+
+        Finite schedules return their end time for offsets past their last arrival.
+        """
+        if self.total == 0:
+            return self.end_time
+        cycle, local = divmod(offset, self.total) if self.cyclic else (0, offset)
+        if local >= self.total:
+            return self.end_time
+        minute = self.minute_of(local)
+        position = local - self.starts[minute]
+        count = self.counts[minute]
+
+        if self.poisson_times:
+            key, times = self._minute_times
+            if key != (cycle, minute):
+                rng = derive_rng(self.seed, 'arrival-times', cycle, minute) if self.seed is not None else random
+                times = sorted(rng.random() for _ in range(count))
+                self._minute_times = ((cycle, minute), times)
+            fraction = times[position]
+        else:
+            jitter = 0.0
+            if self.jitter:
+                rng = record_rng(self.seed, index, SCHEDULE_STREAM) if self.seed is not None and index is not None else random
+                jitter = rng.uniform(0, MAX_JITTER)
+            fraction = (position + jitter) / count
+        return self.start_time + timedelta(minutes=cycle * self.minutes + minute + fraction)
+
+
+# Schedules of running campaigns, keyed by campaign ID, with the inputs they were built from
+_schedules: Dict[str, Tuple[Tuple, ArrivalSchedule]] = {}
+_schedules_lock = threading.Lock()
+
+
+def get_schedule(campaign_id: str, options: Dict[str, Any], requests_per_minute: float,
+                 duration_minutes: Optional[int], start_time: datetime, seed: Optional[int] = None,
+                 user_profiles: Sequence[Dict[str, Any]] = ()) -> ArrivalSchedule:
+    """Return the cached schedule of a campaign run, building it on first use"""
+    # Cheap to compare on every send; the arrival options of a run don't change while it runs
+    signature = (start_time, requests_per_minute, duration_minutes, seed)
+    cached = _schedules.get(campaign_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _schedules_lock:
+        cached = _schedules.get(campaign_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        schedule = ArrivalSchedule.build(options, requests_per_minute, duration_minutes, start_time, seed, user_profiles)
+        _schedules[campaign_id] = (signature, schedule)
+        logger.debug(f"[Arrivals] Built schedule of {schedule.total} arrivals over {schedule.minutes} minutes for campaign {campaign_id}")
+        return schedule
+
+
+def discard_schedule(campaign_id: str):
+    """Forget the schedule of a campaign"""
+    with _schedules_lock:
+        _schedules.pop(campaign_id, None)
@@ -0,0 +1,168 @@
+"""
+Backpressure and overload reporting of live campaigns.
+
+A live campaign that can't keep up with its arrival schedule used to fall
+behind silently. The generation loop now measures, per request, how long it
+spends generating the record, waiting for a free slot in the in-flight window,
+and writing completed requests and status, along with the queue depth and the
+response latency. It also measures the lag of each arrival behind its
+scheduled time. Once the lag exceeds ``max_lag_seconds`` or the window is
+full, the campaign is overloaded:
+
+- ``target_slow`` when the loop mostly waits for responses, or the window is full,
+- ``generator_saturated`` when its own work (generation and writes) takes the time.
+
+``overload_policy`` decides what happens then:
+
+- ``none`` (default): keep every arrival and catch up as fast as possible.
+- ``drop``: skip arrivals more than ``max_lag_seconds`` behind schedule.
+- ``shed``: send only a ``rate_factor`` share of the arrivals, halved every
+  second of overload down to ``min_rate_factor`` and restored gradually once the
+  campaign keeps up.
+- ``pause``: stop sending while overloaded with more than half the window in
+  flight, then skip the arrivals missed meanwhile.
+
+Skipped arrivals are not generated, so record indices stay contiguous.
+"""
+
+import math
+import time
+from typing import Any, Dict, Tuple
+from .logging_config import get_logger
+
+logger = get_logger('Backpressure')
+
+POLICY_NONE = 'none'
+POLICY_DROP = 'drop'
+POLICY_SHED = 'shed'
+POLICY_PAUSE = 'pause'
+OVERLOAD_POLICIES = (POLICY_NONE, POLICY_DROP, POLICY_SHED, POLICY_PAUSE)
+
+STATE_OK = 'ok'
+STATE_TARGET_SLOW = 'target_slow'
+STATE_SATURATED = 'generator_saturated'
+
+DEFAULT_MAX_LAG = 2.0  # seconds behind schedule
+DEFAULT_MIN_RATE_FACTOR = 0.1
+SHED_INTERVAL = 1.0  # seconds between rate factor adjustments
+RECOVERY_STEP = 0.1
+SMOOTHING = 0.1
+PAUSE_POLL_SECONDS = 0.1
+
+
+def overload_policy(options: Dict[str, Any]) -> str:
+    """Return the configured overload policy, validated"""
+    policy = options.get('overload_policy') or POLICY_NONE
+    if policy not in OVERLOAD_POLICIES:
+        raise ValueError(f"Unknown overload policy {policy}; expected one of {', '.join(OVERLOAD_POLICIES)}")
+    return policy
+
+
+def backpressure_options(options: Dict[str, Any]) -> Tuple[float, float]:
+    """Return the configured ``max_lag_seconds`` and ``min_rate_factor``, validated"""
+    try:
+        max_lag = float(options.get('max_lag_seconds', DEFAULT_MAX_LAG))
+        min_rate_factor = float(options.get('min_rate_factor', DEFAULT_MIN_RATE_FACTOR))
+    except (TypeError, ValueError):
+        raise ValueError("max_lag_seconds and min_rate_factor must be numbers")
+    if not math.isfinite(max_lag) or max_lag < 0:
+        raise ValueError(f"Invalid max_lag_seconds {max_lag}")
+    if not 0 < min_rate_factor <= 1:
+        raise ValueError(f"Invalid min_rate_factor {min_rate_factor}; expected a share in (0, 1]")
+    return max_lag, min_rate_factor
+
+
+class Backpressure:
+    """Load measurements and overload state of one live campaign"""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.policy = overload_policy(options)
+        self.max_lag, self.min_rate_factor = backpressure_options(options)
+        self.state = STATE_OK
+        self.lag = 0.0
+        self.queue_depth = 0
+        self.queue_limit = 0
+        # Smoothed seconds per request
+        self.send_latency = 0.0
+        self.generate_latency = 0.0
+        self.wait_latency = 0.0
+        self.write_latency = 0.0
+        self.rate_factor = 1.0
+        self.dropped_requests = 0
+        self.shed_requests = 0
+        self.paused_seconds = 0.0
+        self._credit = 0.0
+        self._last_adjustment = time.monotonic()
+
+    @property
+    def overloaded(self) -> bool:
+        return self.state != STATE_OK
+
+    def admit(self, lag: float) -> bool:
+        """Decide whether the arrival running ``lag`` seconds behind schedule is sent"""
+        self.lag = lag
+        if self.policy in (POLICY_DROP, POLICY_PAUSE) and lag > self.max_lag:
+            self.dropped_requests += 1
+            return False
+        if self.policy == POLICY_SHED:
+            self._credit += self.rate_factor
+            if self._credit < 1.0:
+                self.shed_requests += 1
+                return False
+            self._credit -= 1.0
+        return True
+
+    def should_pause(self, queue_depth: int, queue_limit: int) -> bool:
+        """Whether sending stops until the in-flight requests drain"""
+        return self.policy == POLICY_PAUSE and self.overloaded and queue_depth > queue_limit // 2
+
+    def paused(self, seconds: float):
+        self.paused_seconds += seconds
+
+    def observe(self, queue_depth: int, queue_limit: int, send_latency: float, generate_seconds: float,
+                wait_seconds: float, write_seconds: float):
+        """Record the measurements of a sent request and update the overload state"""
+        self.queue_depth = queue_depth
+        self.queue_limit = queue_limit
+        self.send_latency = send_latency
+        self.generate_latency += SMOOTHING * (generate_seconds - self.generate_latency)
+        self.wait_latency += SMOOTHING * (wait_seconds - self.wait_latency)
+        self.write_latency += SMOOTHING * (write_seconds - self.write_latency)
+
+        window_full = queue_depth >= queue_limit
+        if self.lag <= self.max_lag and not window_full:
+            state = STATE_OK
+        elif window_full or self.wait_latency > self.generate_latency + self.write_latency:
+            state = STATE_TARGET_SLOW
+        else:
+            state = STATE_SATURATED
+        if state != self.state:
+            logger.info(f"[Backpressure] Overload state {self.state} -> {state}, {self.lag:.2f}s behind schedule")
+            self.state = state
+
+        if self.policy == POLICY_SHED:
+            now = time.monotonic()
+            if now - self._last_adjustment >= SHED_INTERVAL:
+                self._last_adjustment = now
+                if self.overloaded:
+                    self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2)
+                else:
+                    self.rate_factor = min(1.0, self.rate_factor + RECOVERY_STEP)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Overload state and measurements, as published in the campaign status"""
+        return {
+            "state": self.state,
+            "policy": self.policy,
+            "lag_seconds": round(self.lag, 3),
+            "queue_depth": self.queue_depth,
+            "queue_limit": self.queue_limit,
+            "send_latency_ms": round(self.send_latency * 1000, 2),
+            "generate_latency_ms": round(self.generate_latency * 1000, 3),
+            "wait_latency_ms": round(self.wait_latency * 1000, 3),
+            "write_latency_ms": round(self.write_latency * 1000, 3),
+            "rate_factor": round(self.rate_factor, 3),
+            "dropped_requests": self.dropped_requests,
+            "shed_requests": self.shed_requests,
+            "paused_seconds": round(self.paused_seconds, 3)
+        }
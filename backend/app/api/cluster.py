@@ -0,0 +1,485 @@
+"""
+Multi-node generation: a coordinator splits a campaign across worker nodes.
+
+Every backend can act as a worker node. A coordinator backend knows its nodes
+(registered through ``POST /api/cluster/nodes`` or the ``CLUSTER_NODES``
+environment variable). A campaign started with ``config['distributed']``:
+
+1. The coordinator sends each of its N nodes a job: 1/N of the campaign rate and
+   the N-th slice of every profile's ADID population.
+2. Each node runs the job headless, writing to its own segment stream ``node-<k>``.
+   It keeps counters and HyperLogLog sketches of the ADIDs and RTB IDs it emitted.
+3. The coordinator polls the jobs and merges the counters and sketches into
+   ``cluster.json``, which ``/status`` and ``/stats`` read like local traffic.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from flask import Blueprint, request, jsonify
+from .logging_config import get_logger
+from .etags import bump_campaign_version
+from .sketches import HyperLogLog
+from .traffic_record import to_dict
+
+bp = Blueprint('cluster', __name__)
+logger = get_logger('Cluster')
+
+CLUSTER_FILENAME = 'cluster.json'
+NODE_STREAM_PREFIX = 'node-'
+CLUSTER_POLL_SECONDS = 1.0
+NODE_REQUEST_TIMEOUT = 5  # seconds
+MAX_NODE_FAILURES = 5  # consecutive failed polls before a node is given up
+
+# Coordinator side: registered worker nodes keyed by node ID
+cluster_nodes: Dict[str, Dict[str, Any]] = {}
+# Worker side: jobs received from a coordinator keyed by campaign ID
+jobs: Dict[str, 'GenerationJob'] = {}
+jobs_lock = threading.Lock()
+
+
+def register_node(url: str) -> Dict[str, Any]:
+    """Register a worker node by base URL, reusing the entry of a known URL"""
+    url = url.rstrip('/')
+    for node in cluster_nodes.values():
+        if node["url"] == url:
+            return node
+    node = {"id": str(uuid.uuid4()), "url": url, "registered_at": datetime.utcnow().isoformat()}
+    cluster_nodes[node["id"]] = node
+    logger.info(f"[Cluster] Registered worker node {url}")
+    return node
+
+
+for node_url in filter(None, os.environ.get('CLUSTER_NODES', '').split(',')):
+    register_node(node_url.strip())
+
+
+def record_features(record: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Extract ADID, RTB ID, device model and ad format of a record"""
+    rtb_imp = record.get('rtb_imp') or []
+    banner = rtb_imp[0].get('banner', {}) if rtb_imp else {}
+    return ((record.get('rtb_user') or {}).get('id'), record.get('rtb_id'),
+            (record.get('rtb_device') or {}).get('model'), banner.get('ad_format') or banner.get('format'))
+
+
+class GenerationJob:
+    """A worker node's share of a distributed campaign, with its counters and sketches"""
+
+    def __init__(self, campaign_id: str, node_index: int, node_count: int):
+        self.campaign_id = campaign_id
+        self.node_index = node_index
+        self.node_count = node_count
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.adid_sketch = HyperLogLog()
+        self.rtb_id_sketch = HyperLogLog()
+        self.device_models = set()
+        self.geo_locations = set()
+        self.ad_formats = set()
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.last_record: Optional[Dict[str, Any]] = None
+        self.virtual_time: Optional[str] = None
+        self.done = False
+        self.error: Optional[str] = None
+
+    def record_batch(self, traffic_batch: List[Dict[str, Any]], virtual_now: datetime):
+        with self.lock:
+            for record in traffic_batch:
+                self.total_requests += 1
+                if record.get('success'):
+                    self.successful_requests += 1
+                adid, rtb_id, model, ad_format = record_features(record)
+                if adid:
+                    self.adid_sketch.add(adid)
+                if rtb_id:
+                    self.rtb_id_sketch.add(rtb_id)
+                if model:
+                    self.device_models.add(model)
+                if ad_format:
+                    self.ad_formats.add(ad_format)
+                self.geo_locations.update(record.get('geo_locations') or [])
+                timestamp = record.get('timestamp')
+                if timestamp:
+                    if self.first_timestamp is None or timestamp < self.first_timestamp:
+                        self.first_timestamp = timestamp
+                    if self.last_timestamp is None or timestamp > self.last_timestamp:
+                        self.last_timestamp = timestamp
+            self.last_record = to_dict(traffic_batch[-1])
+            self.virtual_time = virtual_now.isoformat()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "campaign_id": self.campaign_id,
+                "node_index": self.node_index,
+                "node_count": self.node_count,
+                "total_requests": self.total_requests,
+                "successful_requests": self.successful_requests,
+                "adid_sketch": self.adid_sketch.to_base64(),
+                "rtb_id_sketch": self.rtb_id_sketch.to_base64(),
+                "device_models": sorted(self.device_models),
+                "geo_locations": sorted(self.geo_locations),
+                "ad_formats": sorted(self.ad_formats),
+                "first_timestamp": self.first_timestamp,
+                "last_timestamp": self.last_timestamp,
+                "last_record": self.last_record,
+                "virtual_time": self.virtual_time,
+                "done": self.done,
+                "error": self.error
+            }
+
+
+def traffic_config_payload(config) -> Dict[str, Any]:
+    """Serialize the parts of a TrafficConfig a worker node needs to generate traffic"""
+    return {
+        "campaign_id": config.campaign_id,
+        "target_url": config.target_url,
+        "requests_per_minute": config.requests_per_minute,
+        "duration_minutes": config.duration_minutes,
+        "geo_locations": config.geo_locations,
+        "rtb_config": config.rtb_config,
+        "config": config.config,
+        "user_profiles": config.user_profiles,
+        "user_profile_ids": config.user_profile_ids,
+        "profile_user_counts": config.profile_user_counts,
+        "total_profile_users": config.total_profile_users,
+        "campaign_referrers": config.campaign_referrers
+    }
+
+
+def run_job(job: GenerationJob, config, adids, seq_base: int, start_time: datetime,
+            end_time: Optional[datetime], total_requests: int, fast_forward: bool):
+    """Run a node's share of a campaign headless, without status files or campaign logs"""
+    from .traffic import campaign_adids, get_campaign_store, get_device_pools
+    from .sharding import run_shard
+    from .sampling import discard_samplers
+    from .device_pools import discard_campaign_pools
+    from .arrivals import discard_schedule
+    from .record_template import discard_record_template
+    from .dispatch import close_dispatcher
+
+    store = None
+    try:
+        if adids is not None:
+            campaign_adids[config.campaign_id] = adids
+        if config.rtb_config:
+            get_device_pools(config).warm(config.user_profiles)
+        store = get_campaign_store(config.campaign_id)
+        stream = f"{NODE_STREAM_PREFIX}{job.node_index}"
+        store.writer(stream, seq_start=seq_base + job.node_index + 1, seq_stride=job.node_count)
+        run_shard(config, store, stream, job.node_index, job.node_count, start_time, end_time, total_requests,
+                  fast_forward, job.stop_event.is_set, job.record_batch, wait=job.stop_event.wait,
+                  seq_base=seq_base)
+        logger.info(f"[Cluster] Job of campaign {config.campaign_id} finished with {job.total_requests} requests")
+    except Exception as e:
+        logger.error(f"[Cluster] Error running job of campaign {config.campaign_id}: {str(e)}", exc_info=True)
+        job.error = str(e)
+    finally:
+        if store is not None:
+            store.close()
+        campaign_adids.pop(config.campaign_id, None)
+        discard_samplers(config.campaign_id)
+        discard_campaign_pools(config.campaign_id)
+        discard_schedule(config.campaign_id)
+        discard_record_template(config.campaign_id)
+        close_dispatcher(config.campaign_id)
+        job.done = True
+
+
+def merge_node_snapshots(snapshots: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the job snapshots of all nodes into campaign-wide counters and sketches"""
+    adid_sketch = HyperLogLog()
+    rtb_id_sketch = HyperLogLog()
+    device_models, geo_locations, ad_formats = set(), set(), set()
+    first_timestamps, last_timestamps = [], []
+    last_request = None
+    max_seq = 0
+    nodes = {}
+    for key, snapshot in snapshots.items():
+        adid_sketch.merge(HyperLogLog.from_base64(snapshot["adid_sketch"]))
+        rtb_id_sketch.merge(HyperLogLog.from_base64(snapshot["rtb_id_sketch"]))
+        device_models.update(snapshot["device_models"])
+        geo_locations.update(snapshot["geo_locations"])
+        ad_formats.update(snapshot["ad_formats"])
+        if snapshot["first_timestamp"]:
+            first_timestamps.append(snapshot["first_timestamp"])
+        if snapshot["last_timestamp"]:
+            last_timestamps.append(snapshot["last_timestamp"])
+        record = snapshot.get("last_record")
+        if record and (last_request is None or record.get('timestamp', '') > last_request.get('timestamp', '')):
+            last_request = record
+        if record:
+            max_seq = max(max_seq, int(record.get('seq', 0)) + snapshot["node_count"])
+        nodes[key] = {field: snapshot.get(field) for field in
+                      ("url", "node_index", "total_requests", "successful_requests", "virtual_time", "done", "error")}
+    return {
+        "total_requests": sum(snapshot["total_requests"] for snapshot in snapshots.values()),
+        "successful_requests": sum(snapshot["successful_requests"] for snapshot in snapshots.values()),
+        "unique_adids_estimate": adid_sketch.estimate(),
+        "unique_rtb_ids_estimate": rtb_id_sketch.estimate(),
+        "device_models": sorted(device_models),
+        "geo_locations": sorted(geo_locations),
+        "ad_formats": sorted(ad_formats),
+        "first_timestamp": min(first_timestamps) if first_timestamps else None,
+        "last_timestamp": max(last_timestamps) if last_timestamps else None,
+        "last_request": last_request,
+        "max_seq": max_seq,
+        "nodes": nodes
+    }
+
+
+def save_cluster_state(campaign_dir: str, snapshots: Dict[str, Dict[str, Any]]):
+    path = os.path.join(campaign_dir, CLUSTER_FILENAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({"snapshots": snapshots, "summary": merge_node_snapshots(snapshots)}, f, default=str)
+    os.replace(path + '.tmp', path)
+
+
+def load_cluster_state(campaign_dir: str) -> Optional[Dict[str, Any]]:
+    """Load the node snapshots and merged summary of a distributed campaign, or None"""
+    path = os.path.join(campaign_dir, CLUSTER_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"[Cluster] Could not load {path}: {str(e)}")
+        return None
+
+
+def cluster_stats(summary: Dict[str, Any], duration_minutes: Optional[int]) -> Dict[str, Any]:
+    """Build /stats data of a distributed campaign from its merged summary"""
+    total_requests = summary["total_requests"]
+    successful_requests = summary["successful_requests"]
+    start_time = summary["first_timestamp"]
+    actual_end_time = summary["last_timestamp"]
+    planned_end_time = None
+    if start_time and duration_minutes:
+        planned_end_time = (datetime.fromisoformat(start_time) + timedelta(minutes=duration_minutes)).isoformat()
+    duration_minutes_actual = 0
+    if start_time and actual_end_time:
+        duration_minutes_actual = (datetime.fromisoformat(actual_end_time) - datetime.fromisoformat(start_time)).total_seconds() / 60
+    requests_per_minute = total_requests / duration_minutes_actual if duration_minutes_actual > 0 else 0
+    return {
+        "total_requests": total_requests,
+        "successful_requests": successful_requests,
+        "success_rate": round(successful_requests / total_requests * 100, 2) if total_requests > 0 else 0,
+        # Individual IDs stay on the worker nodes, only their distinct counts are known here
+        "unique_rtb_ids": [],
+        "unique_adids": [],
+        "unique_rtb_ids_estimate": summary["unique_rtb_ids_estimate"],
+        "unique_adids_estimate": summary["unique_adids_estimate"],
+        "unique_device_models": summary["device_models"],
+        "unique_geo_locations": summary["geo_locations"],
+        "unique_ad_formats": summary["ad_formats"],
+        "start_time": start_time,
+        "planned_end_time": planned_end_time,
+        "actual_end_time": actual_end_time,
+        "duration_minutes_actual": round(duration_minutes_actual, 2),
+        "requests_per_minute": round(requests_per_minute, 2),
+        "distributed": True,
+        "nodes": summary["nodes"]
+    }
+
+
+def run_distributed_generation(config, thread_id: str, campaign_dir: str, start_time: datetime,
+                               end_time: Optional[datetime], total_requests: int, fast_forward: bool,
+                               wall_start: float) -> Tuple[int, int, datetime, bool]:
+    """Run a campaign on the registered worker nodes until they finish or the campaign is stopped.
+
+    Returns the request count, successful request count, latest virtual time and whether it was stopped.
+    """
+    from .traffic import (active_threads, campaign_adids, append_campaign_log, update_campaign_status,
+                          report_fast_forward_progress)
+
+    nodes = list(cluster_nodes.values())
+    if not nodes:
+        raise ValueError("No worker nodes registered for distributed generation")
+
+    # Snapshots of earlier runs stay part of the campaign
+    state = load_cluster_state(campaign_dir) or {}
+    snapshots: Dict[str, Dict[str, Any]] = state.get("snapshots", {})
+    seq_base = state.get("summary", {}).get("max_seq", 0)
+    adids = campaign_adids.get(config.campaign_id)
+
+    running: Dict[str, Dict[str, Any]] = {}
+    for node_index, node in enumerate(nodes):
+        payload = {
+            "config": traffic_config_payload(config),
+            "adids": adids.to_dict() if adids else None,
+            "node_index": node_index,
+            "node_count": len(nodes),
+            "seq_base": seq_base,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat() if end_time else None,
+            "total_requests": total_requests,
+            "fast_forward": fast_forward
+        }
+        try:
+            response = requests.post(f"{node['url']}/api/cluster/jobs", json=payload, timeout=NODE_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            running[f"{thread_id}:{node_index}"] = {"node": node, "failures": 0}
+            append_campaign_log(config.campaign_id, f"CLUSTER: Started job {node_index + 1}/{len(nodes)} on {node['url']}")
+        except requests.RequestException as e:
+            logger.error(f"[Cluster] Could not start job on {node['url']}: {str(e)}")
+            append_campaign_log(config.campaign_id, f"ERROR: Could not start job on {node['url']}: {str(e)}")
+    if not running:
+        raise RuntimeError("No worker node accepted the campaign")
+
+    user_stopped = False
+    while running:
+        if not user_stopped and active_threads.get(config.campaign_id) != thread_id:
+            logger.info(f"[Cluster] Stopping jobs of campaign {config.campaign_id}")
+            user_stopped = True
+            for entry in running.values():
+                try:
+                    requests.post(f"{entry['node']['url']}/api/cluster/jobs/{config.campaign_id}/stop",
+                                  timeout=NODE_REQUEST_TIMEOUT)
+                except requests.RequestException as e:
+                    logger.error(f"[Cluster] Could not stop job on {entry['node']['url']}: {str(e)}")
+
+        for key, entry in list(running.items()):
+            try:
+                response = requests.get(f"{entry['node']['url']}/api/cluster/jobs/{config.campaign_id}",
+                                        timeout=NODE_REQUEST_TIMEOUT)
+                response.raise_for_status()
+                snapshot = response.json()["data"]
+                snapshot["url"] = entry["node"]["url"]
+                snapshots[key] = snapshot
+                entry["failures"] = 0
+                if snapshot["done"]:
+                    del running[key]
+            except (requests.RequestException, ValueError, KeyError) as e:
+                entry["failures"] += 1
+                logger.warning(f"[Cluster] Polling {entry['node']['url']} failed ({entry['failures']}): {str(e)}")
+                if entry["failures"] >= MAX_NODE_FAILURES:
+                    append_campaign_log(config.campaign_id, f"ERROR: Gave up on worker node {entry['node']['url']}")
+                    del running[key]
+
+        save_cluster_state(campaign_dir, snapshots)
+        bump_campaign_version(config.campaign_id)
+        run_snapshots = [snapshot for key, snapshot in snapshots.items() if key.startswith(f"{thread_id}:")]
+        request_count = sum(snapshot["total_requests"] for snapshot in run_snapshots)
+        successful_requests = sum(snapshot["successful_requests"] for snapshot in run_snapshots)
+        virtual_times = [datetime.fromisoformat(snapshot["virtual_time"]) for snapshot in run_snapshots if snapshot["virtual_time"]]
+        if fast_forward and virtual_times:
+            # The campaign has reached the virtual time of its slowest node
+            report_fast_forward_progress(config, request_count, successful_requests, total_requests,
+                                         min(virtual_times), wall_start)
+        elif not fast_forward:
+            update_campaign_status(config.campaign_id, "running", {
+                "progress_percentage": (request_count / total_requests) * 100 if total_requests > 0 else 0,
+                "total_requests": request_count,
+                "successful_requests": successful_requests,
+                "last_updated": datetime.utcnow().isoformat(),
+                "traffic_generation_active": True,
+                "nodes": len(nodes)
+            })
+        if running:
+            time.sleep(CLUSTER_POLL_SECONDS)
+
+    virtual_now = max(virtual_times) if virtual_times else start_time
+    logger.info(f"[Cluster] Jobs of campaign {config.campaign_id} finished with {request_count} requests")
+    return request_count, successful_requests, virtual_now, user_stopped
+
+
+@bp.route("/ping", methods=['GET'])
+def ping():
+    """Check that a node is reachable"""
+    return jsonify({"success": True, "jobs": len(jobs), "nodes": len(cluster_nodes)})
+
+
+@bp.route("/nodes", methods=['GET'])
+def list_nodes():
+    """List the registered worker nodes"""
+    return jsonify({"success": True, "data": list(cluster_nodes.values())})
+
+
+@bp.route("/nodes", methods=['POST'])
+def add_node():
+    """Register a worker node by base URL after checking that it answers"""
+    try:
+        data = request.get_json() or {}
+        url = data.get("url")
+        if not url:
+            return jsonify({"success": False, "message": "url is required"}), 400
+        try:
+            requests.get(f"{url.rstrip('/')}/api/cluster/ping", timeout=NODE_REQUEST_TIMEOUT).raise_for_status()
+        except requests.RequestException as e:
+            return jsonify({"success": False, "message": f"Node {url} is not reachable: {str(e)}"}), 400
+        return jsonify({"success": True, "data": register_node(url)})
+    except Exception as e:
+        logger.error(f"[Cluster] Error registering node: {str(e)}", exc_info=True)
+        return jsonify({"success": False, "message": f"Error registering node: {str(e)}"}), 500
+
+
+@bp.route("/nodes/<node_id>", methods=['DELETE'])
+def remove_node(node_id: str):
+    """Unregister a worker node"""
+    if cluster_nodes.pop(node_id, None) is None:
+        return jsonify({"success": False, "message": "Node not found"}), 404
+    return jsonify({"success": True, "message": f"Node {node_id} removed"})
+
+
+@bp.route("/jobs", methods=['POST'])
+def start_job():
+    """Start this node's share of a distributed campaign"""
+    try:
+        from .traffic import TrafficConfig
+        from .adids import CampaignAdids
+
+        data = request.get_json() or {}
+        config = TrafficConfig(**data["config"])
+        campaign_id = config.campaign_id
+        node_index, node_count = int(data["node_index"]), int(data["node_count"])
+        with jobs_lock:
+            if campaign_id in jobs and not jobs[campaign_id].done:
+                return jsonify({"success": False, "message": f"Job for campaign {campaign_id} is already running"}), 409
+            job = GenerationJob(campaign_id, node_index, node_count)
+            jobs[campaign_id] = job
+
+        adids = CampaignAdids.from_dict(data["adids"]).shard(node_index, node_count) if data.get("adids") else None
+        end_time = datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None
+        thread = threading.Thread(
+            target=run_job,
+            args=(job, config, adids, int(data.get("seq_base", 0)), datetime.fromisoformat(data["start_time"]),
+                  end_time, int(data["total_requests"]), bool(data.get("fast_forward"))),
+            daemon=True,
+            name=f"cluster_job_{campaign_id}"
+        )
+        thread.start()
+        logger.info(f"[Cluster] Started job {node_index + 1}/{node_count} of campaign {campaign_id}")
+        return jsonify({"success": True, "campaign_id": campaign_id, "node_index": node_index})
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": f"Invalid job: {str(e)}"}), 400
+    except Exception as e:
+        logger.error(f"[Cluster] Error starting job: {str(e)}", exc_info=True)
+        return jsonify({"success": False, "message": f"Error starting job: {str(e)}"}), 500
+
+
+@bp.route("/jobs/<campaign_id>", methods=['GET'])
+def get_job(campaign_id: str):
+    """Get the counters and sketches of this node's job"""
+    job = jobs.get(campaign_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    return jsonify({"success": True, "data": job.snapshot()})
+
+
+@bp.route("/jobs/<campaign_id>/stop", methods=['POST'])
+def stop_job(campaign_id: str):
+    """Stop this node's job after its current batch"""
+    job = jobs.get(campaign_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    job.stop_event.set()
+    return jsonify({"success": True, "message": f"Stopping job of campaign {campaign_id}"})
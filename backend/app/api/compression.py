@@ -0,0 +1,135 @@
+"""
+Negotiated response compression.
+
+Traffic records repeat their campaign's config, so JSON responses compress
+well. ``compress_response`` runs after every request. It picks ``gzip`` or
+``deflate`` from the request's ``Accept-Encoding`` and compresses JSON, NDJSON,
+CSV and text bodies of at least ``COMPRESSION_MIN_SIZE`` bytes. Streamed
+responses are compressed chunk by chunk, each chunk flushed so the client
+receives it without waiting for the next one. Server-sent events, files sent
+as they are and responses that already have an encoding are left alone.
+
+Raw deflate streams that end with a sync flush can be concatenated. Sealed
+segments are compressed this way once (see ``traffic_store``), so gzip
+downloads join the precompressed segments between a gzip header and trailer.
+The trailer's CRC comes from the segments' CRCs via ``crc32_combine`` instead
+of reading the segments again.
+"""
+
+import os
+import struct
+import zlib
+from typing import Iterable, Iterator, Optional
+from flask import request
+from .logging_config import get_logger
+
+logger = get_logger('Compression')
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+ENCODINGS = ('gzip', 'deflate')
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/tab-separated-values',
+    'text/plain', 'text/html', 'application/javascript'
+))
+# gzip member header: magic, deflate, no flags, no mtime, no extra flags, unknown OS
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Return the encoding the current request accepts, gzip preferred, or None"""
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def new_compressor(encoding: str, level: int = COMPRESSION_LEVEL):
+    """Compressor producing a gzip, zlib (HTTP deflate) or, for ``raw``, headerless deflate stream"""
+    wbits = {'gzip': 31, 'deflate': 15, 'raw': -15}[encoding]
+    return zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+
+def gzip_trailer(crc: int, size: int) -> bytes:
+    return struct.pack('<II', crc & 0xffffffff, size & 0xffffffff)
+
+
+def _gf2_times(matrix, vector: int) -> int:
+    total = 0
+    i = 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return total
+
+
+def _gf2_square(matrix):
+    return [_gf2_times(matrix, row) for row in matrix]
+
+
+def crc32_combine(crc1: int, crc2: int, length2: int) -> int:
+    """CRC-32 of two concatenated blocks from their CRCs and the length of the second (zlib's algorithm)"""
+    if length2 <= 0:
+        return crc1
+    # Operator for one zero bit, then squared into operators for 2, 4, 8... zero bits
+    odd = [0xedb88320] + [1 << n for n in range(31)]
+    even = _gf2_square(odd)
+    odd = _gf2_square(even)
+    while True:
+        even = _gf2_square(odd)
+        if length2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+        odd = _gf2_square(even)
+        if length2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+    return crc1 ^ crc2
+
+
+def compress_chunks(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body, flushing after every chunk"""
+    compressor = new_compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """Compress a response for clients accepting gzip or deflate (after_request hook)"""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304) or request.method == 'HEAD'
+            or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        compressor = new_compressor(encoding)
+        response.set_data(compressor.compress(data) + compressor.flush())
+    response.headers['Content-Encoding'] = encoding
+    # The compressed body is another representation of the resource
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
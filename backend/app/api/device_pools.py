@@ -0,0 +1,227 @@
+"""
+Pre-generated device and IP pools for RTB bid requests.
+
+Creating a Faker instance and calling ``user_agent()`` / ``ipv4()`` for every
+bid request dominated the cost of generating RTB payloads. A campaign now builds
+pools of devices (user agent, make, model, OS) and IP addresses once, in line
+with the profiles' ``device_preferences`` and the campaign's countries, and the
+hot path only picks an entry by index. Pools of a seeded campaign are built from
+generators derived from the seed and the pool name, so they don't depend on the
+order in which they are first needed.
+"""
+
+import random
+import threading
+from typing import Any, Dict, List, Optional
+from .logging_config import get_logger
+from .seeding import derive_rng
+
+logger = get_logger('DevicePools')
+
+DEFAULT_POOL_SIZE = 1000
+
+# Device catalog: brand -> (model, model code in the user agent, operating system, OS versions)
+DEVICE_CATALOG = {
+    'samsung': [
+        ('Galaxy S24', 'SM-S921B', 'android', ['14']),
+        ('Galaxy S23', 'SM-S911B', 'android', ['13', '14']),
+        ('Galaxy A54', 'SM-A546B', 'android', ['13', '14']),
+        ('Galaxy A14', 'SM-A145F', 'android', ['13']),
+    ],
+    'apple': [
+        ('iPhone 15', 'iPhone', 'ios', ['17.0', '17.4', '17.5']),
+        ('iPhone 14', 'iPhone', 'ios', ['16.6', '17.4']),
+        ('iPhone 13', 'iPhone', 'ios', ['16.6', '17.4']),
+    ],
+    'google': [
+        ('Pixel 8', 'Pixel 8', 'android', ['14']),
+        ('Pixel 7', 'Pixel 7', 'android', ['13', '14']),
+    ],
+    'xiaomi': [
+        ('Redmi Note 13', '23129RAA4G', 'android', ['13', '14']),
+        ('Xiaomi 13', '2211133G', 'android', ['13', '14']),
+    ],
+}
+
+MAKES = {'samsung': 'Samsung', 'apple': 'Apple', 'google': 'Google', 'xiaomi': 'Xiaomi'}
+CHROME_VERSIONS = ['120.0.6099.144', '121.0.6167.178', '122.0.6261.119', '123.0.6312.99', '124.0.6367.82']
+
+# First octets of address blocks allocated to each country
+COUNTRY_IP_PREFIXES = {
+    'United States': [3, 8, 23, 24, 50, 64, 66, 68, 71, 73, 98, 104, 107, 174],
+    'Canada': [24, 70, 99, 142, 174, 184, 206],
+    'United Kingdom': [2, 5, 25, 51, 62, 81, 82, 86, 90],
+    'Germany': [5, 46, 62, 77, 79, 84, 87, 91, 93],
+    'France': [2, 37, 78, 80, 82, 86, 88, 90, 176],
+    'Spain': [2, 37, 77, 79, 80, 83, 88, 95],
+    'Italy': [2, 5, 37, 79, 80, 87, 93, 95],
+    'Israel': [2, 5, 31, 46, 77, 79, 84, 109],
+    'India': [14, 27, 49, 59, 103, 106, 117, 122, 157],
+    'Japan': [1, 27, 36, 49, 58, 60, 106, 126, 133, 153],
+    'Australia': [1, 14, 27, 49, 58, 101, 110, 120, 124],
+    'Brazil': [177, 179, 186, 187, 189, 191, 200, 201],
+}
+GENERIC_IP_PREFIXES = [prefix for prefixes in COUNTRY_IP_PREFIXES.values() for prefix in prefixes]
+
+
+def catalog_entries(device_brand: Optional[str], device_models: Optional[List[str]],
+                    operating_system: Optional[str]) -> List[tuple]:
+    """Return the (brand, model, code, os, versions) catalog entries matching device preferences"""
+    brand = (device_brand or '').lower()
+    brands = [brand] if brand in DEVICE_CATALOG else list(DEVICE_CATALOG)
+    entries = [(b, *entry) for b in brands for entry in DEVICE_CATALOG[b]]
+    os_name = (operating_system or '').lower()
+    if os_name in ('android', 'ios'):
+        entries = [entry for entry in entries if entry[3] == os_name] or entries
+
+    if device_models:
+        all_entries = {entry[1].lower(): (b, *entry) for b in DEVICE_CATALOG for entry in DEVICE_CATALOG[b]}
+        selected = []
+        for model in device_models:
+            if model.lower() in all_entries:
+                selected.append(all_entries[model.lower()])
+            else:
+                # Models outside the catalog keep the preferred brand and OS
+                is_ios = 'iphone' in model.lower() or os_name == 'ios'
+                model_brand = 'apple' if is_ios else (brand if brand in DEVICE_CATALOG and brand != 'apple' else 'android')
+                selected.append((model_brand, model, model, 'ios' if is_ios else 'android',
+                                 ['17.4'] if is_ios else ['13', '14']))
+        entries = selected
+    return entries
+
+
+def build_user_agent(code: str, os_name: str, os_version: str, rng: random.Random) -> str:
+    if os_name == 'ios':
+        return (f"Mozilla/5.0 (iPhone; CPU iPhone OS {os_version.replace('.', '_')} like Mac OS X) "
+                f"AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{os_version} Mobile/15E148 Safari/604.1")
+    return (f"Mozilla/5.0 (Linux; Android {os_version}; {code}) AppleWebKit/537.36 "
+            f"(KHTML, like Gecko) Chrome/{rng.choice(CHROME_VERSIONS)} Mobile Safari/537.36")
+
+
+def build_device_pool(device_preferences: Dict[str, Any], size: int = DEFAULT_POOL_SIZE,
+                      rng: random.Random = random) -> List[Dict[str, Any]]:
+    """Build ``size`` devices matching the device preferences of a profile or campaign"""
+    entries = catalog_entries(device_preferences.get('device_brand'), device_preferences.get('device_models'),
+                              device_preferences.get('operating_system'))
+    pool = []
+    for _ in range(size):
+        brand, model, code, os_name, versions = rng.choice(entries)
+        os_version = rng.choice(versions)
+        pool.append({
+            "ua": build_user_agent(code, os_name, os_version, rng),
+            "make": MAKES.get(brand, brand.title()),
+            "model": model,
+            "os": 'iOS' if os_name == 'ios' else 'Android',
+            "osv": os_version
+        })
+    return pool
+
+
+def build_ip_pool(country: Optional[str], size: int = DEFAULT_POOL_SIZE, rng: random.Random = random) -> List[str]:
+    """Build ``size`` IPv4 addresses from the address blocks of a country"""
+    prefixes = COUNTRY_IP_PREFIXES.get(country, GENERIC_IP_PREFIXES)
+    return [f"{rng.choice(prefixes)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            for _ in range(size)]
+
+
+def device_pool_size(options: Dict[str, Any]) -> int:
+    """Return the configured size of the device and IP pools, validated"""
+    try:
+        size = int(options.get('device_pool_size', DEFAULT_POOL_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid device pool size {options.get('device_pool_size')!r}")
+    if size < 1:
+        raise ValueError(f"Invalid device pool size {size}")
+    return size
+
+
+class CampaignDevicePools:
+    """Device pools per profile and IP pools per country for one campaign"""
+
+    def __init__(self, campaign_preferences: Dict[str, Any], geo_locations: List[str],
+                 size: int = DEFAULT_POOL_SIZE, rng: random.Random = random, seed: Optional[int] = None):
+        self.campaign_preferences = campaign_preferences or {}
+        self.geo_locations = list(geo_locations or [])
+        self.size = max(1, int(size))
+        self.rng = rng
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.device_pools: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        self.ip_pools: Dict[Optional[str], List[str]] = {}
+
+    def preferences_for(self, profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Profile device preferences, with the campaign's RTB settings filling the gaps"""
+        profile_preferences = (profile or {}).get('device_preferences') or {}
+        return {
+            'device_brand': profile_preferences.get('device_brand') or self.campaign_preferences.get('device_brand'),
+            'device_models': profile_preferences.get('device_models') or self.campaign_preferences.get('device_models'),
+            'operating_system': profile_preferences.get('operating_system') or self.campaign_preferences.get('operating_system')
+        }
+
+    def warm(self, user_profiles: List[Dict[str, Any]]):
+        """Build the pools of every profile and country up front"""
+        for profile in user_profiles:
+            self.device_pool(profile.get('id'), profile)
+            for country in (profile.get('demographics') or {}).get('countries') or []:
+                self.ip_pool(country)
+        self.device_pool(None)
+        for country in self.geo_locations or [None]:
+            self.ip_pool(country)
+
+    def device_pool(self, profile_id: Optional[str], profile: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        pool = self.device_pools.get(profile_id)
+        if pool is None:
+            with self.lock:
+                pool = self.device_pools.get(profile_id)
+                if pool is None:
+                    rng = self.rng if self.seed is None else derive_rng(self.seed, 'devices', profile_id)
+                    pool = build_device_pool(self.preferences_for(profile), self.size, rng)
+                    self.device_pools[profile_id] = pool
+        return pool
+
+    def ip_pool(self, country: Optional[str]) -> List[str]:
+        pool = self.ip_pools.get(country)
+        if pool is None:
+            with self.lock:
+                pool = self.ip_pools.get(country)
+                if pool is None:
+                    rng = self.rng if self.seed is None else derive_rng(self.seed, 'ips', country)
+                    pool = build_ip_pool(country, self.size, rng)
+                    self.ip_pools[country] = pool
+        return pool
+
+    def pick_device(self, profile_id: Optional[str] = None, profile: Optional[Dict[str, Any]] = None,
+                    rng: random.Random = random) -> Dict[str, Any]:
+        pool = self.device_pool(profile_id, profile)
+        return pool[int(rng.random() * len(pool))]
+
+    def pick_ip(self, country: Optional[str] = None, rng: random.Random = random) -> str:
+        if country is None and self.geo_locations:
+            country = self.geo_locations[int(rng.random() * len(self.geo_locations))]
+        pool = self.ip_pool(country)
+        return pool[int(rng.random() * len(pool))]
+
+
+# Pools of running campaigns, keyed by campaign ID
+_campaign_pools: Dict[str, CampaignDevicePools] = {}
+_campaign_pools_lock = threading.Lock()
+
+
+def get_campaign_pools(campaign_id: str, campaign_preferences: Dict[str, Any], geo_locations: List[str],
+                       size: int = DEFAULT_POOL_SIZE, seed: Optional[int] = None) -> CampaignDevicePools:
+    """Return the pools of a campaign, creating them on first use"""
+    pools = _campaign_pools.get(campaign_id)
+    if pools is None:
+        with _campaign_pools_lock:
+            pools = _campaign_pools.get(campaign_id)
+            if pools is None:
+                pools = CampaignDevicePools(campaign_preferences, geo_locations, size, seed=seed)
+                _campaign_pools[campaign_id] = pools
+                logger.debug(f"[Pools] Created device pools of size {pools.size} for campaign {campaign_id}")
+    return pools
+
+
+def discard_campaign_pools(campaign_id: str):
+    """Forget the pools of a campaign"""
+    with _campaign_pools_lock:
+        _campaign_pools.pop(campaign_id, None)
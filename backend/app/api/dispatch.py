@@ -0,0 +1,193 @@
+"""
+Real HTTP dispatch of generated requests.
+
+With ``config['dispatch_mode'] == 'http'`` generated requests are sent to the
+campaign's ``target_url`` instead of being simulated. Bid requests are POSTed as
+OpenRTB JSON, other requests are plain GETs, and both carry the generated
+user agent and referrer plus any custom headers. Requests go through one
+aiohttp session per campaign, running on its own event loop thread, with a
+keep-alive connection pool bounded by ``http_concurrency`` and
+``http_limit_per_host``. Real latency and status are recorded in the same
+fields as simulated responses.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import aiohttp
+from .logging_config import get_logger
+
+logger = get_logger('Dispatch')
+
+DISPATCH_SIMULATE = 'simulate'
+DISPATCH_HTTP = 'http'
+DISPATCH_MODES = (DISPATCH_SIMULATE, DISPATCH_HTTP)
+DEFAULT_CONCURRENCY = 100
+DEFAULT_TIMEOUT = 10.0  # seconds
+KEEPALIVE_TIMEOUT = 30  # seconds
+OPENRTB_VERSION = '2.5'
+
+
+def build_http_request(traffic_data: Dict[str, Any], extra_headers: Optional[Dict[str, str]] = None
+                       ) -> Tuple[str, str, Dict[str, str], Optional[bytes]]:
+    """Build method, URL, headers and body of the HTTP request for a traffic entry"""
+    device = traffic_data.get('rtb_device') or {}
+    headers = {"User-Agent": device.get('ua') or 'TrafficGenerator'}
+    if traffic_data.get('referrer'):
+        headers["Referer"] = traffic_data['referrer']
+    if device.get('ip'):
+        headers["X-Forwarded-For"] = device['ip']
+    headers.update(extra_headers or {})
+
+    rtb_data = traffic_data.get('rtb_data')
+    if rtb_data:
+        headers["Content-Type"] = "application/json"
+        headers["x-openrtb-version"] = OPENRTB_VERSION
+        return 'POST', traffic_data['target_url'], headers, json.dumps(rtb_data, separators=(',', ':')).encode('utf-8')
+    return 'GET', traffic_data['target_url'], headers, None
+
+
+def parse_bid_response(body: bytes) -> Tuple[Optional[str], Optional[float], Optional[str]]:
+    """Extract bid ID, price and currency from an OpenRTB bid response, if the body is one"""
+    try:
+        response = json.loads(body)
+        bid = response["seatbid"][0]["bid"][0]
+        return bid.get("id"), bid.get("price"), response.get("cur", "USD")
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None, None, None
+
+
+def http_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the ``HttpDispatcher`` arguments of the configured ``http_*`` options, validated with the dispatch mode"""
+    mode = options.get('dispatch_mode') or DISPATCH_SIMULATE
+    if mode not in DISPATCH_MODES:
+        raise ValueError(f"Unknown dispatch mode {mode!r}; expected one of {', '.join(DISPATCH_MODES)}")
+    try:
+        concurrency = int(options.get('http_concurrency', DEFAULT_CONCURRENCY))
+        limit_per_host = int(options.get('http_limit_per_host') or 0)
+        timeout = float(options.get('http_timeout', DEFAULT_TIMEOUT))
+    except (TypeError, ValueError):
+        raise ValueError("http_concurrency, http_limit_per_host and http_timeout must be numbers")
+    if concurrency < 1 or limit_per_host < 0 or timeout <= 0:
+        raise ValueError(f"Invalid HTTP pool of {concurrency} connections, {limit_per_host} per host, "
+                         f"with a {timeout}s timeout")
+    headers = options.get('http_headers') or {}
+    if not isinstance(headers, dict) or not all(isinstance(value, str) for value in (*headers, *headers.values())):
+        raise ValueError("http_headers must map header names to strings")
+    return {"concurrency": concurrency, "limit_per_host": limit_per_host, "timeout": timeout, "headers": headers}
+
+
+class HttpDispatcher:
+    """Pooled aiohttp client running on a background event loop"""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, limit_per_host: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT, headers: Optional[Dict[str, str]] = None):
+        self.concurrency = max(1, int(concurrency))
+        self.limit_per_host = int(limit_per_host) if limit_per_host else 0
+        self.timeout = float(timeout)
+        self.headers = dict(headers or {})
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name='http_dispatcher')
+        self.thread.start()
+        self.session: aiohttp.ClientSession = asyncio.run_coroutine_threadsafe(self._create_session(), self.loop).result()
+        # Queue requests here rather than in the connector, so the timeout only covers the request itself
+        self.slots = asyncio.Semaphore(self.concurrency)
+
+    async def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host,
+                                         keepalive_timeout=KEEPALIVE_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def send(self, traffic_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the request of a traffic entry and return the response fields"""
+        method, url, headers, body = build_http_request(traffic_data, self.headers)
+        request_time = datetime.fromisoformat(traffic_data['timestamp']) if traffic_data.get('timestamp') else datetime.utcnow()
+        await self.slots.acquire()
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, url, headers=headers, data=body) as response:
+                payload = await response.read()
+                latency = time.perf_counter() - started
+                success = 200 <= response.status < 300
+                bid_id, win_price, currency = parse_bid_response(payload) if body and payload else (None, None, None)
+                return {
+                    "success": success,
+                    "response_time": round(latency * 1000, 2),  # ms
+                    "status_code": response.status,
+                    "response_size": len(payload),
+                    "bid_id": bid_id,
+                    "win_price": win_price,
+                    "currency": currency if win_price is not None else None,
+                    "timestamp": (request_time + timedelta(seconds=latency)).isoformat()
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            latency = time.perf_counter() - started
+            return {
+                "success": False,
+                "response_time": round(latency * 1000, 2),
+                "status_code": None,
+                "response_size": 0,
+                "bid_id": None,
+                "win_price": None,
+                "currency": None,
+                "error": str(e) or type(e).__name__,
+                "timestamp": (request_time + timedelta(seconds=latency)).isoformat()
+            }
+        finally:
+            self.slots.release()
+
+    async def _send_into(self, traffic_data: Dict[str, Any]) -> Dict[str, Any]:
+        traffic_data.update(await self.send(traffic_data))
+        return traffic_data
+
+    def submit(self, traffic_data: Dict[str, Any]) -> Future:
+        """Send a request without waiting; the future resolves to the updated traffic entry"""
+        return asyncio.run_coroutine_threadsafe(self._send_into(traffic_data), self.loop)
+
+    def dispatch(self, traffic_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and merge the response into the traffic entry"""
+        return self.submit(traffic_data).result()
+
+    def dispatch_batch(self, traffic_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send a batch of requests concurrently, bounded by the connection pool"""
+        async def send_all():
+            await asyncio.gather(*(self._send_into(traffic_data) for traffic_data in traffic_batch))
+        asyncio.run_coroutine_threadsafe(send_all(), self.loop).result()
+        return traffic_batch
+
+    def close(self):
+        try:
+            asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result(timeout=5)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+
+# Dispatchers of running campaigns, keyed by campaign ID
+_dispatchers: Dict[str, HttpDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(campaign_id: str, options: Dict[str, Any]) -> HttpDispatcher:
+    """Return the dispatcher of a campaign, creating it from the campaign config on first use"""
+    dispatcher = _dispatchers.get(campaign_id)
+    if dispatcher is None:
+        with _dispatchers_lock:
+            dispatcher = _dispatchers.get(campaign_id)
+            if dispatcher is None:
+                dispatcher = HttpDispatcher(**http_options(options))
+                _dispatchers[campaign_id] = dispatcher
+                logger.info(f"[Dispatch] Opened HTTP connection pool of {dispatcher.concurrency} for campaign {campaign_id}")
+    return dispatcher
+
+
+def close_dispatcher(campaign_id: str):
+    """Close the connection pool of a campaign"""
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.pop(campaign_id, None)
+    if dispatcher is not None:
+        dispatcher.close()
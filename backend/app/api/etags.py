@@ -0,0 +1,81 @@
+"""
+Conditional GETs of polled endpoints.
+
+The dashboard polls ``/status``, ``/monitor``, ``/campaigns/<id>/info`` and
+``/api/sessions/`` every few seconds, and most polls find nothing changed. The
+responses of these endpoints carry an ETag built only from state in memory:
+the counters and highest seq of the campaign's open segment store, whether its
+generator runs, its session's status and update times, and a version bumped by
+every other write those endpoints read (legacy traffic files, cluster state,
+status updates, cleanup). A request whose ``If-None-Match`` holds the current
+ETag is answered with ``304 Not Modified`` before any file is read.
+
+The version is also bumped whenever a generator commits records, and
+``wait_for_campaign_change`` blocks until it moves, so live monitoring streams
+push updates as they happen instead of polling.
+
+ETags include an id of the process, so ETags from before a restart never match.
+Responses are sent with ``Cache-Control: no-cache``, so browsers keep them and
+revalidate them on every poll.
+"""
+
+import hashlib
+import threading
+import uuid
+from typing import Any, Dict, Optional
+from flask import current_app, request
+from .logging_config import get_logger
+
+logger = get_logger('ETags')
+
+PROCESS_ID = uuid.uuid4().hex[:8]
+
+# Versions of campaign state, by campaign ID, and the conditions their waiters wait on
+_campaign_versions: Dict[str, int] = {}
+_campaign_changes: Dict[str, threading.Condition] = {}
+_campaign_versions_lock = threading.Lock()
+
+
+def _campaign_change(campaign_id: str) -> threading.Condition:
+    change = _campaign_changes.get(campaign_id)
+    if change is None:
+        change = _campaign_changes[campaign_id] = threading.Condition(_campaign_versions_lock)
+    return change
+
+
+def bump_campaign_version(campaign_id: str):
+    """Mark the state of a campaign as changed and wake its waiters"""
+    with _campaign_versions_lock:
+        _campaign_versions[campaign_id] = _campaign_versions.get(campaign_id, 0) + 1
+        _campaign_change(campaign_id).notify_all()
+
+
+def campaign_version(campaign_id: str) -> int:
+    return _campaign_versions.get(campaign_id, 0)
+
+
+def wait_for_campaign_change(campaign_id: str, version: int, timeout: float) -> int:
+    """Wait until the version of a campaign moves past ``version`` or the timeout passes, and return it"""
+    with _campaign_versions_lock:
+        _campaign_change(campaign_id).wait_for(lambda: _campaign_versions.get(campaign_id, 0) != version, timeout)
+        return _campaign_versions.get(campaign_id, 0)
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag of a response built from the given in-memory state"""
+    return hashlib.sha1(repr((PROCESS_ID,) + parts).encode()).hexdigest()[:20]
+
+
+def not_modified(etag: str) -> Optional[Any]:
+    """Return a 304 response if the request already holds ``etag``, else None"""
+    # Weak comparison: compressed responses carry the ETag as a weak one
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(current_app.response_class(status=304), etag)
+
+
+def with_etag(response, etag: str):
+    """Set the ETag of a response and have clients revalidate it on every use"""
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,152 @@
+"""
+Window of in-flight requests of a live campaign.
+
+A live campaign used to spend every request's latency inline before pacing the
+next one, so it could never exceed ``1 / latency`` requests per second whatever
+its target rate. Requests now complete asynchronously: up to ``max_in_flight``
+of them are outstanding at once and finished ones are collected between
+arrivals, in the order they were sent so that sequence numbers follow record
+indices. Simulated requests complete when their drawn latency has elapsed,
+HTTP requests when the dispatcher's future resolves.
+
+``max_in_flight`` defaults to ``auto``, which follows Little's law: the window
+is sized to the arrival rate times the observed mean latency, with headroom.
+"""
+
+import time
+import random
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional
+from .logging_config import get_logger
+from .seeding import RESPONSE_STREAM, record_rng
+
+logger = get_logger('InFlight')
+
+AUTO = 'auto'
+MIN_IN_FLIGHT = 4
+MAX_IN_FLIGHT = 10000
+HEADROOM = 2.0
+LATENCY_SMOOTHING = 0.1
+INITIAL_LATENCY = 0.5  # seconds, until responses are observed
+
+
+def in_flight_limit(options: Dict[str, Any]) -> Optional[int]:
+    """Return the configured maximum of requests in flight, None for ``auto``, validated"""
+    setting = options.get('max_in_flight', AUTO)
+    if setting in (None, AUTO):
+        return None
+    try:
+        limit = int(setting)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid max_in_flight {setting!r}; expected a number or {AUTO!r}")
+    if limit < 1:
+        raise ValueError(f"Invalid max_in_flight {limit}")
+    return limit
+
+
+class InFlightWindow:
+    """Requests of one campaign that have been sent and not yet completed"""
+
+    def __init__(self, config, max_in_flight=None):
+        from .traffic import uses_http_dispatch
+        from .dispatch import get_dispatcher
+
+        self.config = config
+        self.fixed_limit = max_in_flight if max_in_flight is not None else in_flight_limit(config.config)
+        self.auto = self.fixed_limit is None
+        self.rate = max(config.requests_per_minute, 1) / 60.0  # arrivals per second
+        self.mean_latency = INITIAL_LATENCY
+        self.dispatcher = get_dispatcher(config.campaign_id, config.config) if uses_http_dispatch(config) else None
+        # Requests in the order they were sent, as [traffic_data, due time or HTTP future]
+        self._pending: Deque[list] = deque()
+        self.last_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Current maximum of requests in flight"""
+        if not self.auto:
+            return self.fixed_limit
+        # Little's law: requests in flight = arrival rate x time in system
+        return int(min(MAX_IN_FLIGHT, max(MIN_IN_FLIGHT, self.rate * self.mean_latency * HEADROOM + 1)))
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, traffic_data: Dict[str, Any], index: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Send a request, first waiting for a free slot if the window is full.
+
+        ``index`` is the record's index in its campaign, which makes simulated responses
+        reproducible. Returns the requests that completed in the meantime; ``last_wait`` is
+        the time spent waiting for the slot.
+        """
+        completed = self.collect()
+        wait_start = time.monotonic()
+        while len(self) >= self.limit:
+            completed.extend(self.collect(wait_for_one=True))
+        self.last_wait = time.monotonic() - wait_start
+
+        if self.dispatcher is not None:
+            self._pending.append([traffic_data, self.dispatcher.submit(traffic_data)])
+        else:
+            from .traffic import build_simulated_response, get_campaign_seed
+            seed = get_campaign_seed(self.config) if index is not None else None
+            rng = record_rng(seed, index, RESPONSE_STREAM) if seed is not None else random
+            latency = rng.uniform(0.05, 0.5)
+            request_time = datetime.fromisoformat(traffic_data['timestamp']) if traffic_data.get('timestamp') else datetime.utcnow()
+            traffic_data.update(build_simulated_response(traffic_data, latency, request_time + timedelta(seconds=latency), rng))
+            self._pending.append([traffic_data, time.monotonic() + latency])
+        return completed
+
+    def collect(self, wait_for_one: bool = False, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return the requests that have completed, in the order they were sent.
+
+        With ``wait_for_one`` first waits, at most ``timeout`` seconds, for the oldest
+        outstanding request to complete.
+        """
+        if wait_for_one and self._pending:
+            completion = self._pending[0][1]
+            if isinstance(completion, Future):
+                try:
+                    completion.result(timeout=timeout)
+                except FutureTimeoutError:
+                    pass
+                except Exception:
+                    pass  # recorded on the entry below
+            else:
+                delay = max(0.0, completion - time.monotonic())
+                time.sleep(delay if timeout is None else min(delay, timeout))
+
+        completed = []
+        now = time.monotonic()
+        while self._pending:
+            traffic_data, completion = self._pending[0]
+            if isinstance(completion, Future):
+                if not completion.done():
+                    break
+                try:
+                    completion.result()
+                except Exception as e:
+                    logger.error(f"[InFlight] Request {traffic_data.get('id')} failed: {str(e)}")
+                    traffic_data.update({"success": False, "error": str(e), "status_code": None})
+            elif completion > now:
+                break
+            self._pending.popleft()
+            completed.append(traffic_data)
+            self._observe(traffic_data.get('response_time'))
+        return completed
+
+    def drain(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for every outstanding request and return them"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        completed = []
+        while len(self) and (deadline is None or time.monotonic() < deadline):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            completed.extend(self.collect(wait_for_one=True, timeout=remaining))
+        return completed
+
+    def _observe(self, response_time_ms: Optional[float]):
+        if response_time_ms:
+            self.mean_latency += LATENCY_SMOOTHING * (response_time_ms / 1000 - self.mean_latency)
@@ -37,6 +37,10 @@ class UserProfile:
         'preferred_ad_formats': [],
         'adid_persistence': 'per_user'
     })
+    behavioral_patterns: Dict = field(default_factory=lambda: {
+        'browsing_frequency': None,
+        'peak_hours': None
+    })
     referrers: Dict = field(default_factory=dict)
     created_at: str = field(default_factory=lambda: str(uuid.uuid4()))
     updated_at: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -68,6 +72,7 @@ def create_profile():
             device_preferences=data.get('device_preferences', {}),
             app_usage=data.get('app_usage', {}),
             rtb_specifics=data.get('rtb_specifics', {}),
+            behavioral_patterns=data.get('behavioral_patterns') or {},
             referrers=referrers
         )
         profiles[profile_id] = profile
@@ -117,6 +122,7 @@ def update_profile(profile_id):
         profile.device_preferences = data.get('device_preferences', profile.device_preferences)
         profile.app_usage = data.get('app_usage', profile.app_usage)
         profile.rtb_specifics = data.get('rtb_specifics', profile.rtb_specifics)
+        profile.behavioral_patterns = data.get('behavioral_patterns', profile.behavioral_patterns)
         profile.referrers = data.get('referrers', profile.referrers)
         profile.updated_at = str(uuid.uuid4())
         logger.info(f"[Profile] Updated: {profile}")
@@ -0,0 +1,201 @@
+"""
+Compiled record templates for traffic generation.
+
+Every generated record used to re-validate the campaign config, copy its dozen
+constant fields, look up the profile weights and walk the nested
+``rtb_config.get(...)`` defaults of the bid request. A campaign now compiles its
+config once into a ``RecordTemplate`` holding the constant fields, the OpenRTB
+``imp`` and ``site`` sections, the resolved top-level defaults and, per profile,
+its interests, countries, referrers and device preferences. Filling a record
+only draws its variable slots (profile, interest, country, referrer, ADID,
+device, IP and RTB ID), in the same order as the uncompiled path, so a seeded
+campaign produces the same records either way.
+
+Constant sections are shared by all records of a campaign and must not be
+mutated. The template also keeps them encoded as JSON fragments for
+``TrafficRecord.encode()``.
+"""
+
+import random
+import string
+import threading
+from typing import Any, Dict, List, Optional
+from .logging_config import get_logger
+from .sampling import AliasSampler
+from .traffic_record import POOLED, TrafficRecord, encode_fields, encode_value
+
+logger = get_logger('RecordTemplate')
+
+
+class CompiledProfile:
+    """The fields of a user profile that records draw from"""
+
+    __slots__ = ('id', 'interests', 'countries', 'referrers')
+
+    def __init__(self, profile: Dict[str, Any]):
+        demographics = profile.get('demographics') or {}
+        self.id = profile.get('id')
+        self.interests = list(demographics.get('interests') or [])
+        self.countries = list(demographics.get('countries') or [])
+        self.referrers = profile.get('referrers') or {}
+
+
+class RecordTemplate:
+    """A campaign's records with only the variable slots left open"""
+
+    def __init__(self, config):
+        from .traffic import TrafficConfig, get_device_pools, pick_adid
+
+        if not isinstance(config, TrafficConfig):
+            raise ValueError("Invalid config type")
+        if not config.campaign_id or not config.target_url:
+            raise ValueError("Missing required field: campaign_id or target_url")
+
+        self.config = config
+        self.campaign_id = config.campaign_id
+        self.pick_adid = pick_adid
+        self.campaign_fields = {
+            "campaign_id": config.campaign_id,
+            "target_url": config.target_url,
+            "requests_per_minute": config.requests_per_minute,
+            "duration_minutes": config.duration_minutes,
+            "geo_locations": config.geo_locations,
+            "rtb_config": config.rtb_config,
+            "config": config.config,
+            "user_profile_ids": config.user_profile_ids,
+            "profile_user_counts": config.profile_user_counts,
+            "total_profile_users": config.total_profile_users
+        }
+        self.campaign_json = encode_fields(self.campaign_fields)
+        self.campaign_referrers = config.campaign_referrers or {}
+
+        # Same items and weights as the campaign's profile samplers, so the same draws pick the same profiles
+        counts = config.profile_user_counts
+        compiled = [CompiledProfile(profile) for profile in config.user_profiles]
+        weights = [counts.get(profile.id, 0) for profile in compiled]
+        self.profile_sampler = AliasSampler(compiled, weights) if any(w > 0 for w in weights) else None
+        id_weights = [counts.get(pid, 0) for pid in config.user_profile_ids]
+        self.profile_id_sampler = (AliasSampler(config.user_profile_ids, id_weights)
+                                   if any(w > 0 for w in id_weights) else None)
+
+        rtb_config = config.rtb_config
+        self.rtb = bool(rtb_config)
+        if self.rtb:
+            self.imp = [{
+                "id": "1",
+                "banner": {
+                    "w": rtb_config.get("banner_w", 300),
+                    "h": rtb_config.get("banner_h", 250)
+                },
+                "bidfloor": rtb_config.get("bidfloor", 0.03),
+                "bidfloorcur": rtb_config.get("bidfloorcur", "USD")
+            }]
+            self.site = {
+                "id": rtb_config.get("site_id", "site123"),
+                "name": rtb_config.get("site_name", "Example Site"),
+                "domain": rtb_config.get("site_domain", "example.com")
+            }
+            self.ua = rtb_config.get("ua", POOLED)
+            self.ip = rtb_config.get("ip", POOLED)
+            self.default_user_id = rtb_config.get("user_id", "user123")
+            self.auction_type = rtb_config.get("at", 2)
+            self.tmax = rtb_config.get("tmax", 120)
+            self.currency = rtb_config.get("cur", ["USD"])
+            self.pools = get_device_pools(config)
+            self.imp_json = ',"rtb_imp":' + encode_value(self.imp)
+            self.site_json = ',"rtb_site":' + encode_value(self.site)
+            self.rtb_constants_json = encode_fields({"rtb_auction_type": self.auction_type,
+                                                     "rtb_timeout": self.tmax, "rtb_currency": self.currency})
+            self.rtb_data_sections_json = encode_fields({"imp": self.imp, "site": self.site})
+            self.rtb_data_tail_json = encode_fields({"at": self.auction_type, "tmax": self.tmax, "cur": self.currency}) + '}'
+            self.fixed_ip_json = None if self.ip is POOLED else encode_value(self.ip)
+            # Encoded pooled devices by id(), as the JSON before and after their IP
+            self.device_json: Dict[int, tuple] = {}
+            # Device preferences come from the config's profiles, which worker processes and cluster
+            # nodes receive with it, as for uncompiled bid requests
+            self.device_profiles = {profile.get("id"): profile for profile in config.user_profiles}
+
+    def pick_profile(self, rng: random.Random = random) -> Optional[CompiledProfile]:
+        return self.profile_sampler.sample(rng) if self.profile_sampler else None
+
+    def pick_profiles(self, count: int) -> List[Optional[CompiledProfile]]:
+        return self.profile_sampler.sample_many(count) if self.profile_sampler else [None] * count
+
+    def fill(self, request_id: str, timestamp: str, profile: Optional[CompiledProfile],
+             rng: random.Random = random) -> Dict[str, Any]:
+        """Build the record of a request by the picked ``profile`` as a dict"""
+        return self.fill_record(request_id, timestamp, profile, rng).to_dict()
+
+    def fill_record(self, request_id: str, timestamp: str, profile: Optional[CompiledProfile],
+                    rng: random.Random = random) -> TrafficRecord:
+        """Build the record of a request by the picked ``profile``, drawing its variable slots from ``rng``"""
+        profile_id = interest = country = referrer = None
+        if profile is not None:
+            profile_id = profile.id
+            interest = rng.choice(profile.interests) if profile.interests else None
+            country = rng.choice(profile.countries) if profile.countries else None
+            if interest and country:
+                # Campaign referrers first, then the profile's own
+                referrer_key = f"{interest}|{country}"
+                candidates = self.campaign_referrers.get(referrer_key)
+                if candidates:
+                    referrer = rng.choice(candidates)
+                if not referrer:
+                    candidates = profile.referrers.get(referrer_key)
+                    if candidates:
+                        referrer = rng.choice(candidates)
+        if not self.rtb:
+            return TrafficRecord(self, request_id, timestamp, profile_id, interest, country, referrer)
+
+        adid = None
+        device_profile_id = profile_id
+        if profile_id:
+            adid = self.pick_adid(self.campaign_id, profile_id, rng)
+        elif self.profile_id_sampler:
+            device_profile_id = self.profile_id_sampler.sample(rng)
+            adid = self.pick_adid(self.campaign_id, device_profile_id, rng)
+        device = self.pools.pick_device(device_profile_id, self.device_profiles.get(device_profile_id), rng)
+        ip = self.pools.pick_ip(country, rng)
+        rtb_id = ''.join(rng.choices(string.digits, k=10))
+        return TrafficRecord(self, request_id, timestamp, profile_id, interest, country, referrer,
+                             rtb_id, device, ip, adid)
+
+    def encoded_device(self, device: Dict[str, Any], ip: str) -> str:
+        """JSON of the ``rtb_device`` of a pooled device and IP"""
+        fragments = self.device_json.get(id(device))
+        if fragments is None:
+            ua = device["ua"] if self.ua is POOLED else self.ua
+            fragments = ('{"ua":' + encode_value(ua) + ',"ip":',
+                         encode_fields({"make": device["make"], "model": device["model"],
+                                        "os": device["os"], "osv": device["osv"]}) + '}')
+            self.device_json[id(device)] = fragments
+        return fragments[0] + (self.fixed_ip_json or encode_value(ip)) + fragments[1]
+
+
+# Templates of campaigns, keyed by campaign ID
+_templates: Dict[str, RecordTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_record_template(config) -> RecordTemplate:
+    """Return the template of a campaign, compiling it on first use.
+
+    A template belongs to one config object: a run's config doesn't change while it runs,
+    and callers passing another config get a freshly compiled template.
+    """
+    template = _templates.get(config.campaign_id)
+    if template is not None and template.config is config:
+        return template
+    with _templates_lock:
+        template = _templates.get(config.campaign_id)
+        if template is None or template.config is not config:
+            template = RecordTemplate(config)
+            _templates[config.campaign_id] = template
+            logger.debug(f"[Templates] Compiled record template of campaign {config.campaign_id}")
+        return template
+
+
+def discard_record_template(campaign_id: str):
+    """Forget the template of a campaign"""
+    with _templates_lock:
+        _templates.pop(campaign_id, None)
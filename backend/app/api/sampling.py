@@ -0,0 +1,99 @@
+"""
+Weighted sampling for traffic generation.
+
+Profiles are picked in proportion to their user counts. Instead of expanding a
+list with one entry per user, ``AliasSampler`` builds a Vose alias table once,
+so a pick costs O(1) time and the table O(#profiles) memory however many users
+a campaign has. Samplers are cached per campaign and rebuilt only when the
+weights change.
+"""
+
+import random
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .logging_config import get_logger
+
+logger = get_logger('Sampling')
+
+
+class AliasSampler:
+    """Vose alias table over weighted items"""
+
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("items and weights must have the same length")
+        pairs = [(item, float(weight)) for item, weight in zip(items, weights) if weight > 0]
+        if not pairs:
+            raise ValueError("At least one item needs a positive weight")
+        self.items: List[Any] = [item for item, _ in pairs]
+        n = len(pairs)
+        total = sum(weight for _, weight in pairs)
+        scaled = [weight * n / total for _, weight in pairs]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # Whatever is left is 1.0 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng: random.Random = random) -> Any:
+        """Pick one item"""
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+    def sample_many(self, k: int, rng: random.Random = random) -> List[Any]:
+        """Pick ``k`` items independently"""
+        items, prob, alias, n = self.items, self.prob, self.alias, len(self.items)
+        picks = []
+        for _ in range(k):
+            i = int(rng.random() * n)
+            picks.append(items[i] if rng.random() < prob[i] else items[alias[i]])
+        return picks
+
+
+# Cached samplers, keyed by campaign and purpose, with the weights they were built from
+_samplers: Dict[Tuple[str, str], Tuple[Tuple, AliasSampler]] = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler(campaign_id: str, name: str, keys: Sequence[Any], items: Sequence[Any],
+                weights: Sequence[float]) -> Optional[AliasSampler]:
+    """Return the cached sampler of a campaign, rebuilding it when keys or weights changed.
+
+    Returns None when no item has a positive weight.
+    """
+    signature = (tuple(keys), tuple(weights))
+    cache_key = (campaign_id, name)
+    cached = _samplers.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _samplers_lock:
+        if not any(weight > 0 for weight in weights):
+            _samplers.pop(cache_key, None)
+            return None
+        sampler = AliasSampler(items, weights)
+        _samplers[cache_key] = (signature, sampler)
+        logger.debug(f"[Sampling] Built {name} sampler for campaign {campaign_id} over {len(sampler)} items")
+        return sampler
+
+
+def discard_samplers(campaign_id: str):
+    """Forget the cached samplers of a campaign"""
+    with _samplers_lock:
+        for cache_key in [key for key in _samplers if key[0] == campaign_id]:
+            del _samplers[cache_key]
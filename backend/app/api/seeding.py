@@ -0,0 +1,49 @@
+"""
+Reproducible random streams for traffic generation.
+
+Every campaign has a seed (``config['seed']``, or a random one kept in
+``adids.json``). Record ``i`` of a campaign draws all of its random choices
+from its own generator keyed by ``(seed, i)``, so a record does not depend on
+what was generated before it: any slice of a campaign can be regenerated on its
+own, in parallel, and two runs with the same seed produce the same records.
+Simulated responses and arrival jitter use separate streams of the same key, so
+they stay reproducible whatever the record generation consumed. Pools and
+other campaign-wide tables are built from generators derived from the seed and
+their name.
+"""
+
+import random
+import hashlib
+from typing import Any, Optional
+
+RECORD_STREAM = 0
+RESPONSE_STREAM = 1
+SCHEDULE_STREAM = 2
+
+MAX_SEED = (1 << 63) - 1
+
+
+def new_seed() -> int:
+    return random.getrandbits(63)
+
+
+def parse_seed(value: Any) -> Optional[int]:
+    """Return a seed given as an int or a numeric string, or None when none was given"""
+    if value is None or value == '':
+        return None
+    seed = int(value)
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be between 0 and {MAX_SEED}")
+    return seed
+
+
+def record_rng(seed: int, index: int, stream: int = RECORD_STREAM) -> random.Random:
+    """Generator of one record: a pure function of the campaign seed, the record index and the stream"""
+    # Mersenne Twister seeding hashes the whole key, so adjacent keys give unrelated streams
+    return random.Random((seed << 72) | (stream << 64) | index)
+
+
+def derive_rng(seed: int, *labels: Any) -> random.Random:
+    """Generator for a named campaign-wide table, e.g. ``derive_rng(seed, 'devices', profile_id)``"""
+    key = ':'.join(str(label) for label in (seed,) + labels)
+    return random.Random(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest())
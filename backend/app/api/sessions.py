@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from .logging_config import get_logger
+from .etags import make_etag, not_modified, with_etag
 from .llm_referrer_bank import get_referrers
 # from bson import ObjectId # Commented out ObjectId import
 
@@ -80,6 +81,10 @@ class Session:
 # Initialize in-memory storage for sessions
 sessions: Dict[str, Session] = {}
 
+def session_state(session: Session) -> tuple:
+    """The fields every change to a session updates, for ETags of responses built from it"""
+    return session.status, session.updated_at, session.start_time, session.end_time
+
 def generate_campaign_referrers(user_profile_ids: List[str], geo_locations: List[str]) -> Dict[str, List[str]]:
     """
     Generate campaign-specific referrers based on assigned profiles and geo locations.
@@ -223,44 +228,29 @@ def create_session():
 @bp.route("/", methods=['GET'])
 def list_sessions():
     """List all traffic sessions, updating total_requests and successful_requests from traffic files"""
-    import os
-    import json
-    from app.api.traffic import TRAFFIC_DATA_DIR
+    from app.api.traffic import get_campaign_traffic_summary, campaign_state
     try:
         logger.info("[Session] List all request received")
+        etag = make_etag('sessions', [(session.id, session_state(session), campaign_state(session.id))
+                                      for session in sessions.values()])
+        response = not_modified(etag)
+        if response is not None:
+            return response
         session_dicts = []
         for session in sessions.values():
-            # Try to update total_requests and successful_requests from traffic file
+            # Try to update total_requests and successful_requests from the campaign traffic
             campaign_id = session.id
-            campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
-            if os.path.exists(campaign_file):
-                try:
-                    with open(campaign_file, 'r') as f:
-                        traffic_data = json.load(f)
-                    
-                    # Handle both old list format and new object format
-                    if isinstance(traffic_data, list):
-                        # Old format - list of requests
-                        session.total_requests = len(traffic_data)
-                        session.successful_requests = sum(1 for entry in traffic_data if entry.get('success', False))
-                    elif isinstance(traffic_data, dict):
-                        # New format - object with request IDs as keys
-                        session.total_requests = len(traffic_data)
-                        session.successful_requests = sum(1 for entry in traffic_data.values() if entry.get('success', False))
-                    else:
-                        logger.warning(f"Unknown traffic data format in sessions: {type(traffic_data)}")
-                        session.total_requests = 0
-                        session.successful_requests = 0
-                except Exception as e:
-                    logger.warning(f"Could not read traffic file for session {campaign_id}: {e}")
-                    session.total_requests = 0
-                    session.successful_requests = 0
-            else:
+            try:
+                summary = get_campaign_traffic_summary(campaign_id)
+                session.total_requests = summary["total_requests"]
+                session.successful_requests = summary["successful_requests"]
+            except Exception as e:
+                logger.warning(f"Could not read traffic data for session {campaign_id}: {e}")
                 session.total_requests = 0
                 session.successful_requests = 0
             session_dicts.append(session.to_dict())
         logger.info(f"[Session] Listed all sessions: count={len(session_dicts)}")
-        return jsonify(session_dicts)
+        return with_etag(jsonify(session_dicts), etag)
     except Exception as e:
         logger.error(f"[Session] Error listing: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,220 @@
+"""
+Process-pool sharding of a single campaign.
+
+With ``config['workers'] > 1`` a campaign is generated by that many worker
+processes instead of one thread, so record generation, JSON encoding and file
+I/O are not bound to a single GIL-holding core. Each worker:
+
+- generates every ``workers``-th record of the campaign, at the arrival times of
+  those records, so the merged stream keeps the pacing,
+- samples ADIDs from its own disjoint slice of every profile's users,
+- appends to its own segment stream ``shard-<k>`` with interleaved sequence numbers.
+
+Record ``i`` (sequence number ``i + 1``) is generated from the campaign seed and
+``i``, so a run is reproducible for a given seed and worker count.
+
+The parent thread merges the counters the workers report after every batch and
+publishes them through the usual campaign status.
+"""
+
+import queue
+import multiprocessing
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from .logging_config import get_logger
+from .etags import bump_campaign_version
+
+logger = get_logger('Sharding')
+
+SHARD_STREAM_PREFIX = 'shard-'
+PROGRESS_POLL_SECONDS = 0.5
+
+
+def worker_count(options: Dict[str, Any]) -> int:
+    """Return the configured number of worker processes, validated"""
+    workers = options.get('workers')
+    try:
+        workers = 1 if workers is None else int(workers)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid worker count {workers!r}")
+    if workers < 1:
+        raise ValueError(f"Invalid worker count {workers}")
+    return workers
+
+
+def shard_stream(shard_index: int) -> str:
+    return f"{SHARD_STREAM_PREFIX}{shard_index}"
+
+
+def run_shard(config, store, stream: str, shard_index: int, shard_count: int, start_time: datetime,
+              end_time: Optional[datetime], total_requests: int, fast_forward: bool, should_stop, on_batch,
+              wait=None, seq_base: int = 0) -> int:
+    """Generate one shard of a campaign in batches and return the number of records written.
+
+    The shard holds records ``seq_base + shard_index + k * shard_count`` of the campaign. In
+    fast-forward mode batches are generated back to back on the virtual clock. Otherwise each
+    batch holds the requests that are due, and ``wait(seconds)`` pauses until the next one.
+    """
+    from .traffic import (FAST_FORWARD_BATCH_SIZE, scheduled_request_time, generate_traffic_batch,
+                          complete_request_batch)
+
+    shard_total = total_requests // shard_count + (1 if shard_index < total_requests % shard_count else 0)
+    offset = shard_index
+    virtual_now = scheduled_request_time(config, start_time, offset, seq_base + offset)
+    count = 0
+    while not should_stop():
+        horizon = None if fast_forward else datetime.utcnow()
+        request_times = []
+        indices = []
+        while len(request_times) < FAST_FORWARD_BATCH_SIZE:
+            if end_time and virtual_now >= end_time:
+                break
+            if fast_forward and not end_time and count + len(request_times) >= shard_total:
+                break
+            if horizon and virtual_now > horizon:
+                break
+            request_times.append(virtual_now)
+            indices.append(seq_base + offset)
+            offset += shard_count
+            virtual_now = scheduled_request_time(config, start_time, offset, seq_base + offset)
+
+        if request_times:
+            traffic_batch = generate_traffic_batch(config, len(request_times), timestamps=request_times,
+                                                   indices=indices, as_records=True)
+            complete_request_batch(config, traffic_batch, request_times, indices)
+            store.append_batch(traffic_batch, stream)
+            count += len(traffic_batch)
+            on_batch(traffic_batch, virtual_now)
+        elif (end_time and virtual_now >= end_time) or (fast_forward and count >= shard_total):
+            break
+        elif wait:
+            wait(max(0.01, (virtual_now - datetime.utcnow()).total_seconds()))
+    return count
+
+
+def run_shard_worker(config, campaign_dir: str, adids, shard_index: int, shard_count: int, seq_base: int,
+                     start_time: datetime, end_time: Optional[datetime], total_requests: int,
+                     fast_forward: bool, stop_event, progress):
+    """Entry point of a worker process: generate one shard and report each batch to the parent"""
+    from .traffic import campaign_adids
+    from .traffic_store import get_store
+    from .dispatch import close_dispatcher
+
+    store = None
+    try:
+        if adids is not None:
+            campaign_adids[config.campaign_id] = adids
+        store = get_store(campaign_dir)
+        stream = shard_stream(shard_index)
+        store.writer(stream, seq_start=seq_base + shard_index + 1, seq_stride=shard_count)
+
+        def report(traffic_batch, virtual_now):
+            progress.put({
+                "shard": shard_index,
+                "count": len(traffic_batch),
+                "successful": sum(1 for record in traffic_batch if record.get('success')),
+                "last_record": traffic_batch[-1],
+                "virtual_time": virtual_now.isoformat()
+            })
+
+        run_shard(config, store, stream, shard_index, shard_count, start_time, end_time, total_requests,
+                  fast_forward, stop_event.is_set, report, wait=stop_event.wait, seq_base=seq_base)
+    except Exception as e:
+        logger.error(f"[Shard {shard_index}] Error generating shard of campaign {config.campaign_id}: {str(e)}", exc_info=True)
+        progress.put({"shard": shard_index, "error": str(e)})
+    finally:
+        if store is not None:
+            store.close()
+        close_dispatcher(config.campaign_id)
+        progress.put({"shard": shard_index, "done": True})
+
+
+def run_sharded_generation(config, thread_id: str, store, shard_count: int, start_time: datetime,
+                           end_time: Optional[datetime], total_requests: int, fast_forward: bool,
+                           wall_start: float) -> Tuple[int, int, datetime, bool]:
+    """Run a campaign on ``shard_count`` worker processes until they finish or the campaign is stopped.
+
+    Returns the request count, successful request count, latest virtual time and whether it was stopped.
+    """
+    from .traffic import (active_threads, campaign_adids, append_campaign_log, update_campaign_status,
+                          report_fast_forward_progress)
+
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    progress = context.Queue()
+    adids = campaign_adids.get(config.campaign_id)
+    seq_base = store.max_seq
+
+    streams = [shard_stream(shard_index) for shard_index in range(shard_count)]
+    # Readers hold back the records a lagging shard may still write below
+    store.begin_live_streams(streams, seq_base)
+    try:
+        processes = []
+        for shard_index in range(shard_count):
+            process = context.Process(
+                target=run_shard_worker,
+                args=(config, store.campaign_dir, adids.shard(shard_index, shard_count) if adids else None,
+                      shard_index, shard_count, seq_base, start_time, end_time, total_requests,
+                      fast_forward, stop_event, progress),
+                daemon=True,
+                name=f"traffic_shard_{config.campaign_id}_{shard_index}"
+            )
+            process.start()
+            processes.append(process)
+        logger.info(f"[Sharding] Started {shard_count} worker processes for campaign {config.campaign_id}")
+
+        request_count = 0
+        successful_requests = 0
+        shard_times: Dict[int, datetime] = {}
+        done = set()
+        user_stopped = False
+        while len(done) < shard_count:
+            if not user_stopped and active_threads.get(config.campaign_id) != thread_id:
+                logger.info(f"[Sharding] Stopping worker processes of campaign {config.campaign_id}")
+                user_stopped = True
+                stop_event.set()
+            try:
+                message: Dict[str, Any] = progress.get(timeout=PROGRESS_POLL_SECONDS)
+            except queue.Empty:
+                for shard_index, process in enumerate(processes):
+                    if shard_index not in done and not process.is_alive():
+                        logger.error(f"[Sharding] Worker {shard_index} of campaign {config.campaign_id} exited with code {process.exitcode}")
+                        done.add(shard_index)
+                continue
+
+            shard_index = message["shard"]
+            if message.get("done"):
+                done.add(shard_index)
+                continue
+            if "error" in message:
+                append_campaign_log(config.campaign_id, f"ERROR: Worker {shard_index} failed: {message['error']}")
+                continue
+
+            store.count_appended(message["count"], message["successful"], message["last_record"])
+            bump_campaign_version(config.campaign_id)
+            request_count += message["count"]
+            successful_requests += message["successful"]
+            shard_times[shard_index] = datetime.fromisoformat(message["virtual_time"])
+            append_campaign_log(config.campaign_id, f"BATCH: Worker {shard_index} saved {message['count']} requests ({message['successful']} successful), total {request_count}")
+
+            if fast_forward:
+                # The campaign has reached the virtual time of its slowest worker
+                report_fast_forward_progress(config, request_count, successful_requests, total_requests,
+                                             min(shard_times.values()), wall_start)
+            else:
+                update_campaign_status(config.campaign_id, "running", {
+                    "progress_percentage": (request_count / total_requests) * 100 if total_requests > 0 else 0,
+                    "total_requests": request_count,
+                    "successful_requests": successful_requests,
+                    "last_updated": datetime.utcnow().isoformat(),
+                    "traffic_generation_active": True,
+                    "workers": shard_count
+                })
+
+        for process in processes:
+            process.join(timeout=5)
+    finally:
+        store.end_live_streams(streams)
+    virtual_now = max(shard_times.values()) if shard_times else start_time
+    logger.info(f"[Sharding] Worker processes of campaign {config.campaign_id} finished with {request_count} requests")
+    return request_count, successful_requests, virtual_now, user_stopped
@@ -0,0 +1,57 @@
+"""
+Mergeable cardinality sketches.
+
+Worker nodes of a distributed campaign cannot ship every ADID to the
+coordinator, so each keeps a HyperLogLog of the values it emitted. Sketches of
+different nodes merge by taking the register-wise maximum, and the merged
+sketch estimates the number of distinct values with about 1.6% error at the
+default precision.
+"""
+
+import math
+import base64
+import hashlib
+from typing import Optional
+
+DEFAULT_PRECISION = 12  # 4096 registers
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over strings"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(self.registers)}")
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = h & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            # Small range correction
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(raw))
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+
+    @classmethod
+    def from_base64(cls, data: str, precision: int = DEFAULT_PRECISION) -> 'HyperLogLog':
+        return cls(precision, bytearray(base64.b64decode(data)))
@@ -1,18 +1,39 @@
 import os
 import json
-from flask import Blueprint, request, jsonify, send_file, abort
-from typing import List, Optional, Dict, Any
+from flask import Blueprint, Response, request, jsonify, send_file, abort, url_for
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 import threading
 import random
 import time
+import zlib
+from collections import deque
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from .logging_config import get_logger
 import uuid
 from app.api.sessions import sessions
 from app.api.profiles import profiles
-from faker import Faker
 import string
+from .traffic_store import (CampaignStore, StreamReader, COMPRESSED_SUFFIX, cached_store, encode_record, get_store,
+                            has_store, segment_index)
+from .etags import (bump_campaign_version, campaign_version, make_etag, not_modified, wait_for_campaign_change,
+                    with_etag)
+from .compression import GZIP_HEADER, crc32_combine, gzip_trailer, negotiate_encoding, new_compressor
+from .traffic_query import QUERY_PARAMS, parse_fields, parse_record_filter, project
+from .traffic_export import EXPORT_FORMATS, EXPORT_TABLES, column_types, export_table
+from .sampling import AliasSampler, get_sampler, discard_samplers
+from .adids import CampaignAdids
+from .dispatch import DISPATCH_HTTP, DEFAULT_TIMEOUT, get_dispatcher, close_dispatcher, http_options
+from .inflight import InFlightWindow, in_flight_limit
+from .backpressure import PAUSE_POLL_SECONDS, Backpressure, backpressure_options, overload_policy
+from .seeding import RESPONSE_STREAM, record_rng, parse_seed
+from .arrivals import ArrivalSchedule, arrival_processes, rate_shapes, get_schedule, discard_schedule
+from .record_template import get_record_template, discard_record_template
+from .checkpoint import checkpoint_interval, save_checkpoint, load_checkpoint, resume_position, parse_time
+from .device_pools import (CampaignDevicePools, get_campaign_pools, discard_campaign_pools,
+                           build_device_pool, build_ip_pool, device_pool_size)
+from .sharding import worker_count
 
 # Define the Blueprint before any route decorators
 bp = Blueprint('traffic', __name__)
@@ -29,14 +50,25 @@ CAMPAIGN_EVENTS_LOG_PATH = os.path.join(LOGS_DIR, 'campaign_events.log')
 campaign_logger = get_logger('Campaign')
 
 # Global variables
-TRAFFIC_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'traffic')
+TRAFFIC_DATA_DIR = os.environ.get('TRAFFIC_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'traffic'))
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB max file size
+FAST_FORWARD_BATCH_SIZE = 1000  # Records buffered per write in fast-forward mode
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # Bytes per chunk of streamed downloads
+DOWNLOAD_FORMATS = ('ndjson', 'json')
+# Sealed segments never change, so clients may keep them for a year
+SEALED_SEGMENT_MAX_AGE = 365 * 24 * 3600
+SINCE_MAX_TIMEOUT = 30.0  # seconds a /since request may wait for new records
+BATCH_STATUS_LIMIT = 1000  # campaigns per /status:batch request
+MONITOR_STREAM_MAX_RATE = float(os.environ.get('MONITOR_STREAM_MAX_RATE', 2.0))  # events per second per stream
+MONITOR_STREAM_RATE_LIMIT = 20.0  # highest max_rate a client may ask for
+MONITOR_STREAM_HEARTBEAT = 15.0  # seconds between keep-alive comments of an idle stream
+EPOCH = datetime(1970, 1, 1)
 
 # Ensure traffic data directory exists and is writable
 try:
     os.makedirs(TRAFFIC_DATA_DIR, exist_ok=True)
     # Test write permissions
-    test_file = os.path.join(TRAFFIC_DATA_DIR, '.test')
+    test_file = os.path.join(TRAFFIC_DATA_DIR, f'.test-{os.getpid()}')  # per process, worker processes import this too
     with open(test_file, 'w') as f:
         f.write('test')
     os.remove(test_file)
@@ -49,8 +81,14 @@ except Exception as e:
 active_threads = {}
 thread_locks = {}
 
-# Global dict to store ADIDs per campaign/profile
-campaign_adids = {}
+# ADID populations of loaded campaigns, freed when generation ends
+campaign_adids: Dict[str, CampaignAdids] = {}
+
+# In-flight request windows of running live campaigns
+inflight_windows: Dict[str, InFlightWindow] = {}
+
+# Load measurements and overload state of running live campaigns
+overload_monitors: Dict[str, Backpressure] = {}
 
 def append_campaign_log(campaign_id, message):
     """Append a detailed log message to the campaign's log file."""
@@ -174,6 +212,7 @@ def append_traffic_to_file(campaign_id: str, traffic_data: Dict[str, Any]):
                     f.seek(0)
                     json.dump(data, f, indent=2)
                     f.truncate()
+                bump_campaign_version(campaign_id)
                 
                 return True
                 
@@ -186,6 +225,92 @@ def append_traffic_to_file(campaign_id: str, traffic_data: Dict[str, Any]):
     
     return False
 
+def get_campaign_store(campaign_id: str) -> CampaignStore:
+    """Get the segment store holding the generated traffic of a campaign"""
+    return get_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+
+def load_campaign_adids(campaign_id: str) -> Optional[CampaignAdids]:
+    """Get the ADID populations of a campaign, loading them from its directory if needed"""
+    adids = campaign_adids.get(campaign_id)
+    if adids is None:
+        adids = CampaignAdids.load(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+    return adids
+
+def pick_adid(campaign_id: str, profile_id: str, rng: random.Random = random) -> Optional[str]:
+    """Pick the ADID of a random user of a profile"""
+    adids = campaign_adids.get(campaign_id)
+    population = adids.population(profile_id) if adids else None
+    return population.sample(rng) if population else None
+
+def read_legacy_traffic_file(campaign_id: str) -> Optional[Dict[str, Any]]:
+    """Read a campaign's legacy traffic.json in object format, or None if it doesn't exist"""
+    campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
+    if not os.path.exists(campaign_file):
+        return None
+    try:
+        with open(campaign_file, 'r') as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        logger.warning(f"[File Operation] Corrupted traffic file for campaign {campaign_id}, ignoring it")
+        return {}
+    if isinstance(data, list):
+        # Old list format
+        return {entry.get('id', f"request_{index}"): entry for index, entry in enumerate(data)}
+    if not isinstance(data, dict):
+        logger.warning(f"[File Operation] Unknown traffic data format for campaign {campaign_id}: {type(data)}")
+        return {}
+    return data
+
+def load_campaign_traffic(campaign_id: str) -> Optional[Dict[str, Any]]:
+    """Load all traffic of a campaign keyed by request ID, or None if the campaign has no traffic data"""
+    traffic_data = read_legacy_traffic_file(campaign_id)
+    if has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        if traffic_data is None:
+            traffic_data = {}
+        for record in get_campaign_store(campaign_id).iter_records():
+            traffic_data[record.get('id', f"request_{record.get('seq')}")] = record
+    return traffic_data
+
+def get_campaign_traffic_summary(campaign_id: str) -> Dict[str, Any]:
+    """Get the request counters and last request of a campaign without re-reading the segment store"""
+    summary = {
+        "has_data": False,
+        "total_requests": 0,
+        "successful_requests": 0,
+        "last_request": None
+    }
+    legacy_data = read_legacy_traffic_file(campaign_id)
+    if legacy_data is not None:
+        summary["has_data"] = True
+        summary["total_requests"] = len(legacy_data)
+        summary["successful_requests"] = sum(1 for entry in legacy_data.values() if entry.get('success', False))
+        summary["last_request"] = next(reversed(legacy_data.values()), None)
+    if has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        counters = get_campaign_store(campaign_id).counters()
+        summary["has_data"] = True
+        summary["total_requests"] += counters["total_requests"]
+        summary["successful_requests"] += counters["successful_requests"]
+        if counters["last_request"]:
+            summary["last_request"] = counters["last_request"]
+    # Distributed campaigns keep their records on the worker nodes
+    from app.api.cluster import load_cluster_state
+    cluster_state = load_cluster_state(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+    if cluster_state:
+        cluster_summary = cluster_state["summary"]
+        summary["has_data"] = True
+        summary["total_requests"] += cluster_summary["total_requests"]
+        summary["successful_requests"] += cluster_summary["successful_requests"]
+        if cluster_summary["last_request"]:
+            summary["last_request"] = cluster_summary["last_request"]
+        summary["nodes"] = cluster_summary["nodes"]
+    return summary
+
+def campaign_state(campaign_id: str) -> Tuple[Any, ...]:
+    """The in-memory state the traffic summary of a campaign follows, for ETags (see etags)"""
+    store = cached_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+    watermark = None if store is None else (store.total_requests, store.successful_requests, store.max_seq)
+    return campaign_version(campaign_id), active_threads.get(campaign_id), watermark
+
 @dataclass
 class TrafficConfig:
     campaign_id: str
@@ -248,9 +373,105 @@ class TrafficConfig:
             "campaign_referrers": self.campaign_referrers
         }
 
-def generate_traffic_background(config: TrafficConfig, thread_id: str):
-    """Generate traffic in the background"""
-    global campaign_adids
+def get_virtual_start_time(config: TrafficConfig) -> datetime:
+    """Get the start of the virtual timeline for a fast-forward run"""
+    virtual_start = config.config.get('virtual_start_time')
+    if virtual_start:
+        try:
+            return datetime.fromisoformat(str(virtual_start).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            logger.warning(f"[Traffic Generation] Invalid virtual_start_time {virtual_start}, using current time")
+    return datetime.utcnow()
+
+def get_arrival_schedule(config: TrafficConfig, start_time: datetime) -> ArrivalSchedule:
+    """Get the arrival schedule of a campaign run starting at ``start_time``"""
+    return get_schedule(config.campaign_id, config.config, config.requests_per_minute, config.duration_minutes,
+                        start_time, get_campaign_seed(config), config.user_profiles)
+
+def scheduled_request_time(config: TrafficConfig, start_time: datetime, offset: int,
+                           index: Optional[int] = None) -> datetime:
+    """Get the arrival time of the ``offset``-th request of a run.
+
+    Times follow the campaign's arrival schedule; in seeded campaigns they are drawn from
+    the schedule stream of the record ``index``, so the time of any request is known
+    without generating the ones before it. Past the end of a campaign with a duration
+    this is its end time.
+    """
+    return get_arrival_schedule(config, start_time).time_of(offset, index)
+
+def save_fast_forward_batch(config: TrafficConfig, store: CampaignStore, records: List[Dict[str, Any]],
+                            request_count: int, successful_requests: int):
+    """Write a batch of fast-forward records and return the updated counters"""
+    store.append_batch(records)
+    bump_campaign_version(config.campaign_id)
+    batch_successful = sum(1 for record in records if record.get('success'))
+    request_count += len(records)
+    successful_requests += batch_successful
+    append_campaign_log(config.campaign_id, f"BATCH: Saved {len(records)} fast-forward requests ({batch_successful} successful), total {request_count}, virtual time {records[-1].get('timestamp')}")
+    return request_count, successful_requests
+
+def save_live_requests(config: TrafficConfig, store: CampaignStore, records: List[Dict[str, Any]],
+                       request_count: int, successful_requests: int):
+    """Write completed live requests one by one and return the updated counters"""
+    for response_data in records:
+        try:
+            if store.append(response_data):
+                request_count += 1
+                if response_data.get('success'):
+                    successful_requests += 1
+                campaign_logger.info(f"[Session {config.campaign_id}] Request {request_count} {'SUCCESS' if response_data.get('success') else 'FAIL'}.")
+                append_campaign_log(config.campaign_id, f"REQUEST {request_count}: {response_data}")
+            else:
+                campaign_logger.error(f"[Session {config.campaign_id}] Failed to save request {request_count + 1}.")
+                append_campaign_log(config.campaign_id, f"ERROR: Failed to save request {request_count + 1}")
+        except Exception as e:
+            campaign_logger.error(f"[Session {config.campaign_id}] Error saving request: {str(e)}")
+            append_campaign_log(config.campaign_id, f"ERROR: Exception saving request: {str(e)}")
+    if records:
+        bump_campaign_version(config.campaign_id)
+    return request_count, successful_requests
+
+def report_fast_forward_progress(config: TrafficConfig, request_count: int, successful_requests: int,
+                                 total_requests: int, virtual_now: datetime, wall_start: float):
+    """Publish fast-forward progress through the campaign status file"""
+    elapsed = time.time() - wall_start
+    if config.duration_minutes and config.start_time:
+        # Progress follows the virtual timeline, since arrivals are randomized
+        virtual_elapsed = (virtual_now - config.start_time).total_seconds()
+        progress = min(100.0, virtual_elapsed / (config.duration_minutes * 60) * 100)
+    else:
+        progress = (request_count / total_requests) * 100 if total_requests > 0 else 0
+    update_campaign_status(config.campaign_id, "running", {
+        "progress_percentage": progress,
+        "total_requests": request_count,
+        "successful_requests": successful_requests,
+        "last_updated": datetime.utcnow().isoformat(),
+        "traffic_generation_active": True,
+        "fast_forward": True,
+        "virtual_start_time": config.start_time.isoformat() if config.start_time else None,
+        "virtual_time": virtual_now.isoformat(),
+        "records_per_second": round(request_count / elapsed, 2) if elapsed > 0 else None
+    })
+
+def checkpoint_campaign(config: TrafficConfig, store: CampaignStore, status: str, position: Dict[str, Any]):
+    """Save the store manifest and the generation checkpoint of a campaign run"""
+    try:
+        store.save_manifest()
+        save_checkpoint(os.path.join(TRAFFIC_DATA_DIR, config.campaign_id), {
+            "campaign_id": config.campaign_id,
+            "status": status,
+            "saved_at": datetime.utcnow().isoformat(),
+            "config": config.to_dict(),
+            "max_seq": store.max_seq,
+            "store_total_requests": store.total_requests,
+            "store_successful_requests": store.successful_requests,
+            **position
+        })
+    except Exception as e:
+        logger.error(f"[Traffic Generation] Error saving checkpoint of campaign {config.campaign_id}: {str(e)}")
+
+def generate_traffic_background(config: TrafficConfig, thread_id: str, resume: Optional[Dict[str, Any]] = None):
+    """Generate traffic in the background, continuing from the checkpoint ``resume`` if given"""
     try:
         campaign_logger.info(f"[Session {config.campaign_id}] Traffic generation started.")
         append_campaign_log(config.campaign_id, f"START: Traffic generation started for campaign {config.campaign_id} at {datetime.utcnow().isoformat()}")
@@ -269,16 +490,14 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
             logger.error(f"[Traffic Generation] Error fetching user profiles: {str(e)}")
             config.user_profiles = []
 
-        # Create campaign-specific directory and file with proper error handling
+        # Create campaign-specific directory and segment store with proper error handling
         campaign_dir = os.path.join(TRAFFIC_DATA_DIR, config.campaign_id)
-        campaign_file = os.path.join(campaign_dir, 'traffic.json')
-        
+
         try:
             os.makedirs(campaign_dir, exist_ok=True)
-            if not os.path.exists(campaign_file):
-                with open(campaign_file, 'w') as f:
-                    json.dump([], f)
-            logger.info(f"[Traffic Generation] Campaign directory and file setup completed: {campaign_file}")
+            store = get_campaign_store(config.campaign_id)
+            store.writer()
+            logger.info(f"[Traffic Generation] Campaign directory and segment store setup completed: {store.segments_dir}")
         except Exception as e:
             logger.error(f"[Traffic Generation] Error setting up campaign directory: {str(e)}", exc_info=True)
             update_campaign_status(config.campaign_id, "error", {"error": f"Directory setup failed: {str(e)}"})
@@ -293,31 +512,113 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
 
         logger.info(f"[Traffic Generation] Total requests to generate: {total_requests}")
 
+        # Fast-forward mode runs against a virtual clock: no sleeping, timestamps follow the pacing
+        fast_forward = bool(config.config.get('fast_forward', False))
+        # More than one worker splits the campaign across processes
+        shard_count = worker_count(config.config)
+        # Distributed campaigns run on the registered worker nodes
+        distributed = bool(config.config.get('distributed', False))
+
         # Initialize counters and timestamps
         request_count = 0
         successful_requests = 0
-        start_time = datetime.utcnow()
+        if resume:
+            # Continue the run on its own schedule; live runs shift what remains of it by their downtime
+            start_time = parse_time(resume['start_time'])
+            end_time = parse_time(resume['end_time'])
+            if not fast_forward:
+                downtime = datetime.utcnow() - parse_time(resume['pacer_deadline'])
+                if downtime > timedelta(0):
+                    start_time += downtime
+                    end_time = end_time + downtime if end_time else None
+        else:
+            start_time = get_virtual_start_time(config) if fast_forward else datetime.utcnow()
+            end_time = start_time + timedelta(minutes=config.duration_minutes) if config.duration_minutes else None
         config.start_time = start_time
-        end_time = start_time + timedelta(minutes=config.duration_minutes) if config.duration_minutes else None
         config.end_time = end_time
+        virtual_now = start_time
+        wall_start = time.time()
+
+        logger.info(f"[Traffic Generation] Start time: {start_time}, End time: {end_time}, Fast-forward: {fast_forward}")
 
-        logger.info(f"[Traffic Generation] Start time: {start_time}, End time: {end_time}")
+        # Set up the campaign seed and the ADID population of each profile, keeping the seed of
+        # earlier runs unless config['seed'] asks for another one
+        seed = parse_seed(config.config.get('seed'))
+        adids = load_campaign_adids(config.campaign_id)
+        if adids is None or (seed is not None and adids.seed != seed):
+            adids = CampaignAdids(seed)
+        for pid in config.user_profile_ids:
+            user_count = config.profile_user_counts.get(pid, 0)
+            if user_count > 0:
+                adids.set_count(pid, user_count)
+        adids.save(campaign_dir)
+        campaign_adids[config.campaign_id] = adids
+        # Record i of the campaign is a pure function of the seed and i, with i = seq - 1
+        first_index = store.max_seq
+        next_index = first_index
+        # Position in the arrival schedule; arrivals skipped by the overload policy don't use up an index
+        next_offset = 0
+        if resume:
+            first_index = resume['first_index']
+            next_index, next_offset = resume_position(resume, store.max_seq)
+            # Records written after the checkpoint are in the store counters
+            request_count = resume['request_count'] + store.total_requests - resume['store_total_requests']
+            successful_requests = (resume['successful_requests'] + store.successful_requests
+                                   - resume['store_successful_requests'])
+            logger.info(f"[Traffic Generation] Resuming campaign {config.campaign_id} at record {next_index}, arrival {next_offset}")
 
         # Update campaign status to running
         update_campaign_status(config.campaign_id, "running", {
             "start_time": start_time.isoformat(),
             "total_requests": total_requests,
             "thread_id": thread_id,
-            "traffic_generation_active": True
+            "traffic_generation_active": True,
+            "fast_forward": fast_forward,
+            "workers": shard_count,
+            "distributed": distributed,
+            "seed": adids.seed,
+            "first_index": first_index,
+            "resumed_at_index": next_index if resume else None
         })
 
-        # Generate ADIDs for each profile in the campaign if not already present
-        if config.campaign_id not in campaign_adids:
-            campaign_adids[config.campaign_id] = {}
-        for pid in config.user_profile_ids:
-            user_count = config.profile_user_counts.get(pid, 0)
-            if user_count > 0 and pid not in campaign_adids[config.campaign_id]:
-                campaign_adids[config.campaign_id][pid] = [generate_adid() for _ in range(user_count)]
+        # Compile the arrival schedule, device and IP pools and record template before the first request
+        schedule = get_arrival_schedule(config, start_time)
+        logger.info(f"[Traffic Generation] Arrival schedule: {', '.join(arrival_processes(config.config))}, {schedule.total} requests over {schedule.minutes} minutes")
+        if config.rtb_config:
+            get_device_pools(config).warm(config.user_profiles)
+        get_record_template(config)
+
+        # Live requests complete asynchronously within a window of in-flight requests
+        window = None
+        monitor = None
+        if not (fast_forward or distributed or shard_count > 1):
+            window = InFlightWindow(config)
+            inflight_windows[config.campaign_id] = window
+            monitor = Backpressure(config.config)
+            overload_monitors[config.campaign_id] = monitor
+        # Schedule offsets of the requests in flight, oldest first
+        sent_offsets = deque()
+
+        def checkpoint(status: str):
+            # Requests still in flight are not written yet; their records are regenerated on resume
+            pending = len(sent_offsets)
+            resume_offset = sent_offsets[0] if pending else next_offset
+            checkpoint_campaign(config, store, status, {
+                "seed": adids.seed,
+                "fast_forward": fast_forward,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat() if end_time else None,
+                "first_index": first_index,
+                "next_index": next_index - pending,
+                "next_offset": resume_offset,
+                "pacer_deadline": scheduled_request_time(config, start_time, resume_offset,
+                                                         next_index - pending).isoformat(),
+                "request_count": request_count,
+                "successful_requests": successful_requests
+            })
+
+        interval = checkpoint_interval(config.config)
+        next_checkpoint = time.monotonic() + interval
 
         user_stopped = False
         # Main traffic generation loop with improved error handling
@@ -330,13 +631,90 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
                     break
 
                 # Check if we should stop
-                if end_time and datetime.utcnow() >= end_time:
+                now = virtual_now if fast_forward else datetime.utcnow()
+                if end_time and now >= end_time:
                     logger.info(f"[Traffic Generation] Reached duration limit for campaign {config.campaign_id}")
                     break
+                if fast_forward and not end_time and request_count >= total_requests:
+                    logger.info(f"[Traffic Generation] Reached request limit for campaign {config.campaign_id}")
+                    break
+
+                if distributed:
+                    # Split the campaign across the worker nodes and aggregate their counters
+                    from app.api.cluster import run_distributed_generation
+                    try:
+                        request_count, successful_requests, virtual_now, user_stopped = run_distributed_generation(
+                            config, thread_id, campaign_dir, start_time, end_time, total_requests,
+                            fast_forward, wall_start)
+                    except Exception as e:
+                        campaign_logger.error(f"[Session {config.campaign_id}] Error in distributed traffic generation: {str(e)}")
+                        append_campaign_log(config.campaign_id, f"ERROR: Exception in distributed traffic generation: {str(e)}")
+                    break
+
+                if shard_count > 1:
+                    # Split the campaign across worker processes and wait for them to finish
+                    from app.api.sharding import run_sharded_generation
+                    try:
+                        request_count, successful_requests, virtual_now, user_stopped = run_sharded_generation(
+                            config, thread_id, store, shard_count, start_time, end_time, total_requests,
+                            fast_forward, wall_start)
+                    except Exception as e:
+                        campaign_logger.error(f"[Session {config.campaign_id}] Error in sharded traffic generation: {str(e)}")
+                        append_campaign_log(config.campaign_id, f"ERROR: Exception in sharded traffic generation: {str(e)}")
+                    break
+
+                if fast_forward:
+                    # Collect the arrival times of the next batch on the virtual clock
+                    request_times = []
+                    indices = []
+                    while len(request_times) < FAST_FORWARD_BATCH_SIZE:
+                        virtual_now = scheduled_request_time(config, start_time, next_offset, next_index)
+                        if end_time and virtual_now >= end_time:
+                            break
+                        if not end_time and request_count + len(request_times) >= total_requests:
+                            break
+                        request_times.append(virtual_now)
+                        indices.append(next_index)
+                        next_index += 1
+                        next_offset += 1
+                    if not request_times:
+                        continue
+
+                    # Generate, simulate and write the whole batch at once
+                    traffic_batch = generate_traffic_batch(config, len(request_times), timestamps=request_times,
+                                                           indices=indices, as_records=True)
+                    complete_request_batch(config, traffic_batch, request_times, indices)
+                    request_count, successful_requests = save_fast_forward_batch(
+                        config, store, traffic_batch, request_count, successful_requests)
+                    report_fast_forward_progress(config, request_count, successful_requests,
+                                                 total_requests, virtual_now, wall_start)
+                    if time.monotonic() >= next_checkpoint:
+                        checkpoint("running")
+                        next_checkpoint = time.monotonic() + interval
+                    continue
+
+                # Stop sending under the pause policy until the in-flight requests drain
+                if monitor.should_pause(len(window), window.limit):
+                    pause_start = time.monotonic()
+                    completed = window.collect(wait_for_one=True, timeout=PAUSE_POLL_SECONDS)
+                    request_count, successful_requests = save_live_requests(
+                        config, store, completed, request_count, successful_requests)
+                    for _ in completed:
+                        sent_offsets.popleft()
+                    monitor.paused(time.monotonic() - pause_start)
+                    continue
+
+                # Skip the arrivals the overload policy doesn't admit
+                arrival_time = scheduled_request_time(config, start_time, next_offset, next_index)
+                lag = max(0.0, (datetime.utcnow() - arrival_time).total_seconds())
+                if not monitor.admit(lag):
+                    next_offset += 1
+                    continue
 
                 # Generate and validate traffic data
+                generate_start = time.monotonic()
                 try:
-                    traffic_data = generate_traffic_data(config)
+                    traffic_data = generate_traffic_data(config, index=next_index)
                     if not traffic_data:
                         logger.error("[Traffic Generation] Failed to generate traffic data")
                         continue
@@ -344,33 +722,25 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
                 except Exception as e:
                     logger.error(f"[Traffic Generation] Error generating traffic data: {str(e)}", exc_info=True)
                     continue
+                generate_seconds = time.monotonic() - generate_start
 
-                # Simulate request with timeout
+                # Send or simulate the request; completions are collected while later requests go out
                 try:
-                    response_data = simulate_request(traffic_data)
-                    if not response_data:
-                        logger.error("[Traffic Generation] Failed to simulate request")
-                        continue
-                    logger.debug(f"[Traffic Generation] Simulated request {request_count + 1}: success={response_data.get('success')}")
+                    completed = window.submit(traffic_data, next_index)
+                    sent_offsets.append(next_offset)
+                    next_index += 1
+                    next_offset += 1
+                    logger.debug(f"[Traffic Generation] Sent request {traffic_data.get('id')}, {len(window)} in flight")
                 except Exception as e:
-                    logger.error(f"[Traffic Generation] Error simulating request: {str(e)}", exc_info=True)
+                    logger.error(f"[Traffic Generation] Error sending request: {str(e)}", exc_info=True)
                     continue
 
-                # Save to file with proper locking
-                try:
-                    if append_traffic_to_file(config.campaign_id, response_data):
-                        request_count += 1
-                        if response_data.get('success'):
-                            successful_requests += 1
-                        campaign_logger.info(f"[Session {config.campaign_id}] Request {request_count} {'SUCCESS' if response_data.get('success') else 'FAIL'}.")
-                        append_campaign_log(config.campaign_id, f"REQUEST {request_count}: {response_data}")
-                    else:
-                        campaign_logger.error(f"[Session {config.campaign_id}] Failed to save request {request_count + 1}.")
-                        append_campaign_log(config.campaign_id, f"ERROR: Failed to save request {request_count + 1}")
-                except Exception as e:
-                    campaign_logger.error(f"[Session {config.campaign_id}] Error saving request: {str(e)}")
-                    append_campaign_log(config.campaign_id, f"ERROR: Exception saving request: {str(e)}")
-                    continue
+                # Save the completed requests to the campaign store
+                write_start = time.monotonic()
+                request_count, successful_requests = save_live_requests(
+                    config, store, completed, request_count, successful_requests)
+                for _ in completed:
+                    sent_offsets.popleft()
 
                 # Update progress with validation
                 progress = (request_count / total_requests) * 100 if total_requests > 0 else 0
@@ -379,14 +749,20 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
                     "total_requests": request_count,
                     "successful_requests": successful_requests,
                     "last_updated": datetime.utcnow().isoformat(),
-                    "traffic_generation_active": True
+                    "traffic_generation_active": True,
+                    "in_flight": len(window),
+                    "max_in_flight": window.limit,
+                    "overload": monitor.snapshot()
                 })
-
-                # Calculate sleep time with validation
-                sleep_time = max(0.1, 60 / config.requests_per_minute)
-                if config.config.get('randomize_timing', True):
-                    sleep_time *= random.uniform(0.8, 1.2)
-                
+                monitor.observe(len(window), window.limit, window.mean_latency, generate_seconds,
+                                window.last_wait, time.monotonic() - write_start)
+                if time.monotonic() >= next_checkpoint:
+                    checkpoint("running")
+                    next_checkpoint = time.monotonic() + interval
+
+                # Wait for the arrival time of the next request
+                next_time = scheduled_request_time(config, start_time, next_offset, next_index)
+                sleep_time = max(0.0, (next_time - datetime.utcnow()).total_seconds())
                 logger.debug(f"[Traffic Generation] Sleeping for {sleep_time:.3f} seconds before next request")
                 time.sleep(sleep_time)
 
@@ -401,21 +777,42 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
                 })
                 time.sleep(1)  # Prevent tight loop on error
 
+        # Wait for the requests still in flight
+        if window is not None and len(window):
+            completed = window.drain(timeout=config.config.get('http_timeout', DEFAULT_TIMEOUT) + 1)
+            request_count, successful_requests = save_live_requests(
+                config, store, completed, request_count, successful_requests)
+            for _ in completed:
+                sent_offsets.popleft()
+
         # Update final status with validation
         if user_stopped:
             final_status = "stopped"
         else:
             final_status = "completed" if request_count > 0 else "error"
+        if shard_count > 1 or distributed:
+            # Workers report counters, not positions; continue after the highest stored record
+            next_index = store.max_seq
+            next_offset = next_index - first_index
+        checkpoint(final_status)
         campaign_logger.info(f"[Session {config.campaign_id}] Traffic generation completed. Status: {final_status}. Total: {request_count}, Success: {successful_requests}")
         append_campaign_log(config.campaign_id, f"COMPLETE: Traffic generation completed for campaign {config.campaign_id} at {datetime.utcnow().isoformat()} with status {final_status}. Total: {request_count}, Success: {successful_requests}")
         
-        update_campaign_status(config.campaign_id, final_status, {
+        final_data = {
             "end_time": datetime.utcnow().isoformat(),
             "total_requests": request_count,
             "successful_requests": successful_requests,
             "last_updated": datetime.utcnow().isoformat(),
-            "traffic_generation_active": False
-        })
+            "traffic_generation_active": False,
+            "seed": adids.seed,
+            "first_index": first_index
+        }
+        if monitor is not None:
+            final_data["overload"] = monitor.snapshot()
+        if fast_forward:
+            final_data["virtual_time"] = virtual_now.isoformat()
+            final_data["wall_clock_seconds"] = round(time.time() - wall_start, 3)
+        update_campaign_status(config.campaign_id, final_status, final_data)
 
         # --- FIX: Update in-memory session status and end_time ---
         from app.api.sessions import sessions
@@ -436,8 +833,20 @@ def generate_traffic_background(config: TrafficConfig, thread_id: str):
         try:
             if active_threads.get(config.campaign_id) == thread_id:
                 del active_threads[config.campaign_id]
+                bump_campaign_version(config.campaign_id)
                 campaign_logger.info(f"[Session {config.campaign_id}] Removed from active threads.")
                 append_campaign_log(config.campaign_id, f"CLEANUP: Removed from active threads at {datetime.utcnow().isoformat()}")
+            if has_store(os.path.join(TRAFFIC_DATA_DIR, config.campaign_id)):
+                get_campaign_store(config.campaign_id).close()
+            discard_samplers(config.campaign_id)
+            discard_campaign_pools(config.campaign_id)
+            discard_schedule(config.campaign_id)
+            discard_record_template(config.campaign_id)
+            close_dispatcher(config.campaign_id)
+            if active_threads.get(config.campaign_id) is None:
+                campaign_adids.pop(config.campaign_id, None)
+                inflight_windows.pop(config.campaign_id, None)
+                overload_monitors.pop(config.campaign_id, None)
             if config.campaign_id in thread_locks:
                 del thread_locks[config.campaign_id]
                 campaign_logger.info(f"[Session {config.campaign_id}] Removed thread lock.")
@@ -552,6 +961,33 @@ def generate_traffic():
                 'campaign_referrers': campaign_data.get('campaign_referrers', {})
             }
 
+            # Generation mode options may be given per request on top of the campaign config
+            for option in ('fast_forward', 'virtual_start_time', 'workers', 'distributed', 'seed', 'arrival_process',
+                           'overload_policy', 'checkpoint_interval_seconds'):
+                if option in data:
+                    config_data['config'] = {**(config_data['config'] or {}), option: data[option]}
+
+            try:
+                parse_seed(config_data['config'].get('seed') if config_data['config'] else None)
+            except (TypeError, ValueError) as e:
+                error_msg = f"Invalid seed: {str(e)}"
+                logger.error(f"[API] {error_msg}")
+                return jsonify({"error": error_msg}), 400
+            try:
+                options = config_data['config'] or {}
+                arrival_processes(options)
+                rate_shapes(options)
+                overload_policy(options)
+                backpressure_options(options)
+                checkpoint_interval(options)
+                device_pool_size(options)
+                worker_count(options)
+                http_options(options)
+                in_flight_limit(options)
+            except ValueError as e:
+                logger.error(f"[API] {str(e)}")
+                return jsonify({"error": str(e)}), 400
+
             # Create traffic config
             config = TrafficConfig(**config_data)
             logger.info(f"[API] Created traffic config: {json.dumps(config.to_dict(), indent=2)}")
@@ -593,7 +1029,13 @@ def generate_traffic():
                     "requests_per_minute": requests_per_minute,
                     "duration_minutes": duration_minutes,
                     "total_users": total_users,
-                    "profiles": len(campaign_data['user_profile_ids'])
+                    "profiles": len(campaign_data['user_profile_ids']),
+                    "fast_forward": bool(config.config.get('fast_forward', False)),
+                    "workers": worker_count(config.config),
+                    "distributed": bool(config.config.get('distributed', False)),
+                    "seed": config.config.get('seed'),
+                    "arrival_process": arrival_processes(config.config),
+                    "overload_policy": overload_policy(config.config)
                 }
             })
         except Exception as e:
@@ -614,28 +1056,51 @@ def generate_traffic():
         logger.error(f"[API] {error_msg}", exc_info=True)
         return jsonify({"error": error_msg}), 500
 
-def generate_rtb_data(rtb_config: Optional[Dict[str, Any]], config: Optional[TrafficConfig] = None) -> Dict[str, Any]:
-    fake = Faker()
+def get_campaign_seed(config: TrafficConfig) -> Optional[int]:
+    """Get the seed of a campaign: the one of its ADID populations, else config['seed'] if set"""
+    adids = campaign_adids.get(config.campaign_id)
+    if adids is not None:
+        return adids.seed
+    return parse_seed(config.config.get('seed'))
+
+def get_device_pools(config: TrafficConfig) -> CampaignDevicePools:
+    """Get the device and IP pools of a campaign, sized by config.config['device_pool_size']"""
+    return get_campaign_pools(config.campaign_id, config.rtb_config, config.geo_locations,
+                              device_pool_size(config.config), seed=get_campaign_seed(config))
+
+def get_user_profile(config: TrafficConfig, profile_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Get a profile of a campaign from config.user_profiles, which is shipped to worker processes
+    and cluster nodes, unlike the profile store"""
+    for profile in config.user_profiles:
+        if profile.get("id") == profile_id:
+            return profile
+    return None
+
+def generate_rtb_data(rtb_config: Optional[Dict[str, Any]], config: Optional[TrafficConfig] = None,
+                      profile_id: Optional[str] = None, country: Optional[str] = None,
+                      rng: random.Random = random) -> Dict[str, Any]:
+    """Generate an OpenRTB bid request.
+
+    Callers that already picked a profile pass its ``profile_id``, and the ``country`` of the request
+    so that the device IP matches it. All random choices are drawn from ``rng``.
+    """
     if not rtb_config:
         return None
     try:
         # Pick a profile for this request
         user_id = None
         adid = None
-        profile_id = None
-        if config and config.user_profile_ids:
+        if profile_id and config:
+            adid = pick_adid(config.campaign_id, profile_id, rng)
+            user_id = adid
+        elif config and config.user_profile_ids:
             # Weighted random pick based on profile_user_counts
-            weighted_profiles = []
-            for pid in config.user_profile_ids:
-                count = config.profile_user_counts.get(pid, 0)
-                weighted_profiles.extend([pid] * count)
-            if weighted_profiles:
-                profile_id = random.choice(weighted_profiles)
+            profile_id_sampler = get_profile_id_sampler(config)
+            if profile_id_sampler:
+                profile_id = profile_id_sampler.sample(rng)
                 # Pick an ADID for this profile
-                adid_list = campaign_adids.get(config.campaign_id, {}).get(profile_id, [])
-                if adid_list:
-                    adid = random.choice(adid_list)
-                    user_id = adid
+                adid = pick_adid(config.campaign_id, profile_id, rng)
+                user_id = adid
         # --- imp section ---
         imp = [{
             "id": "1",
@@ -653,9 +1118,21 @@ def generate_rtb_data(rtb_config: Optional[Dict[str, Any]], config: Optional[Tra
             "domain": rtb_config.get("site_domain", "example.com")
         }
         # --- device section ---
+        if config:
+            pools = get_device_pools(config)
+            profile = get_user_profile(config, profile_id)
+            pooled_device = pools.pick_device(profile_id, profile, rng)
+            ip = pools.pick_ip(country, rng)
+        else:
+            pooled_device = build_device_pool(rtb_config, 1, rng)[0]
+            ip = build_ip_pool(country, 1, rng)[0]
         device = {
-            "ua": rtb_config.get("ua", fake.user_agent()),
-            "ip": rtb_config.get("ip", fake.ipv4())
+            "ua": rtb_config.get("ua", pooled_device["ua"]),
+            "ip": rtb_config.get("ip", ip),
+            "make": pooled_device["make"],
+            "model": pooled_device["model"],
+            "os": pooled_device["os"],
+            "osv": pooled_device["osv"]
         }
         # --- user section ---
         user = {
@@ -663,7 +1140,7 @@ def generate_rtb_data(rtb_config: Optional[Dict[str, Any]], config: Optional[Tra
         }
         # --- top-level fields ---
         rtb_data = {
-            "id": ''.join(random.choices(string.digits, k=10)),
+            "id": ''.join(rng.choices(string.digits, k=10)),
             "imp": imp,
             "site": site,
             "device": device,
@@ -677,107 +1154,165 @@ def generate_rtb_data(rtb_config: Optional[Dict[str, Any]], config: Optional[Tra
         logger.error(f"Error generating RTB data: {str(e)}", exc_info=True)
         return {}
 
-def generate_traffic_data(config: TrafficConfig) -> Dict[str, Any]:
-    """Generate a single traffic data entry with improved validation and LLM referrer assignment"""
-    import random
+def generate_traffic_data(config: TrafficConfig, now: Optional[datetime] = None,
+                          index: Optional[int] = None) -> Dict[str, Any]:
+    """Generate a single traffic data entry with improved validation and LLM referrer assignment.
+
+    ``now`` overrides the request time, e.g. with the virtual clock of a fast-forward run.
+    With the ``index`` of the record in its campaign, the entry is a pure function of the
+    campaign seed and the index. Entries are filled in from the campaign's compiled record template.
+    """
     try:
-        if not isinstance(config, TrafficConfig):
-            raise ValueError("Invalid config type")
-        traffic_data = {
-            "id": str(int(time.time() * 1000)),
-            "timestamp": datetime.utcnow().isoformat(),
-            "campaign_id": config.campaign_id,
-            "target_url": config.target_url,
-            "requests_per_minute": config.requests_per_minute,
-            "duration_minutes": config.duration_minutes,
-            "geo_locations": config.geo_locations,
-            "rtb_config": config.rtb_config,
-            "config": config.config,
-            "user_profile_ids": config.user_profile_ids,
-            "profile_user_counts": config.profile_user_counts,
-            "total_profile_users": config.total_profile_users
-        }
-        required_fields = ["id", "timestamp", "campaign_id", "target_url"]
-        for field in required_fields:
-            if not traffic_data.get(field):
-                raise ValueError(f"Missing required field: {field}")
-
-        # --- LLM Referrer Assignment ---
-        # Build weighted list of user profiles
-        weighted_profiles = []
-        profile_id_to_profile = {}
-        for profile in (config.user_profiles or []):
-            pid = profile.get("id")
-            count = config.profile_user_counts.get(pid, 0)
-            if count > 0:
-                weighted_profiles.extend([profile] * count)
-                profile_id_to_profile[pid] = profile
-        selected_profile = random.choice(weighted_profiles) if weighted_profiles else None
-        selected_profile_id = selected_profile.get("id") if selected_profile else None
-        # Pick random interest and country
-        interests = (selected_profile.get("demographics", {}).get("interests") or []) if selected_profile else []
-        countries = (selected_profile.get("demographics", {}).get("countries") or []) if selected_profile else []
-        selected_interest = random.choice(interests) if interests else None
-        selected_country = random.choice(countries) if countries else None
-        # Get referrer list for this interest|country
-        referrer_key = f"{selected_interest}|{selected_country}" if selected_interest and selected_country else None
-        
-        # Try to use campaign-specific referrers first, fall back to profile referrers
-        selected_referrer = None
-        if referrer_key:
-            # Check campaign referrers first
-            if config.campaign_referrers and referrer_key in config.campaign_referrers:
-                campaign_referrers = config.campaign_referrers[referrer_key]
-                if campaign_referrers:
-                    selected_referrer = random.choice(campaign_referrers)
-                    logger.debug(f"Using campaign-specific referrer for {referrer_key}")
-            
-            # Fall back to profile referrers if campaign referrers not available
-            if not selected_referrer:
-                profile_referrers = (selected_profile.get("referrers", {}).get(referrer_key, [])) if selected_profile else []
-                if profile_referrers:
-                    selected_referrer = random.choice(profile_referrers)
-                    logger.debug(f"Using profile referrer for {referrer_key}")
-        
-        # Add to traffic_data
-        traffic_data["selected_profile_id"] = selected_profile_id
-        traffic_data["selected_interest"] = selected_interest
-        traffic_data["selected_country"] = selected_country
-        traffic_data["referrer"] = selected_referrer
+        template = get_record_template(config)
+        if now is None:
+            now = datetime.utcnow()
+        seed = get_campaign_seed(config) if index is not None else None
+        rng = record_rng(seed, index) if seed is not None else random
+        request_id = str(int((now - EPOCH).total_seconds() * 1000))
+        return template.fill(request_id, now.isoformat(), template.pick_profile(rng), rng)
+    except Exception as e:
+        logger.error(f"Error generating traffic data: {str(e)}", exc_info=True)
+        raise
 
-        # Add RTB data in OpenRTB format - restructured with RTB_ID as separate nodes
-        if config.rtb_config:
-            rtb_data = generate_rtb_data(config.rtb_config, config)
-            if rtb_data:
-                # Extract RTB_ID and restructure data
-                rtb_id = rtb_data.get("id", "unknown")
-                
-                # Store RTB data with RTB_ID as separate nodes for easy table splitting
-                traffic_data["rtb_id"] = rtb_id
-                traffic_data["rtb_imp"] = rtb_data.get("imp", [])
-                traffic_data["rtb_site"] = rtb_data.get("site", {})
-                traffic_data["rtb_device"] = rtb_data.get("device", {})
-                traffic_data["rtb_user"] = rtb_data.get("user", {})
-                traffic_data["rtb_auction_type"] = rtb_data.get("at", 2)
-                traffic_data["rtb_timeout"] = rtb_data.get("tmax", 120)
-                traffic_data["rtb_currency"] = rtb_data.get("cur", ["USD"])
-                
-                # Keep original rtb_data for backward compatibility
-                traffic_data["rtb_data"] = rtb_data
+def get_profile_sampler(config: TrafficConfig) -> Optional[AliasSampler]:
+    """Get the sampler picking the campaign's user profiles in proportion to their user counts"""
+    profile_ids = [profile.get("id") for profile in config.user_profiles]
+    weights = [config.profile_user_counts.get(pid, 0) for pid in profile_ids]
+    return get_sampler(config.campaign_id, 'profiles', profile_ids, config.user_profiles, weights)
+
+def get_profile_id_sampler(config: TrafficConfig) -> Optional[AliasSampler]:
+    """Get the sampler picking user profile IDs, for callers without loaded profiles"""
+    weights = [config.profile_user_counts.get(pid, 0) for pid in config.user_profile_ids]
+    return get_sampler(config.campaign_id, 'profile_ids', config.user_profile_ids, config.user_profile_ids, weights)
+
+def assign_profile_referrer(traffic_data: Dict[str, Any], config: TrafficConfig,
+                            selected_profile: Optional[Dict[str, Any]], rng: random.Random = random):
+    """Pick an interest, country and referrer of the selected profile and add them to the entry"""
+    selected_profile_id = selected_profile.get("id") if selected_profile else None
+    # Pick random interest and country
+    interests = (selected_profile.get("demographics", {}).get("interests") or []) if selected_profile else []
+    countries = (selected_profile.get("demographics", {}).get("countries") or []) if selected_profile else []
+    selected_interest = rng.choice(interests) if interests else None
+    selected_country = rng.choice(countries) if countries else None
+    # Get referrer list for this interest|country
+    referrer_key = f"{selected_interest}|{selected_country}" if selected_interest and selected_country else None
+
+    # Try to use campaign-specific referrers first, fall back to profile referrers
+    selected_referrer = None
+    if referrer_key:
+        # Check campaign referrers first
+        if config.campaign_referrers and referrer_key in config.campaign_referrers:
+            campaign_referrers = config.campaign_referrers[referrer_key]
+            if campaign_referrers:
+                selected_referrer = rng.choice(campaign_referrers)
+                logger.debug(f"Using campaign-specific referrer for {referrer_key}")
+
+        # Fall back to profile referrers if campaign referrers not available
+        if not selected_referrer:
+            profile_referrers = (selected_profile.get("referrers", {}).get(referrer_key, [])) if selected_profile else []
+            if profile_referrers:
+                selected_referrer = rng.choice(profile_referrers)
+                logger.debug(f"Using profile referrer for {referrer_key}")
+
+    # Add to traffic_data
+    traffic_data["selected_profile_id"] = selected_profile_id
+    traffic_data["selected_interest"] = selected_interest
+    traffic_data["selected_country"] = selected_country
+    traffic_data["referrer"] = selected_referrer
+
+def add_rtb_fields(traffic_data: Dict[str, Any], rtb_data: Optional[Dict[str, Any]]):
+    """Add RTB data to an entry, with RTB_ID and each OpenRTB section as separate nodes"""
+    if rtb_data:
+        # Extract RTB_ID and restructure data
+        rtb_id = rtb_data.get("id", "unknown")
+
+        # Store RTB data with RTB_ID as separate nodes for easy table splitting
+        traffic_data["rtb_id"] = rtb_id
+        traffic_data["rtb_imp"] = rtb_data.get("imp", [])
+        traffic_data["rtb_site"] = rtb_data.get("site", {})
+        traffic_data["rtb_device"] = rtb_data.get("device", {})
+        traffic_data["rtb_user"] = rtb_data.get("user", {})
+        traffic_data["rtb_auction_type"] = rtb_data.get("at", 2)
+        traffic_data["rtb_timeout"] = rtb_data.get("tmax", 120)
+        traffic_data["rtb_currency"] = rtb_data.get("cur", ["USD"])
+
+        # Keep original rtb_data for backward compatibility
+        traffic_data["rtb_data"] = rtb_data
+    else:
+        logger.warning("RTB data could not be generated, using empty object.")
+        traffic_data["rtb_data"] = {}
+
+def generate_traffic_batch(config: TrafficConfig, count: int, timestamps: Optional[List[datetime]] = None,
+                           columnar: bool = False, indices: Optional[List[int]] = None, as_records: bool = False):
+    """Generate ``count`` traffic entries in one pass.
+
+    ``timestamps`` gives the request time of each entry, e.g. from the virtual clock of a
+    fast-forward run. With the ``indices`` of the entries in their campaign, each entry is
+    a pure function of the campaign seed and its index.
+    Returns a list of entries, as slotted ``TrafficRecord``s with ``as_records``, or a dict
+    of columns when ``columnar`` is set.
+    """
+    try:
+        template = get_record_template(config)
+        if timestamps is None:
+            timestamps = [datetime.utcnow()] * count
+        elif len(timestamps) != count:
+            raise ValueError(f"Expected {count} timestamps, got {len(timestamps)}")
+        if indices is not None and len(indices) != count:
+            raise ValueError(f"Expected {count} indices, got {len(indices)}")
+
+        seed = get_campaign_seed(config) if indices is not None else None
+        if seed is not None:
+            rngs = [record_rng(seed, index) for index in indices]
+            selected_profiles = [template.pick_profile(rng) for rng in rngs]
+        else:
+            rngs = [random] * count
+            selected_profiles = template.pick_profiles(count)
+
+        batch = []
+        fill = template.fill_record if as_records else template.fill
+        last_id = None
+        duplicates = 0
+        for timestamp, selected_profile, rng in zip(timestamps, selected_profiles, rngs):
+            # Several entries can share a millisecond, keep their IDs unique
+            request_id = str(int((timestamp - EPOCH).total_seconds() * 1000))
+            if request_id == last_id:
+                duplicates += 1
+                unique_id = f"{request_id}-{duplicates}"
             else:
-                logger.warning("RTB data could not be generated, using empty object.")
-                traffic_data["rtb_data"] = {}
-        return traffic_data
+                last_id = request_id
+                duplicates = 0
+                unique_id = request_id
+            batch.append(fill(unique_id, timestamp.isoformat(), selected_profile, rng))
+
+        return traffic_batch_to_columns(batch) if columnar else batch
     except Exception as e:
-        logger.error(f"Error generating traffic data: {str(e)}", exc_info=True)
+        logger.error(f"Error generating traffic batch: {str(e)}", exc_info=True)
         raise
 
+def traffic_batch_to_columns(batch: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Convert a list of traffic entries to a dict of equally long columns"""
+    columns: Dict[str, List[Any]] = {}
+    for index, traffic_data in enumerate(batch):
+        for key, value in traffic_data.items():
+            if key not in columns:
+                columns[key] = [None] * index
+            columns[key].append(value)
+        for key, column in columns.items():
+            if len(column) <= index:
+                column.append(None)
+    return columns
+
 def generate_adid() -> str:
     """Generate a random advertising ID"""
     return f"{random.randint(10000000, 99999999)}-{random.randint(1000, 9999)}-{random.randint(1000, 9999)}-{random.randint(1000, 9999)}"
 
-def simulate_request(traffic_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Simulate making a request with the generated traffic data"""
+def simulate_request(traffic_data: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Simulate making a request with the generated traffic data.
+
+    When ``now`` is given the request runs on a virtual clock: the latency is not
+    slept but added to ``now`` for the response timestamp.
+    """
     try:
         logger.debug(f"Simulating request for traffic data: {traffic_data}")
         
@@ -788,26 +1323,13 @@ def simulate_request(traffic_data: Dict[str, Any]) -> Dict[str, Any]:
         # Simulate network latency (50-500ms)
         latency = random.uniform(0.05, 0.5)
         logger.debug(f"Simulated network latency: {latency:.3f}s")
-        time.sleep(latency)
-        
-        # Simulate success rate (85% success)
-        success = random.random() < 0.85
-        logger.debug(f"Request success: {success}")
-        
-        # Error status codes
-        error_codes = [400, 403, 404, 500]
+        if now is None:
+            time.sleep(latency)
+            response_time = datetime.utcnow()
+        else:
+            response_time = now + timedelta(seconds=latency)
         
-        # Add response data
-        response_data = {
-            "success": success,
-            "response_time": round(random.uniform(50, 500), 2),  # ms
-            "status_code": 200 if success else random.choice(error_codes),
-            "response_size": random.randint(500, 2000),  # bytes
-            "bid_id": f"bid-{random.randint(1000000, 9999999)}" if traffic_data.get('rtb_data') else None,
-            "win_price": round(random.uniform(0.1, 5.0), 2) if success and traffic_data.get('rtb_data') else None,
-            "currency": "USD" if success and traffic_data.get('rtb_data') else None,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        response_data = build_simulated_response(traffic_data, latency, response_time)
         logger.debug(f"Generated response data: {response_data}")
         
         # Merge response data with traffic data
@@ -830,11 +1352,132 @@ def simulate_request(traffic_data: Dict[str, Any]) -> Dict[str, Any]:
             traffic_data = error_response
         return traffic_data
 
+def build_simulated_response(traffic_data: Dict[str, Any], latency: float, response_time: datetime,
+                             rng: random.Random = random) -> Dict[str, Any]:
+    """Draw the simulated outcome of a request that took ``latency`` seconds"""
+    # Simulate success rate (85% success)
+    success = rng.random() < 0.85
+    logger.debug(f"Request success: {success}")
+
+    # Error status codes
+    error_codes = [400, 403, 404, 500]
+
+    # Add response data
+    has_rtb = bool(traffic_data.get('rtb_data'))
+    return {
+        "success": success,
+        "response_time": round(latency * 1000, 2),  # ms
+        "status_code": 200 if success else rng.choice(error_codes),
+        "response_size": rng.randint(500, 2000),  # bytes
+        "bid_id": f"bid-{rng.randint(1000000, 9999999)}" if has_rtb else None,
+        "win_price": round(rng.uniform(0.1, 5.0), 2) if success and has_rtb else None,
+        "currency": "USD" if success and has_rtb else None,
+        "timestamp": response_time.isoformat()
+    }
+
+def simulate_request_batch(traffic_batch: List[Dict[str, Any]],
+                           request_times: Optional[List[datetime]] = None, seed: Optional[int] = None,
+                           indices: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Simulate the requests of a batch on a virtual clock, without sleeping.
+
+    Each response is timestamped at its request time plus the simulated latency.
+    ``request_times`` saves parsing the entries' timestamps when the caller has them.
+    With a ``seed`` and the ``indices`` of the entries, responses are reproducible.
+    """
+    if request_times is None:
+        request_times = [datetime.fromisoformat(traffic_data['timestamp']) for traffic_data in traffic_batch]
+    if seed is not None and indices is not None:
+        rngs = [record_rng(seed, index, RESPONSE_STREAM) for index in indices]
+    else:
+        rngs = [random] * len(traffic_batch)
+    for traffic_data, request_time, rng in zip(traffic_batch, request_times, rngs):
+        latency = rng.uniform(0.05, 0.5)
+        traffic_data.update(build_simulated_response(traffic_data, latency, request_time + timedelta(seconds=latency), rng))
+    return traffic_batch
+
+def uses_http_dispatch(config: TrafficConfig) -> bool:
+    return config.config.get('dispatch_mode') == DISPATCH_HTTP
+
+def complete_request_batch(config: TrafficConfig, traffic_batch: List[Dict[str, Any]],
+                           request_times: Optional[List[datetime]] = None,
+                           indices: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Send or simulate a batch of requests, depending on the campaign's dispatch_mode"""
+    if uses_http_dispatch(config):
+        return get_dispatcher(config.campaign_id, config.config).dispatch_batch(traffic_batch)
+    return simulate_request_batch(traffic_batch, request_times, get_campaign_seed(config), indices)
+
+def regenerate_traffic_batch(config: TrafficConfig, start_time: datetime, first_index: int,
+                             indices: List[int]) -> List[Dict[str, Any]]:
+    """Recompute simulated fast-forward records of a seeded campaign from their indices.
+
+    ``start_time`` and ``first_index`` are the virtual start and first record index of the run
+    that generated them; the records match the stored ones apart from the store's ``seq``.
+    """
+    request_times = [scheduled_request_time(config, start_time, index - first_index, index) for index in indices]
+    traffic_batch = generate_traffic_batch(config, len(indices), timestamps=request_times, indices=indices)
+    return simulate_request_batch(traffic_batch, request_times, get_campaign_seed(config), indices)
+
+def get_campaign_traffic_page(campaign_id: str):
+    """Get one page of a campaign's traffic in sequence order.
+
+    Query params: cursor (the next_cursor of the previous page, default from the start),
+    limit (default 100, max 1000), and the fields projection and filters of ``parse_record_filter``.
+    A filtered page may hold fewer records than the limit while more follow.
+    """
+    try:
+        after = max(0, int(request.args.get('cursor') or 0))
+        limit = min(1000, max(1, int(request.args.get('limit', 100))))
+    except ValueError:
+        return jsonify({"success": False, "error": "cursor and limit must be integers"}), 400
+    try:
+        record_filter = parse_record_filter(request.args)
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        store = get_campaign_store(campaign_id)
+        if record_filter or fields:
+            records, has_more, next_cursor = store.query(after, limit, record_filter, fields)
+        else:
+            records, has_more = store.read_page(after, limit)
+            next_cursor = records[-1]['seq'] if records else after
+    else:
+        # Legacy records have no seq, their cursor is a position in the file
+        entries = list((read_legacy_traffic_file(campaign_id) or {}).values())
+        records = []
+        next_cursor = after
+        while next_cursor < len(entries) and len(records) < limit:
+            if record_filter.matches(entries[next_cursor]):
+                records.append(project(entries[next_cursor], fields))
+            next_cursor += 1
+        has_more = next_cursor < len(entries)
+
+    summary = get_campaign_traffic_summary(campaign_id)
+    return jsonify({
+        "success": True,
+        "data": records,
+        "metadata": {
+            "total_requests": summary["total_requests"],
+            "successful_requests": summary["successful_requests"],
+            "last_updated": datetime.utcnow().isoformat()
+        },
+        "pagination": {
+            "cursor": str(after),
+            "limit": limit,
+            # Stays valid while the campaign writes: the next page starts after the last record returned
+            "next_cursor": str(next_cursor),
+            "has_more": has_more
+        }
+    })
+
 @bp.route("/generated/<campaign_id>", methods=['GET'])
 def get_campaign_traffic(campaign_id: str):
-    """Get generated traffic for a specific campaign"""
+    """Get generated traffic for a specific campaign, a page of it with ``limit`` or ``cursor``"""
     try:
         logger.info(f"[API] Getting generated traffic for campaign {campaign_id}")
+        if any(name in request.args for name in ('limit', 'cursor') + QUERY_PARAMS):
+            return get_campaign_traffic_page(campaign_id)
         campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
         
         if os.path.exists(campaign_file):
@@ -846,18 +1489,9 @@ def get_campaign_traffic(campaign_id: str):
                     "message": "Failed to fix corrupted traffic file"
                 }), 500
             
-            # Read the fixed file
-            with open(campaign_file, 'r') as f:
-                traffic_data = json.load(f)
-            
-            # Validate file structure - must be a dictionary
-            if not isinstance(traffic_data, dict):
-                logger.error(f"[API] Invalid file structure for campaign {campaign_id}. Expected dict, got {type(traffic_data)}")
-                return jsonify({
-                    "success": False,
-                    "message": f"Invalid file structure. Expected object format, got {type(traffic_data).__name__}"
-                }), 500
-            
+        # Read the legacy file and the segment store
+        traffic_data = load_campaign_traffic(campaign_id)
+        if traffic_data is not None:
             # Count total requests and successful requests
             total_requests = len(traffic_data)
             successful_requests = sum(1 for entry in traffic_data.values() if entry.get('success', False))
@@ -891,31 +1525,182 @@ def get_campaign_traffic(campaign_id: str):
             "message": f"Error getting campaign traffic: {str(e)}"
         }), 500
 
+@bp.route("/generated/<campaign_id>/since/<int:seq>", methods=['GET'])
+def get_campaign_traffic_since(campaign_id: str, seq: int):
+    """Get the records written after ``seq`` and the campaign's high-water mark, waiting for new ones.
+
+    Query params: limit (default 100, max 1000), timeout (seconds to wait while there are no
+    new records, default 0, max 30), and the fields projection and filters of ``parse_record_filter``.
+    The wait ends as soon as a generator commits records.
+    """
+    try:
+        limit = min(1000, max(1, int(request.args.get('limit', 100))))
+        timeout = min(SINCE_MAX_TIMEOUT, max(0.0, float(request.args.get('timeout', 0))))
+    except ValueError:
+        return jsonify({"success": False, "error": "limit and timeout must be numbers"}), 400
+    try:
+        record_filter = parse_record_filter(request.args)
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    campaign_dir = os.path.join(TRAFFIC_DATA_DIR, campaign_id)
+    deadline = time.monotonic() + timeout
+    next_seq = seq
+    while True:
+        version = campaign_version(campaign_id)
+        # Legacy traffic.json records have no seq, so only the segment store is read
+        if has_store(campaign_dir):
+            store = get_campaign_store(campaign_id)
+            if record_filter or fields:
+                # Records scanned without a match are not scanned again after a wait
+                records, has_more, next_seq = store.query(next_seq, limit, record_filter, fields)
+            else:
+                records, has_more = store.read_page(next_seq, limit)
+                next_seq = records[-1]['seq'] if records else next_seq
+            high_water_mark = store.committed_seq()
+        else:
+            records, has_more, high_water_mark = [], False, 0
+        remaining = deadline - time.monotonic()
+        if records or remaining <= 0:
+            break
+        wait_for_campaign_change(campaign_id, version, remaining)
+
+    return jsonify({
+        "success": True,
+        "data": records,
+        "since": seq,
+        # Pass as the seq of the next request
+        "next_seq": next_seq,
+        "high_water_mark": high_water_mark,
+        "has_more": has_more
+    })
+
+def iter_campaign_traffic_lines(campaign_id: str) -> Iterator[bytes]:
+    """Yield every record of a campaign as a JSON line, the legacy file's first, then the segment store's in seq order"""
+    legacy_data = read_legacy_traffic_file(campaign_id)
+    if legacy_data:
+        for entry in legacy_data.values():
+            yield encode_record(entry)
+    if has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        # Stored lines are sent as they are, without decoding them
+        yield from get_campaign_store(campaign_id).iter_lines()
+
+def chunk_traffic_lines(lines: Iterator[bytes], counts: Dict[str, int], as_array: bool = False) -> Iterator[bytes]:
+    """Join record lines into download chunks, counting the records in ``counts``"""
+    chunk = []
+    chunk_size = 0
+    for line in lines:
+        if as_array:
+            line = (b',' if counts["total_requests"] else b'') + line[:-1]
+        counts["total_requests"] += 1
+        # Compact encoding, so a successful record always holds exactly this
+        if b'"success":true' in line:
+            counts["successful_requests"] += 1
+        chunk.append(line)
+        chunk_size += len(line)
+        if chunk_size >= DOWNLOAD_CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield b''.join(chunk)
+
+def download_trailer(campaign_id: str, download_time: datetime, counts: Dict[str, int]) -> bytes:
+    return (f'{{"trailer":{{"campaign_id":{json.dumps(campaign_id)},"download_time":"{download_time.isoformat()}",'
+            f'"total_requests":{counts["total_requests"]},"successful_requests":{counts["successful_requests"]}}}}}\n').encode()
+
+def stream_precompressed_traffic(campaign_id: str, store: CampaignStore, stream: str, download_time: datetime):
+    """Yield a gzip NDJSON download of one stream: its precompressed sealed segments, then the rest compressed now"""
+    yield GZIP_HEADER
+    counts = {"total_requests": 0, "successful_requests": 0}
+    crc = size = 0
+    last_sealed = 0
+    for path, info in store.sealed_segments(stream):
+        with open(path + COMPRESSED_SUFFIX, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                yield chunk
+        crc = crc32_combine(crc, info["crc32"], info["size"])
+        size += info["size"]
+        counts["total_requests"] += info["records"]
+        counts["successful_requests"] += info["successful"]
+        last_sealed = segment_index(path)
+
+    compressor = new_compressor('raw')
+    reader = StreamReader(os.path.join(store.segments_dir, stream), last_sealed + 1, 0)
+    lines = iter(lambda: (reader.next_line() or (0, None))[1], None)
+    try:
+        for chunk in chunk_traffic_lines(lines, counts):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    finally:
+        reader.close()
+    trailer = download_trailer(campaign_id, download_time, counts)
+    crc = zlib.crc32(trailer, crc)
+    size += len(trailer)
+    yield compressor.compress(trailer) + compressor.flush()
+    yield gzip_trailer(crc, size)
+    logger.info(f"[API] Streamed {counts['total_requests']} entries of campaign {campaign_id} from precompressed segments")
+
+def stream_campaign_traffic(campaign_id: str, download_format: str) -> Response:
+    """Stream a campaign's traffic as NDJSON or as one JSON document, ending with the totals"""
+    download_time = datetime.utcnow()
+    headers = {
+        "Content-Disposition": f"attachment; filename=traffic_{campaign_id}_{download_time.strftime('%Y%m%d_%H%M%S')}.{download_format}",
+        # Proxies pass chunks on as they come instead of buffering the download
+        "X-Accel-Buffering": "no"
+    }
+    mimetype = 'application/x-ndjson' if download_format == 'ndjson' else 'application/json'
+
+    # Single-stream campaigns are their segments in order, so gzip clients get the precompressed ones
+    campaign_dir = os.path.join(TRAFFIC_DATA_DIR, campaign_id)
+    if (download_format == 'ndjson' and negotiate_encoding() == 'gzip' and has_store(campaign_dir)
+            and not os.path.exists(os.path.join(campaign_dir, 'traffic.json'))):
+        store = get_campaign_store(campaign_id)
+        streams = store.stream_names()
+        if len(streams) == 1:
+            response = Response(stream_precompressed_traffic(campaign_id, store, streams[0], download_time),
+                                mimetype=mimetype, headers={**headers, "Content-Encoding": "gzip"})
+            response.vary.add('Accept-Encoding')
+            return response
+
+    def generate():
+        as_array = download_format == 'json'
+        if as_array:
+            yield f'{{"campaign_id":{json.dumps(campaign_id)},"download_time":"{download_time.isoformat()}","traffic_data":['.encode()
+        counts = {"total_requests": 0, "successful_requests": 0}
+        yield from chunk_traffic_lines(iter_campaign_traffic_lines(campaign_id), counts, as_array)
+        if as_array:
+            yield f'],"total_requests":{counts["total_requests"]},"successful_requests":{counts["successful_requests"]}}}'.encode()
+        else:
+            yield download_trailer(campaign_id, download_time, counts)
+        logger.info(f"[API] Streamed {counts['total_requests']} entries of campaign {campaign_id} as {download_format}")
+
+    return Response(generate(), mimetype=mimetype, headers=headers)
+
 @bp.route("/download/<campaign_id>", methods=['GET'])
 def download_campaign_traffic(campaign_id: str):
-    """Download generated traffic for a specific campaign"""
+    """Download generated traffic for a specific campaign, streamed with ``format=ndjson|json``"""
     try:
         logger.info(f"[API] Download request for campaign {campaign_id} traffic")
-        campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
+        download_format = request.args.get('format')
+        if download_format is not None:
+            if download_format not in DOWNLOAD_FORMATS:
+                return jsonify({"success": False, "message": f"Unknown download format {download_format}; expected one of {', '.join(DOWNLOAD_FORMATS)}"}), 400
+            campaign_dir = os.path.join(TRAFFIC_DATA_DIR, campaign_id)
+            if not os.path.exists(os.path.join(campaign_dir, 'traffic.json')) and not has_store(campaign_dir):
+                return jsonify({"success": False, "message": "No traffic data found for campaign"}), 404
+            return stream_campaign_traffic(campaign_id, download_format)
+        traffic_data = load_campaign_traffic(campaign_id)
         
-        if not os.path.exists(campaign_file):
+        if traffic_data is None:
             logger.warning(f"[API] No traffic data found for campaign {campaign_id}")
             return jsonify({
                 "success": False,
                 "message": "No traffic data found for campaign"
             }), 404
             
-        with open(campaign_file, 'r') as f:
-            traffic_data = json.load(f)
-        
-        # Validate file structure - must be a dictionary
-        if not isinstance(traffic_data, dict):
-            logger.error(f"[API] Invalid file structure for campaign {campaign_id}. Expected dict, got {type(traffic_data)}")
-            return jsonify({
-                "success": False,
-                "message": f"Invalid file structure. Expected object format, got {type(traffic_data).__name__}"
-            }), 500
-            
         # Add metadata to the download
         download_data = {
             "campaign_id": campaign_id,
@@ -939,47 +1724,168 @@ def download_campaign_traffic(campaign_id: str):
             "message": f"Error preparing download: {str(e)}"
         }), 500
 
+@bp.route("/export/<campaign_id>", methods=['GET'])
+def export_campaign_traffic(campaign_id: str):
+    """Stream a campaign's traffic as a CSV or TSV table of flattened records.
+
+    Query params: format (csv or tsv, default csv), table (records, requests, impressions,
+    devices or users, default records), and the filters of ``parse_record_filter``.
+    """
+    export_format = request.args.get('format', 'csv')
+    table = request.args.get('table', 'records')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"success": False, "message": f"Unknown export format {export_format}; expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    if table not in EXPORT_TABLES:
+        return jsonify({"success": False, "message": f"Unknown table {table}; expected one of {', '.join(EXPORT_TABLES)}"}), 400
+    try:
+        record_filter = parse_record_filter(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    campaign_dir = os.path.join(TRAFFIC_DATA_DIR, campaign_id)
+    if not os.path.exists(os.path.join(campaign_dir, 'traffic.json')) and not has_store(campaign_dir):
+        return jsonify({"success": False, "message": "No traffic data found for campaign"}), 404
+
+    delimiter, mimetype = EXPORT_FORMATS[export_format]
+    export_time = datetime.utcnow()
+
+    def generate():
+        counts = {}
+        yield from export_table(iter_campaign_traffic_lines(campaign_id), table, delimiter, record_filter, counts)
+        logger.info(f"[API] Exported {counts['rows']} {table} rows of {counts['records']} records of campaign {campaign_id} as {export_format}")
+
+    logger.info(f"[API] Export request for the {table} of campaign {campaign_id} as {export_format}")
+    return Response(generate(), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=traffic_{campaign_id}_{table}_{export_time.strftime('%Y%m%d_%H%M%S')}.{export_format}",
+        "X-Column-Types": column_types(table),
+        "X-Accel-Buffering": "no"
+    })
+
+def describe_sealed_segment(campaign_id: str, stream: str, path: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    name = os.path.basename(path)
+    return {
+        "name": name,
+        "size": info["size"],
+        "sha256": info["sha256"],
+        "crc32": info["crc32"],
+        "records": info["records"],
+        "successful_requests": info["successful"],
+        "first_seq": info.get("first_seq"),
+        "last_seq": info.get("last_seq"),
+        "compressed_size": info["compressed_size"],
+        "url": url_for('traffic.download_sealed_segment', campaign_id=campaign_id, stream=stream, name=name),
+        "compressed_url": url_for('traffic.download_sealed_segment', campaign_id=campaign_id, stream=stream,
+                                  name=name, compressed='true')
+    }
+
+@bp.route("/segments/<campaign_id>", methods=['GET'])
+def list_sealed_segments(campaign_id: str):
+    """List the sealed segments of a campaign's traffic with their sizes and checksums.
+
+    Sealed segments never change; clients download them from their ``url``, in parallel and
+    resuming with Range requests, and verify them against their SHA-256.
+    """
+    if not has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        return jsonify({"success": False, "message": "No segment store found for campaign"}), 404
+    store = get_campaign_store(campaign_id)
+    streams = {}
+    for stream in store.stream_names():
+        streams[stream] = [describe_sealed_segment(campaign_id, stream, path, info)
+                           for path, info in store.sealed_segments(stream)]
+    segments = [segment for stream_segments in streams.values() for segment in stream_segments]
+    logger.info(f"[API] Listing {len(segments)} sealed segments of campaign {campaign_id}")
+    return jsonify({
+        "success": True,
+        "data": {
+            "campaign_id": campaign_id,
+            "streams": streams,
+            "sealed_records": sum(segment["records"] for segment in segments),
+            "sealed_size": sum(segment["size"] for segment in segments),
+            # Records after the sealed segments are still being written; read them with /generated
+            "total_requests": store.total_requests,
+            "max_seq": store.max_seq
+        }
+    })
+
+@bp.route("/segments/<campaign_id>/<stream>/<name>", methods=['GET'])
+def download_sealed_segment(campaign_id: str, stream: str, name: str):
+    """Serve a sealed segment as an immutable file with Range and If-Range support.
+
+    With ``compressed=true`` the segment's raw deflate stream is served instead.
+    """
+    not_found = jsonify({"success": False, "message": "Sealed segment not found"}), 404
+    if not has_store(os.path.join(TRAFFIC_DATA_DIR, campaign_id)):
+        return not_found
+    store = get_campaign_store(campaign_id)
+    if stream not in store.stream_names():
+        return not_found
+    # Only the stream's sealed segments are served, sealed again first if their file changed
+    sealed = {os.path.basename(path): (path, info) for path, info in store.sealed_segments(stream)}
+    if name not in sealed:
+        return not_found
+    path, info = sealed[name]
+
+    if request.args.get('compressed', 'false').lower() == 'true':
+        path += COMPRESSED_SUFFIX
+        etag = f"{info['sha256']}-deflate"
+        mimetype = 'application/octet-stream'
+    else:
+        etag = info["sha256"]
+        mimetype = 'application/x-ndjson'
+    # The sealed bytes are the ETag, so Range, If-Range and If-None-Match work across restarts
+    try:
+        response = send_file(path, mimetype=mimetype, download_name=os.path.basename(path), conditional=True,
+                             etag=etag, max_age=SEALED_SEGMENT_MAX_AGE)
+    except RequestedRangeNotSatisfiable as e:
+        # Answered here, the app's exception handler would turn it into a 500
+        return e.get_response()
+    response.cache_control.immutable = True
+    return response
+
 @bp.route("/monitor/<campaign_id>", methods=['GET'])
 def monitor_campaign(campaign_id: str):
     """Get real-time monitoring data for a campaign"""
     try:
         logger.info(f"[API] Monitoring request for campaign {campaign_id}")
+
+        etag = make_etag('monitor', campaign_id, campaign_state(campaign_id))
+        response = not_modified(etag)
+        if response is not None:
+            return response
         
         # Check if campaign is running
         is_running = campaign_id in active_threads
         
-        # Get campaign file path
-        campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
+        # Get campaign traffic from the legacy file and the segment store
+        traffic_data = load_campaign_traffic(campaign_id)
         
         # Get campaign data
         campaign_data = {
             "campaign_id": campaign_id,
             "is_running": is_running,
-            "has_data": os.path.exists(campaign_file),
+            "has_data": traffic_data is not None,
             "last_updated": datetime.utcnow().isoformat()
         }
         
-        # Add file stats if exists
-        if os.path.exists(campaign_file):
+        # Add traffic stats if any
+        if traffic_data is not None:
             try:
-                with open(campaign_file, 'r') as f:
-                    data = json.load(f)
-                    campaign_data.update({
-                        "total_requests": len(data),
-                        "successful_requests": sum(1 for req in data if req.get('success', False)),
-                        "last_request": data[-1] if data else None,
-                        "requests_per_minute": calculate_requests_per_minute(data),
-                        "success_rate": calculate_success_rate(data),
-                        "average_response_time": calculate_average_response_time(data)
-                    })
+                data = list(traffic_data.values())
+                campaign_data.update({
+                    "total_requests": len(data),
+                    "successful_requests": sum(1 for req in data if req.get('success', False)),
+                    "last_request": data[-1] if data else None,
+                    "requests_per_minute": calculate_requests_per_minute(data),
+                    "success_rate": calculate_success_rate(data),
+                    "average_response_time": calculate_average_response_time(data)
+                })
             except Exception as e:
                 logger.error(f"[API] Error reading campaign file: {str(e)}", exc_info=True)
         
         logger.info(f"[API] Monitoring data for campaign {campaign_id}: {json.dumps(campaign_data, indent=2)}")
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "data": campaign_data
-        })
+        }), etag)
 
     except Exception as e:
         logger.error(f"[API] Error monitoring campaign: {str(e)}", exc_info=True)
@@ -988,6 +1894,73 @@ def monitor_campaign(campaign_id: str):
             "message": f"Error monitoring campaign: {str(e)}"
         }), 500
 
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n".encode()
+
+def stream_campaign_monitor(campaign_id: str, max_rate: float) -> Iterator[bytes]:
+    """Yield the status of a campaign as server-sent events: a snapshot, then a delta after every change.
+
+    Changes are coalesced so that at most ``max_rate`` events are sent per second. The stream
+    wakes when a generator commits records or the campaign state changes; running campaigns
+    are also looked at every interval for their in-flight and overload state.
+    """
+    interval = 1.0 / max_rate
+    previous = None
+    previous_state = None
+    previous_time = last_write = time.monotonic()
+    yield b'retry: 3000\n\n'
+    while True:
+        version = campaign_version(campaign_id)
+        live_state = live_campaign_state(campaign_id)
+        state = (campaign_state(campaign_id), live_state)
+        now = time.monotonic()
+        if state != previous_state:
+            data = campaign_status_data(campaign_id, live_state)
+            data.pop("last_updated")
+            total = data.get("total_requests", 0)
+            data["success_rate"] = round(data.get("successful_requests", 0) / total * 100, 2) if total else 0.0
+            if previous is None:
+                yield sse_event("snapshot", data)
+                last_write = now
+            else:
+                delta = {key: value for key, value in data.items() if previous.get(key) != value}
+                # Fields that went away, like the in-flight count of a stopped campaign
+                delta.update({key: None for key in previous if key not in data})
+                if delta:
+                    new_requests = total - previous.get("total_requests", 0)
+                    delta["new_requests"] = new_requests
+                    delta["new_successful_requests"] = data.get("successful_requests", 0) - previous.get("successful_requests", 0)
+                    delta["requests_per_minute"] = round(new_requests * 60 / max(now - previous_time, 1e-6), 2)
+                    yield sse_event("delta", delta)
+                    last_write = now
+            if previous is None or delta:
+                previous, previous_time = data, now
+            previous_state = state
+        elif now - last_write >= MONITOR_STREAM_HEARTBEAT:
+            yield b': keep-alive\n\n'
+            last_write = now
+
+        # Changes until the interval has passed go out together in the next event
+        time.sleep(max(0.0, interval - (time.monotonic() - now)))
+        timeout = 0.0 if live_state is not None else max(0.0, MONITOR_STREAM_HEARTBEAT - (time.monotonic() - last_write))
+        wait_for_campaign_change(campaign_id, version, timeout)
+
+@bp.route("/monitor/<campaign_id>/stream", methods=['GET'])
+def stream_campaign_monitoring(campaign_id: str):
+    """Stream real-time monitoring data for a campaign as server-sent events"""
+    try:
+        max_rate = float(request.args.get('max_rate', MONITOR_STREAM_MAX_RATE))
+    except ValueError:
+        max_rate = 0.0
+    if not 0 < max_rate <= MONITOR_STREAM_RATE_LIMIT:
+        return jsonify({
+            "success": False,
+            "message": f"max_rate must be a number of events per second in (0, {MONITOR_STREAM_RATE_LIMIT:g}]"
+        }), 400
+    logger.info(f"[API] Opening monitoring stream for campaign {campaign_id} at up to {max_rate:g} events per second")
+    return Response(stream_campaign_monitor(campaign_id, max_rate), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 def calculate_requests_per_minute(data: List[Dict[str, Any]]) -> float:
     """Calculate requests per minute from traffic data"""
     if not data:
@@ -1049,23 +2022,24 @@ def get_campaign_stats(campaign_id: str):
     """Get statistics for a specific campaign"""
     try:
         logger.info(f"Getting stats for campaign {campaign_id}")
-        traffic_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
-        if not os.path.exists(traffic_file):
+        traffic_data = load_campaign_traffic(campaign_id)
+        if not traffic_data:
+            # Distributed campaigns are summarized from the worker nodes' counters and sketches
+            from app.api.cluster import load_cluster_state, cluster_stats
+            from app.api.sessions import sessions
+            cluster_state = load_cluster_state(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+            if cluster_state:
+                duration_minutes = getattr(sessions.get(campaign_id), 'duration_minutes', None)
+                return jsonify({
+                    "success": True,
+                    "data": cluster_stats(cluster_state["summary"], duration_minutes)
+                })
+        if traffic_data is None:
             logger.warning(f"No traffic data found for campaign {campaign_id}")
             return jsonify({
                 "success": False,
                 "message": "No traffic data found for campaign"
             }), 404
-        with open(traffic_file, 'r') as f:
-            traffic_data = json.load(f)
-        
-        # Validate file structure - must be a dictionary
-        if not isinstance(traffic_data, dict):
-            logger.error(f"[API] Invalid file structure for campaign {campaign_id}. Expected dict, got {type(traffic_data)}")
-            return jsonify({
-                "success": False,
-                "message": f"Invalid file structure. Expected object format, got {type(traffic_data).__name__}"
-            }), 500
         
         total_requests = len(traffic_data)
         successful_requests = sum(1 for entry in traffic_data.values() if entry.get('success', False))
@@ -1078,6 +2052,7 @@ def get_campaign_stats(campaign_id: str):
         unique_rtb_ids = set()
         
         for entry in traffic_data.values():
+            rtb = entry.get('rtb_data', {})
             # Use new restructured RTB data fields for easier access
             rtb_id = entry.get('rtb_id')
             if rtb_id:
@@ -1088,7 +2063,6 @@ def get_campaign_stats(campaign_id: str):
             adid = rtb_user.get('id')
             if not adid:
                 # Fall back to old structure
-                rtb = entry.get('rtb_data', {})
                 user = rtb.get('user', {})
                 adid = user.get('id')
             if adid:
@@ -1299,11 +2273,10 @@ def update_campaign_status(campaign_id: str, status: str, additional_data: Dict[
             logger.warning(f"Invalid status {status}, using 'error'")
             status = "error"
             
-        campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
         status_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'status.json')
         
         # Ensure campaign directory exists
-        os.makedirs(os.path.dirname(campaign_file), exist_ok=True)
+        os.makedirs(os.path.dirname(status_file), exist_ok=True)
         
         # Get thread lock for this campaign
         lock = thread_locks.get(campaign_id)
@@ -1312,30 +2285,15 @@ def update_campaign_status(campaign_id: str, status: str, additional_data: Dict[
             thread_locks[campaign_id] = lock
             
         with lock:
-            # Calculate statistics if file exists
+            # Calculate statistics from the legacy file and the segment store
             total_requests = 0
             successful_requests = 0
-            if os.path.exists(campaign_file):
-                try:
-                    with open(campaign_file, 'r') as f:
-                        traffic_data = json.load(f)
-                        
-                        # Handle both old list format and new object format
-                        if isinstance(traffic_data, list):
-                            # Old format - list of requests
-                            total_requests = len(traffic_data)
-                            successful_requests = sum(1 for entry in traffic_data if entry.get('success', False))
-                        elif isinstance(traffic_data, dict):
-                            # New format - object with request IDs as keys
-                            total_requests = len(traffic_data)
-                            successful_requests = sum(1 for entry in traffic_data.values() if entry.get('success', False))
-                        else:
-                            logger.warning(f"Unknown traffic data format: {type(traffic_data)}")
-                            total_requests = 0
-                            successful_requests = 0
-                            
-                except Exception as e:
-                    logger.error(f"Error reading campaign file: {str(e)}", exc_info=True)
+            try:
+                summary = get_campaign_traffic_summary(campaign_id)
+                total_requests = summary["total_requests"]
+                successful_requests = summary["successful_requests"]
+            except Exception as e:
+                logger.error(f"Error reading campaign traffic: {str(e)}", exc_info=True)
             
             # Prepare status update
             status_data = {
@@ -1381,6 +2339,7 @@ def update_campaign_status(campaign_id: str, status: str, additional_data: Dict[
             try:
                 with open(status_file, 'w') as f:
                     json.dump(status_data, f, indent=2)
+                bump_campaign_version(campaign_id)
                 logger.info(f"[Status Update] Successfully updated status for campaign {campaign_id}")
             except Exception as e:
                 logger.error(f"Error writing status file: {str(e)}", exc_info=True)
@@ -1404,6 +2363,47 @@ def update_campaign_status(campaign_id: str, status: str, additional_data: Dict[
             pass
         return None
 
+def live_campaign_state(campaign_id: str) -> Optional[Tuple[Any, ...]]:
+    """In-flight requests, window limit and overload state of a running campaign, None if it isn't running"""
+    if campaign_id not in active_threads:
+        return None
+    window = inflight_windows.get(campaign_id)
+    monitor = overload_monitors.get(campaign_id)
+    return (len(window) if window is not None else None, window.limit if window is not None else None,
+            monitor.snapshot() if monitor is not None else None)
+
+def campaign_status_data(campaign_id: str, live_state: Optional[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Build the status of a campaign as reported by /status"""
+    # Get counters from the legacy file and the segment store
+    summary = get_campaign_traffic_summary(campaign_id)
+
+    # Get campaign data
+    campaign_data = {
+        "campaign_id": campaign_id,
+        "is_running": live_state is not None,
+        "has_data": summary["has_data"],
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+    # Add traffic stats if any
+    if summary["has_data"]:
+        campaign_data.update({
+            "total_requests": summary["total_requests"],
+            "successful_requests": summary["successful_requests"],
+            "last_request": summary["last_request"]
+        })
+        if "nodes" in summary:
+            campaign_data["nodes"] = summary["nodes"]
+
+    if live_state is not None:
+        in_flight, max_in_flight, overload = live_state
+        if max_in_flight is not None:
+            campaign_data["in_flight"] = in_flight
+            campaign_data["max_in_flight"] = max_in_flight
+        if overload is not None:
+            campaign_data["overload"] = overload
+    return campaign_data
+
 @bp.route("/status/<campaign_id>", methods=['GET'])
 def get_campaign_status(campaign_id: str):
     """Get the current status of a campaign"""
@@ -1411,37 +2411,19 @@ def get_campaign_status(campaign_id: str):
         logger.info(f"Getting status for campaign {campaign_id}")
         
         # Check if campaign is running
-        is_running = campaign_id in active_threads
-        
-        # Get campaign file path
-        campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
-        
-        # Get campaign data
-        campaign_data = {
-            "campaign_id": campaign_id,
-            "is_running": is_running,
-            "has_data": os.path.exists(campaign_file),
-            "last_updated": datetime.utcnow().isoformat()
-        }
-        
-        # Add file stats if exists
-        if os.path.exists(campaign_file):
-            try:
-                with open(campaign_file, 'r') as f:
-                    data = json.load(f)
-                    campaign_data.update({
-                        "total_requests": len(data),
-                        "successful_requests": sum(1 for req in data if req.get('success', False)),
-                        "last_request": data[-1] if data else None
-                    })
-            except Exception as e:
-                logger.error(f"Error reading campaign file: {str(e)}", exc_info=True)
+        live_state = live_campaign_state(campaign_id)
+        etag = make_etag('status', campaign_id, campaign_state(campaign_id), live_state)
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        campaign_data = campaign_status_data(campaign_id, live_state)
         
         logger.debug(f"Campaign status: {json.dumps(campaign_data, indent=2)}")
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "data": campaign_data
-        })
+        }), etag)
 
     except Exception as e:
         logger.error(f"Error getting campaign status: {str(e)}", exc_info=True)
@@ -1450,6 +2432,85 @@ def get_campaign_status(campaign_id: str):
             "message": f"Error getting campaign status: {str(e)}"
         }), 500
 
+# Traffic summaries by campaign ID, with the in-memory campaign state they were read at
+_summary_cache: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+
+def cached_traffic_summary(campaign_id: str) -> Dict[str, Any]:
+    """Get the traffic summary of a campaign, read again only after its in-memory state changed"""
+    state = campaign_state(campaign_id)
+    cached = _summary_cache.get(campaign_id)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    summary = get_campaign_traffic_summary(campaign_id)
+    _summary_cache[campaign_id] = (state, summary)
+    return summary
+
+def compact_campaign_status(campaign_id: str, session) -> Dict[str, Any]:
+    """Status and counters of a campaign for /status:batch"""
+    summary = cached_traffic_summary(campaign_id)
+    total = summary["total_requests"]
+    last_request = summary["last_request"]
+    status = {
+        "status": session.status if session is not None else None,
+        "is_running": campaign_id in active_threads,
+        "total_requests": total,
+        "successful_requests": summary["successful_requests"],
+        "success_rate": round(summary["successful_requests"] / total * 100, 2) if total else 0.0,
+        "last_request_time": last_request.get('timestamp') if last_request else None
+    }
+    live_state = live_campaign_state(campaign_id)
+    if live_state is not None:
+        in_flight, _, overload = live_state
+        if in_flight is not None:
+            status["in_flight"] = in_flight
+        if overload is not None:
+            status["overload_state"] = overload["state"]
+    return status
+
+@bp.route("/status:batch", methods=['POST'])
+def get_campaign_statuses():
+    """Get the status of many campaigns, or of all running ones, in one request"""
+    from app.api.sessions import sessions
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('running'):
+            campaign_ids = list(active_threads)
+        else:
+            campaign_ids = data.get('campaign_ids')
+            if not isinstance(campaign_ids, list) or not all(isinstance(campaign_id, str) for campaign_id in campaign_ids):
+                return jsonify({
+                    "success": False,
+                    "message": "Provide campaign_ids as a list of campaign IDs, or running: true"
+                }), 400
+        if len(campaign_ids) > BATCH_STATUS_LIMIT:
+            return jsonify({
+                "success": False,
+                "message": f"At most {BATCH_STATUS_LIMIT} campaigns per request"
+            }), 400
+
+        statuses = {}
+        not_found = []
+        for campaign_id in dict.fromkeys(campaign_ids):
+            session = sessions.get(campaign_id)
+            if session is None and campaign_id not in active_threads:
+                not_found.append(campaign_id)
+                continue
+            statuses[campaign_id] = compact_campaign_status(campaign_id, session)
+
+        logger.debug(f"[API] Batch status of {len(statuses)} campaigns")
+        return jsonify({
+            "success": True,
+            "data": statuses,
+            "not_found": not_found
+        })
+
+    except Exception as e:
+        logger.error(f"[API] Error getting batch campaign status: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "message": f"Error getting campaign statuses: {str(e)}"
+        }), 500
+
 @bp.route("/health", methods=['GET'])
 def health_check():
     """Check the health of the traffic generation service"""
@@ -1480,16 +2541,14 @@ def health_check():
         campaign_stats = {}
         
         for campaign_id in active_campaigns:
-            campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
-            if os.path.exists(campaign_file):
+            summary = get_campaign_traffic_summary(campaign_id)
+            if summary["has_data"]:
                 try:
-                    with open(campaign_file, 'r') as f:
-                        data = json.load(f)
-                        campaign_stats[campaign_id] = {
-                            "total_requests": len(data),
-                            "successful_requests": sum(1 for entry in data if entry.get('success', False)),
-                            "last_updated": datetime.utcnow().isoformat()
-                        }
+                    campaign_stats[campaign_id] = {
+                        "total_requests": summary["total_requests"],
+                        "successful_requests": summary["successful_requests"],
+                        "last_updated": datetime.utcnow().isoformat()
+                    }
                 except Exception as e:
                     logger.error(f"Error reading campaign file {campaign_id}: {str(e)}")
                     campaign_stats[campaign_id] = {
@@ -2002,57 +3061,43 @@ def update_campaign_status_endpoint(campaign_id: str):
 @bp.route("/campaigns/<campaign_id>/info", methods=['GET'])
 def get_campaign_info(campaign_id: str):
     """Get comprehensive campaign information including status and traffic generation state"""
-    from app.api.sessions import sessions
+    from app.api.sessions import sessions, session_state
     try:
         # Check if campaign exists
         if campaign_id not in sessions:
             return jsonify({"error": f"Campaign {campaign_id} not found"}), 404
 
-        campaign_data = sessions[campaign_id].to_dict()
+        session = sessions[campaign_id]
+        etag = make_etag('info', campaign_id, campaign_state(campaign_id), session_state(session))
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        campaign_data = session.to_dict()
         
         # Get traffic generation status
         is_traffic_running = campaign_id in active_threads
         thread_id = active_threads.get(campaign_id) if is_traffic_running else None
         
-        # Get traffic data if exists
-        campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
+        # Get traffic counters from the legacy file and the segment store
+        summary = get_campaign_traffic_summary(campaign_id)
         traffic_stats = {
-            "has_traffic_data": os.path.exists(campaign_file),
+            "has_traffic_data": summary["has_data"],
             "total_requests": 0,
             "successful_requests": 0,
             "success_rate": 0.0
         }
         
-        if os.path.exists(campaign_file):
+        if summary["has_data"]:
             try:
-                with open(campaign_file, 'r') as f:
-                    traffic_data = json.load(f)
-                    
-                    # Handle both old list format and new object format
-                    if isinstance(traffic_data, list):
-                        # Old format - list of requests
-                        total_requests = len(traffic_data)
-                        successful_requests = sum(1 for entry in traffic_data if entry.get('success', False))
-                        last_request_time = traffic_data[-1].get('timestamp') if traffic_data else None
-                    elif isinstance(traffic_data, dict):
-                        # New format - object with request IDs as keys
-                        total_requests = len(traffic_data)
-                        successful_requests = sum(1 for entry in traffic_data.values() if entry.get('success', False))
-                        # Get last request time from the last entry
-                        last_entry = list(traffic_data.values())[-1] if traffic_data else None
-                        last_request_time = last_entry.get('timestamp') if last_entry else None
-                    else:
-                        total_requests = 0
-                        successful_requests = 0
-                        last_request_time = None
-                    
-                    traffic_stats.update({
-                        "total_requests": total_requests,
-                        "successful_requests": successful_requests,
-                        "last_request_time": last_request_time
-                    })
-                    if traffic_stats["total_requests"] > 0:
-                        traffic_stats["success_rate"] = (traffic_stats["successful_requests"] / traffic_stats["total_requests"]) * 100
+                last_entry = summary["last_request"]
+                traffic_stats.update({
+                    "total_requests": summary["total_requests"],
+                    "successful_requests": summary["successful_requests"],
+                    "last_request_time": last_entry.get('timestamp') if last_entry else None
+                })
+                if traffic_stats["total_requests"] > 0:
+                    traffic_stats["success_rate"] = (traffic_stats["successful_requests"] / traffic_stats["total_requests"]) * 100
             except Exception as e:
                 logger.error(f"[API] Error reading traffic data: {str(e)}")
 
@@ -2085,10 +3130,10 @@ def get_campaign_info(campaign_id: str):
             }
         }
 
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "data": campaign_info
-        })
+        }), etag)
 
     except Exception as e:
         logger.logerror(f"[API] Error getting campaign info: {str(e)}", exc_info=True)
@@ -2110,18 +3155,40 @@ def download_events_log():
 
 @bp.route("/campaigns/<campaign_id>/adids", methods=["GET"])
 def get_campaign_adids(campaign_id: str):
-    """Get the ADID lists for each profile in a campaign."""
+    """Get a page of the ADIDs of each profile in a campaign.
+
+    Query params: profile_id (optional), offset (default 0), limit (default 100, max 1000).
+    """
     try:
-        if campaign_id not in campaign_adids:
+        adids = load_campaign_adids(campaign_id)
+        if adids is None:
             logger.warning(f"[API] No ADIDs found for campaign {campaign_id}")
             return jsonify({
                 "success": False,
                 "error": f"No ADIDs found for campaign {campaign_id}"
             }), 404
+
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(1000, max(1, int(request.args.get('limit', 100))))
+        except ValueError:
+            return jsonify({"success": False, "error": "offset and limit must be integers"}), 400
+        profile_id = request.args.get('profile_id')
+        counts = adids.counts()
+        if profile_id and profile_id not in counts:
+            return jsonify({"success": False, "error": f"Profile {profile_id} not found in campaign {campaign_id}"}), 404
+
+        profile_ids = [profile_id] if profile_id else list(counts)
+        page = {pid: adids.population(pid).page(offset, limit) for pid in profile_ids}
+        has_more = any(offset + limit < counts[pid] for pid in profile_ids)
         return jsonify({
             "success": True,
             "campaign_id": campaign_id,
-            "adids": campaign_adids[campaign_id]
+            "adids": page,
+            "total": {pid: counts[pid] for pid in profile_ids},
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if has_more else None
         })
     except Exception as e:
         logger.error(f"[API] Error getting ADIDs for campaign {campaign_id}: {str(e)}", exc_info=True)
@@ -2158,11 +3225,62 @@ def download_campaign_log(campaign_id):
         return jsonify({"error": "Log file not found"}), 404
     return send_file(log_file, as_attachment=True)
 
+def wait_for_generator(campaign_id: str, timeout: float) -> bool:
+    """Wait for a stopped campaign's generation thread to write its last records; False if it still runs"""
+    for thread in threading.enumerate():
+        if thread.name == f"traffic_generator_{campaign_id}" and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+    return True
+
+def resume_from_checkpoint(campaign_id: str, checkpoint: Dict[str, Any]):
+    """Continue a campaign run from its checkpoint: same seed, schedule, counters and sequence numbers"""
+    campaign_dir = os.path.join(TRAFFIC_DATA_DIR, campaign_id)
+    if campaign_id in active_threads:
+        return jsonify({"success": False, "message": "Campaign is already running"}), 409
+    if not wait_for_generator(campaign_id, checkpoint['config']['config'].get('http_timeout', DEFAULT_TIMEOUT) + 2):
+        return jsonify({"success": False, "message": "Campaign is still stopping, try again"}), 409
+    # The stopping run writes a final checkpoint
+    checkpoint = load_checkpoint(campaign_dir) or checkpoint
+    if checkpoint.get('status') == 'completed':
+        return jsonify({"success": False, "message": "Campaign already completed"}), 400
+
+    config_data = dict(checkpoint['config'])
+    config_data['start_time'] = parse_time(config_data.get('start_time'))
+    config_data['end_time'] = parse_time(config_data.get('end_time'))
+    config = TrafficConfig(**config_data)
+    # Keep the seed of the run, even if it was drawn at its start
+    config.config['seed'] = checkpoint['seed']
+    next_seq = get_campaign_store(campaign_id).max_seq + 1
+    logger.info(f"[API] Resuming campaign {campaign_id} from its checkpoint at seq {next_seq}")
+
+    thread_locks[campaign_id] = threading.Lock()
+    thread_id = str(uuid.uuid4())
+    active_threads[campaign_id] = thread_id
+    thread = threading.Thread(
+        target=generate_traffic_background,
+        args=(config, thread_id, checkpoint),
+        daemon=True,
+        name=f"traffic_generator_{campaign_id}"
+    )
+    thread.start()
+    append_campaign_log(campaign_id, f"RESUME: Traffic generation resumed from checkpoint at seq {next_seq} at {datetime.utcnow().isoformat()}")
+    from app.api.sessions import sessions
+    if campaign_id in sessions:
+        sessions[campaign_id].status = "running"
+        sessions[campaign_id].updated_at = datetime.utcnow()
+    return jsonify({"success": True, "message": "Campaign resumed successfully", "campaign_id": campaign_id,
+                    "status": "running", "thread_id": thread_id, "next_seq": next_seq, "from_checkpoint": True})
+
 @bp.route("/resume/<campaign_id>", methods=['POST'])
 def resume_campaign(campaign_id: str):
     """Resume a stopped campaign from where it left off."""
     try:
         logger.info(f"[API] Received resume request for campaign {campaign_id}")
+        checkpoint = load_checkpoint(os.path.join(TRAFFIC_DATA_DIR, campaign_id))
+        if checkpoint is not None:
+            return resume_from_checkpoint(campaign_id, checkpoint)
         status_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'status.json')
         campaign_file = os.path.join(TRAFFIC_DATA_DIR, campaign_id, 'traffic.json')
         if not os.path.exists(status_file):
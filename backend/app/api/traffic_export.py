@@ -0,0 +1,147 @@
+"""
+CSV and TSV exports of campaign traffic.
+
+Records are flattened into fixed, typed columns instead of nested JSON. The
+``records`` table has one row per request with the site, device and user of
+its bid request folded in. The RTB fields can also be exported as related
+tables that join on ``rtb_id``:
+
+- ``requests``: one row per request, without the device and user
+- ``impressions``: one row per impression of a bid request
+- ``devices``: the device of every bid request
+- ``users``: the user of every bid request
+
+Rows are written from the encoded records one at a time and sent in chunks,
+so an export takes the same memory whatever the size of the campaign. Records
+without the RTB object a related table is built from are passed over without
+being decoded.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .traffic_query import RecordFilter
+
+# Delimiter and mimetype by export format
+EXPORT_FORMATS = {
+    'csv': (',', 'text/csv'),
+    'tsv': ('\t', 'text/tab-separated-values')
+}
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# (name, type, getter) of a column
+Column = Tuple[str, str, Callable[[Dict[str, Any]], Any]]
+
+
+def _path(*keys: str) -> Callable[[Dict[str, Any]], Any]:
+    """Getter of a nested field, None where a level is missing"""
+    def get(source: Dict[str, Any]) -> Any:
+        for key in keys:
+            if not isinstance(source, dict):
+                return None
+            source = source.get(key)
+        return source
+    return get
+
+
+def _columns(prefix: str, path: Tuple[str, ...], fields: Iterable[Tuple[str, str]]) -> List[Column]:
+    return [(f"{prefix}{name}", column_type, _path(*path, *name.split('.')))
+            for name, column_type in fields]
+
+
+SITE_FIELDS = (("id", "string"), ("name", "string"), ("domain", "string"))
+DEVICE_FIELDS = (("ua", "string"), ("ip", "string"), ("make", "string"), ("model", "string"),
+                 ("os", "string"), ("osv", "string"))
+USER_FIELDS = (("id", "string"),)
+IMPRESSION_FIELDS = (("id", "string"), ("banner.w", "integer"), ("banner.h", "integer"),
+                     ("bidfloor", "number"), ("bidfloorcur", "string"))
+
+REQUEST_COLUMNS: List[Column] = [
+    *_columns("", (), (("seq", "integer"), ("id", "string"), ("timestamp", "timestamp"),
+                       ("campaign_id", "string"), ("target_url", "string"), ("selected_profile_id", "string"),
+                       ("selected_interest", "string"), ("selected_country", "string"), ("referrer", "string"),
+                       ("rtb_id", "string"), ("rtb_auction_type", "integer"), ("rtb_timeout", "integer"),
+                       ("rtb_currency", "list"))),
+    *_columns("site_", ("rtb_site",), SITE_FIELDS),
+    *_columns("", (), (("success", "boolean"), ("response_time", "number"), ("status_code", "integer"),
+                       ("response_size", "integer"), ("bid_id", "string"), ("win_price", "number"),
+                       ("currency", "string")))
+]
+RECORD_COLUMNS: List[Column] = [
+    *REQUEST_COLUMNS,
+    *_columns("device_", ("rtb_device",), DEVICE_FIELDS),
+    *_columns("user_", ("rtb_user",), USER_FIELDS),
+    ("imp_count", "integer", lambda record: len(record.get("rtb_imp") or ()))
+]
+RTB_ID_COLUMN: Column = ("rtb_id", "string", _path("rtb_id"))
+
+
+def _rtb_rows(key: str, many: bool = False) -> Callable[[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rows of a related table: the RTB object(s) under ``key`` with the rtb_id of their record"""
+    def rows(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rtb_id = record.get("rtb_id")
+        value = record.get(key)
+        if rtb_id is None or not value:
+            return []
+        return [{**item, "rtb_id": rtb_id} for item in (value if many else [value]) if isinstance(item, dict)]
+    return rows
+
+
+# Columns, rows of a record and the bytes a record needs to have any, by table
+EXPORT_TABLES: Dict[str, Tuple[List[Column], Callable[[Dict[str, Any]], List[Dict[str, Any]]], Optional[bytes]]] = {
+    "records": (RECORD_COLUMNS, lambda record: [record], None),
+    "requests": (REQUEST_COLUMNS, lambda record: [record], None),
+    "impressions": ([RTB_ID_COLUMN, *_columns("imp_", (), IMPRESSION_FIELDS)], _rtb_rows("rtb_imp", many=True),
+                    b'"rtb_imp":'),
+    "devices": ([RTB_ID_COLUMN, *_columns("", (), DEVICE_FIELDS)], _rtb_rows("rtb_device"), b'"rtb_device":'),
+    "users": ([RTB_ID_COLUMN, *_columns("user_", (), USER_FIELDS)], _rtb_rows("rtb_user"), b'"rtb_user":')
+}
+
+
+def format_value(value: Any) -> str:
+    """Text of a column value: empty for null, lists joined with ';', objects as JSON"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ';'.join(format_value(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(',', ':'))
+    return str(value)
+
+
+def column_types(table: str) -> str:
+    """``name:type`` of every column of a table, comma-separated"""
+    return ','.join(f"{name}:{column_type}" for name, column_type, _ in EXPORT_TABLES[table][0])
+
+
+def export_table(lines: Iterable[bytes], table: str, delimiter: str = ',',
+                 record_filter: Optional[RecordFilter] = None, counts: Optional[Dict[str, int]] = None) -> Iterator[bytes]:
+    """Yield a table of the given encoded records as delimited text in chunks, header first.
+
+    ``counts`` collects the number of records exported and of rows written.
+    """
+    columns, rows, needle = EXPORT_TABLES[table]
+    getters = [getter for _, _, getter in columns]
+    counts = counts if counts is not None else {}
+    counts.update(records=0, rows=0)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+    writer.writerow([name for name, _, _ in columns])
+    for line in lines:
+        if (needle is not None and needle not in line) or (record_filter and not record_filter.matches_line(line)):
+            continue
+        record = json.loads(line)
+        if record_filter and not record_filter.matches(record):
+            continue
+        counts["records"] += 1
+        for source in rows(record):
+            writer.writerow([format_value(get(source)) for get in getters])
+            counts["rows"] += 1
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
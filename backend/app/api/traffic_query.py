@@ -0,0 +1,199 @@
+"""
+Filtered reads of stored campaign traffic.
+
+A ``RecordFilter`` holds the predicates of a traffic query: sets of accepted
+values for ``success``, ``status_code``, ``selected_profile_id`` and
+``selected_country``, and inclusive ranges of ``response_time`` and
+``timestamp``. The segment store evaluates it in three steps, cheapest first:
+
+- sealed segments carry a zone map (the distinct values and the ranges of the
+  filtered fields, computed once when the segment is sealed), and a segment
+  whose zone map rules the filter out is skipped without being read;
+- the encoded line of a record is searched for the bytes of the accepted
+  values (``"selected_country":"US"``) before it is decoded, so records that
+  cannot match are never parsed;
+- the decoded records that are left are checked against every predicate.
+
+``fields`` projects the matching records to the fields asked for.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from .traffic_record import encode_value
+
+# Fields matched against a set of values
+VALUE_FIELDS = ("success", "status_code", "selected_profile_id", "selected_country")
+# Fields matched against an inclusive range
+RANGE_FIELDS = ("response_time", "timestamp")
+# Query parameters of a filtered traffic read
+QUERY_PARAMS = ("fields", "success", "status_code", "selected_profile_id", "selected_country",
+                "min_response_time", "max_response_time", "start_time", "end_time")
+# A zone map keeps up to this many distinct values of a field, and no value set beyond that
+ZONE_MAX_VALUES = 64
+
+
+class ZoneMap:
+    """Distinct values and ranges of the filtered fields over the records of a segment"""
+
+    def __init__(self):
+        self.values: Dict[str, Optional[set]] = {field: set() for field in VALUE_FIELDS}
+        # [low, high] by field, missing while no record has the field and None once its values do not compare
+        self.ranges: Dict[str, Optional[List[Any]]] = {}
+
+    def add(self, record: Dict[str, Any]):
+        for field, values in self.values.items():
+            if values is not None:
+                try:
+                    values.add(record.get(field))
+                except TypeError:
+                    # Unhashable values are not kept, nor any value of the field
+                    self.values[field] = None
+                    continue
+                if len(values) > ZONE_MAX_VALUES:
+                    self.values[field] = None
+        for field in RANGE_FIELDS:
+            value = record.get(field)
+            if value is None:
+                continue
+            bounds = self.ranges.get(field, [value, value])
+            try:
+                self.ranges[field] = bounds and [min(bounds[0], value), max(bounds[1], value)]
+            except TypeError:
+                self.ranges[field] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "values": {field: sorted(values, key=repr) for field, values in self.values.items() if values is not None},
+            "ranges": self.ranges
+        }
+
+
+class RecordFilter:
+    """Predicates a record has to meet, all of them"""
+
+    def __init__(self, values: Optional[Dict[str, set]] = None,
+                 ranges: Optional[Dict[str, Tuple[Any, Any]]] = None):
+        # Accepted values by field, and (low, high) bounds by field where None is unbounded
+        self.values = values or {}
+        self.ranges = ranges or {}
+        # For every value field, the encoded "key":value of each accepted value; a line has to hold one of each
+        self.needles = [[(f'"{field}":' + encode_value(value)).encode('ascii') for value in accepted]
+                        for field, accepted in self.values.items()]
+
+    def __bool__(self) -> bool:
+        return bool(self.values or self.ranges)
+
+    def matches_line(self, line: bytes) -> bool:
+        """Whether an encoded record may match; False only for records that cannot"""
+        return all(any(needle in line for needle in needles) for needles in self.needles)
+
+    def matches_zone(self, zone: Dict[str, Any]) -> bool:
+        """Whether a segment with this zone map may hold a matching record"""
+        for field, accepted in self.values.items():
+            present = zone["values"].get(field)
+            if present is not None and not any(value in accepted for value in present):
+                return False
+        for field, (low, high) in self.ranges.items():
+            if field not in zone["ranges"]:
+                # No record of the segment has the field
+                return False
+            bounds = zone["ranges"][field]
+            if bounds is None:
+                continue
+            try:
+                if (low is not None and bounds[1] < low) or (high is not None and bounds[0] > high):
+                    return False
+            except TypeError:
+                pass
+        return True
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        for field, accepted in self.values.items():
+            if record.get(field) not in accepted:
+                return False
+        for field, (low, high) in self.ranges.items():
+            value = record.get(field)
+            try:
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the given top-level fields of a record"""
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise ValueError(f"success must be true or false, not {value!r}")
+
+
+def _parse_time(value: str) -> str:
+    """Normalize an ISO 8601 time to the naive UTC form records are timestamped with"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{value!r} is not an ISO 8601 time")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _parse_number(name: str, value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+
+def parse_record_filter(args) -> RecordFilter:
+    """Build the filter of a traffic query from its query parameters, raising ValueError for invalid ones.
+
+    success (true/false), status_code (repeated or comma-separated), selected_profile_id and
+    selected_country (repeated for several values), min_response_time and max_response_time (ms),
+    start_time and end_time (ISO 8601, inclusive).
+    """
+    values = {}
+    if 'success' in args:
+        values['success'] = {_parse_bool(args['success'])}
+    codes = [code for value in args.getlist('status_code') for code in value.split(',') if code.strip()]
+    if codes:
+        try:
+            values['status_code'] = {int(code) for code in codes}
+        except ValueError:
+            raise ValueError("status_code must be integers")
+    for field in ('selected_profile_id', 'selected_country'):
+        accepted = args.getlist(field)
+        if accepted:
+            values[field] = set(accepted)
+
+    ranges = {}
+    response_times = (_parse_number('min_response_time', args.get('min_response_time')),
+                      _parse_number('max_response_time', args.get('max_response_time')))
+    if response_times != (None, None):
+        ranges['response_time'] = response_times
+    times = tuple(_parse_time(args[name]) if args.get(name) else None for name in ('start_time', 'end_time'))
+    if times != (None, None):
+        ranges['timestamp'] = times
+    return RecordFilter(values, ranges)
+
+
+def parse_fields(args) -> Optional[List[str]]:
+    """Return the fields a traffic query projects its records to, None for whole records"""
+    if 'fields' not in args:
+        return None
+    fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    return fields
+
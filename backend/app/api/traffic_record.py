@@ -0,0 +1,293 @@
+"""
+Slotted traffic records for the bulk generation path.
+
+Fast-forward, sharded and cluster runs used to build every record as a dict of
+two dozen keys, most of them the same campaign constants, and encode it with
+``json.dumps`` on the way to the segment store. A ``TrafficRecord`` keeps only
+the variable fields of a record in slots and refers to its campaign's
+``RecordTemplate`` for the rest. Its ``encode()`` writes the compact JSON line
+directly, splicing in fragments of the constant fields and pooled devices that
+the template encoded once, and produces the same bytes as encoding the
+equivalent dict.
+
+Records behave as mutable mappings with the legacy keys, so the response
+simulation, HTTP dispatch and counters work on them unchanged. ``to_dict()``
+converts a record to the legacy dict shape for API responses; pickled records
+arrive as dicts.
+"""
+
+import json
+import math
+from collections.abc import MutableMapping
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterator, Optional
+
+CAMPAIGN_KEYS = ("campaign_id", "target_url", "requests_per_minute", "duration_minutes", "geo_locations",
+                 "rtb_config", "config", "user_profile_ids", "profile_user_counts", "total_profile_users")
+RTB_KEYS = ("rtb_id", "rtb_imp", "rtb_site", "rtb_device", "rtb_user", "rtb_auction_type", "rtb_timeout",
+            "rtb_currency", "rtb_data")
+RESPONSE_KEYS = ("success", "response_time", "status_code", "response_size", "bid_id", "win_price", "currency")
+
+# Record keys stored in slots, by slot name
+SLOT_KEYS = {
+    "id": "id",
+    "timestamp": "timestamp",
+    "selected_profile_id": "profile_id",
+    "selected_interest": "interest",
+    "selected_country": "country",
+    "referrer": "referrer",
+    "seq": "seq",
+    **{key: key for key in RESPONSE_KEYS}
+}
+# Keys whose values come from the template or the device slots
+DERIVED_KEYS = frozenset(CAMPAIGN_KEYS + RTB_KEYS)
+
+# Response fields that are not set yet
+UNSET = object()
+# rtb_config fields that are not set, so the device field comes from the pools
+POOLED = object()
+
+_encode_json = json.JSONEncoder(separators=(',', ':'), default=str).encode
+
+
+def encode_value(value: Any) -> str:
+    """Encode a value as compact JSON, with fast paths for scalars"""
+    if value is None:
+        return 'null'
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value_type is bool:
+        return 'true' if value else 'false'
+    if value_type is int:
+        return int.__repr__(value)
+    if value_type is float and math.isfinite(value):
+        return float.__repr__(value)
+    return _encode_json(value)
+
+
+def encode_fields(fields: Dict[str, Any]) -> str:
+    """Encode ``"key":value`` pairs, each preceded by a comma, to splice into a JSON object"""
+    return ''.join(f",{encode_basestring_ascii(key)}:{encode_value(value)}" for key, value in fields.items())
+
+
+class TrafficRecord(MutableMapping):
+    """One generated request: variable fields in slots, campaign constants in its template"""
+
+    __slots__ = ('template', 'id', 'timestamp', 'profile_id', 'interest', 'country', 'referrer',
+                 'rtb_id', 'device', 'ip', 'user_id', 'success', 'response_time', 'status_code',
+                 'response_size', 'bid_id', 'win_price', 'currency', 'seq', 'extra')
+
+    def __init__(self, template, request_id: str, timestamp: str, profile_id: Optional[str],
+                 interest: Optional[str], country: Optional[str], referrer: Optional[str],
+                 rtb_id: Optional[str] = None, device: Optional[Dict[str, Any]] = None,
+                 ip: Optional[str] = None, user_id: Optional[str] = None):
+        self.template = template
+        self.id = request_id
+        self.timestamp = timestamp
+        self.profile_id = profile_id
+        self.interest = interest
+        self.country = country
+        self.referrer = referrer
+        self.rtb_id = rtb_id
+        self.device = device
+        self.ip = ip
+        self.user_id = user_id
+        self.success = self.response_time = self.status_code = self.response_size = UNSET
+        self.bid_id = self.win_price = self.currency = UNSET
+        self.seq = None
+        self.extra: Optional[Dict[str, Any]] = None
+
+    # --- derived fields ---
+
+    def rtb_device(self) -> Dict[str, Any]:
+        template, device = self.template, self.device
+        return {
+            "ua": device["ua"] if template.ua is POOLED else template.ua,
+            "ip": self.ip if template.ip is POOLED else template.ip,
+            "make": device["make"],
+            "model": device["model"],
+            "os": device["os"],
+            "osv": device["osv"]
+        }
+
+    def rtb_user(self) -> Dict[str, Any]:
+        return {"id": self.user_id or self.template.default_user_id}
+
+    def rtb_data(self) -> Dict[str, Any]:
+        template = self.template
+        return {
+            "id": self.rtb_id,
+            "imp": template.imp,
+            "site": template.site,
+            "device": self.rtb_device(),
+            "user": self.rtb_user(),
+            "at": template.auction_type,
+            "tmax": template.tmax,
+            "cur": template.currency
+        }
+
+    def _derived(self, key: str) -> Any:
+        template = self.template
+        if key in template.campaign_fields:
+            return template.campaign_fields[key]
+        if not template.rtb:
+            raise KeyError(key)
+        if key == "rtb_id":
+            return self.rtb_id
+        if key == "rtb_device":
+            return self.rtb_device()
+        if key == "rtb_user":
+            return self.rtb_user()
+        if key == "rtb_data":
+            return self.rtb_data()
+        return {"rtb_imp": template.imp, "rtb_site": template.site, "rtb_auction_type": template.auction_type,
+                "rtb_timeout": template.tmax, "rtb_currency": template.currency}[key]
+
+    # --- mapping interface ---
+
+    def __getitem__(self, key: str) -> Any:
+        extra = self.extra
+        if extra is not None and key in extra:
+            return extra[key]
+        slot = SLOT_KEYS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is UNSET or (slot == 'seq' and value is None):
+                raise KeyError(key)
+            return value
+        if key in DERIVED_KEYS:
+            return self._derived(key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __setitem__(self, key: str, value: Any):
+        slot = SLOT_KEYS.get(key)
+        if slot is not None and (self.extra is None or key not in self.extra):
+            setattr(self, slot, value)
+        else:
+            # New keys and overrides of template fields
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str):
+        if self.extra is not None and key in self.extra:
+            del self.extra[key]
+        elif key in RESPONSE_KEYS and getattr(self, key) is not UNSET:
+            setattr(self, key, UNSET)
+        elif key == 'seq' and self.seq is not None:
+            self.seq = None
+        else:
+            raise KeyError(key)
+
+    def update(self, other=(), **fields):
+        for key, value in (other.items() if hasattr(other, 'items') else other):
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __reduce__(self):
+        # Records cross process boundaries in the legacy dict shape, without their template
+        return (dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"TrafficRecord({self.to_dict()!r})"
+
+    # --- conversion ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the legacy dict shape, keys in the order the dict path writes them"""
+        template = self.template
+        record = {"id": self.id, "timestamp": self.timestamp}
+        record.update(template.campaign_fields)
+        record["selected_profile_id"] = self.profile_id
+        record["selected_interest"] = self.interest
+        record["selected_country"] = self.country
+        record["referrer"] = self.referrer
+        if template.rtb:
+            rtb_data = self.rtb_data()
+            record["rtb_id"] = self.rtb_id
+            record["rtb_imp"] = template.imp
+            record["rtb_site"] = template.site
+            record["rtb_device"] = rtb_data["device"]
+            record["rtb_user"] = rtb_data["user"]
+            record["rtb_auction_type"] = template.auction_type
+            record["rtb_timeout"] = template.tmax
+            record["rtb_currency"] = template.currency
+            record["rtb_data"] = rtb_data
+        for key in RESPONSE_KEYS:
+            value = getattr(self, key)
+            if value is not UNSET:
+                record[key] = value
+        if self.extra:
+            record.update(self.extra)
+        if self.seq is not None:
+            record["seq"] = self.seq
+        return record
+
+    def encode(self) -> bytes:
+        """Encode as one compact JSON line, the same bytes as encoding ``to_dict()``"""
+        template = self.template
+        extra = self.extra
+        if extra and not DERIVED_KEYS.isdisjoint(extra):
+            # Overridden template fields, rare enough to take the generic path
+            return (_encode_json(self.to_dict()) + '\n').encode('utf-8')
+
+        parts = ['{"id":', encode_value(self.id), ',"timestamp":', encode_value(self.timestamp),
+                 template.campaign_json,
+                 ',"selected_profile_id":', encode_value(self.profile_id),
+                 ',"selected_interest":', encode_value(self.interest),
+                 ',"selected_country":', encode_value(self.country),
+                 ',"referrer":', encode_value(self.referrer)]
+        if template.rtb:
+            device = template.encoded_device(self.device, self.ip)
+            user = '{"id":' + encode_value(self.user_id or template.default_user_id) + '}'
+            rtb_id = encode_value(self.rtb_id)
+            parts += [',"rtb_id":', rtb_id, template.imp_json, template.site_json,
+                      ',"rtb_device":', device, ',"rtb_user":', user, template.rtb_constants_json,
+                      ',"rtb_data":{"id":', rtb_id, template.rtb_data_sections_json,
+                      ',"device":', device, ',"user":', user, template.rtb_data_tail_json]
+        for key in RESPONSE_KEYS:
+            value = getattr(self, key)
+            if value is not UNSET:
+                parts += [',"', key, '":', encode_value(value)]
+        if extra:
+            parts.append(encode_fields(extra))
+        if self.seq is not None:
+            parts += [',"seq":', encode_value(self.seq)]
+        parts.append('}\n')
+        # Every part is ASCII, non-ASCII characters are escaped
+        return ''.join(parts).encode('ascii')
+
+
+def to_dict(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return a record in the legacy dict shape, converting slotted records"""
+    return record.to_dict() if isinstance(record, TrafficRecord) else record
@@ -0,0 +1,876 @@
+"""
+Append-only segment storage for generated campaign traffic.
+
+Records are written as compact newline-delimited JSON under
+``<campaign_dir>/segments/<stream>/``. Every stream has exactly one writer,
+records get a monotonically increasing ``seq`` and a segment is rolled once it
+grows past ``MAX_SEGMENT_SIZE``. Streams written side by side (one per worker
+process) get interleaved sequence numbers, so ``seq`` is unique per campaign
+and readers merge the streams in ``seq`` order. Appending never rewrites earlier data, so the
+cost of a write is proportional to the batch, not to the size of the campaign.
+
+``save_manifest()`` records the counters and the end of every stream in
+``segments/manifest.json``; a store opened later only reads what was appended
+after the manifest instead of rescanning every segment.
+
+``read_page()`` reads the records after a given ``seq``. Sequence numbers grow
+along every stream, so a stream is positioned by bisecting its segments on the
+seq of their first record and then the bytes of one segment; the position where
+a page ends is remembered for the page that follows it. A page costs its own
+size, whatever the size of the campaign.
+
+A rolled segment is sealed: it never changes again. A background thread
+compresses it once to a sync-flushed raw deflate stream (``.deflate`` next to
+it) and records its size, record counts and CRC-32 in the stream's
+``sealed.json``, so compressed downloads reuse it instead of compressing the
+same records on every request. The index also keeps the SHA-256 and seq range
+of every sealed segment, so sealed segments can be served as immutable files
+and verified by clients, and a zone map of the segment
+(see ``traffic_query``), and ``query()`` skips sealed segments that cannot
+hold a record matching its filter.
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import heapq
+import queue
+import threading
+from typing import Dict, Any, Callable, List, Iterator, Optional, Tuple
+from .logging_config import get_logger
+from .traffic_record import TrafficRecord, to_dict
+from .traffic_query import RecordFilter, ZoneMap, project
+from .compression import new_compressor
+
+logger = get_logger('TrafficStore')
+
+SEGMENTS_DIRNAME = 'segments'
+DEFAULT_STREAM = 'main'
+SEGMENT_SUFFIX = '.ndjson'
+MAX_SEGMENT_SIZE = 10 * 1024 * 1024  # 10MB per segment, same limit as the legacy traffic.json
+MANIFEST_FILENAME = 'manifest.json'
+TAIL_READ_SIZE = 64 * 1024
+SEEK_LINEAR_SIZE = 64 * 1024  # bytes read line by line once a bisect has narrowed down a segment
+MAX_PAGE_HINTS = 1024
+COMPRESSED_SUFFIX = '.deflate'
+SEALED_FILENAME = 'sealed.json'
+
+
+class StaleManifest(Exception):
+    """The segments on disk don't extend what the manifest describes"""
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """Encode a record as one compact JSON line"""
+    if isinstance(record, TrafficRecord):
+        return record.encode()
+    return json.dumps(record, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+
+
+def segment_name(index: int) -> str:
+    return f"{index:06d}{SEGMENT_SUFFIX}"
+
+
+def segment_index(segment_path: str) -> int:
+    return int(os.path.basename(segment_path)[:-len(SEGMENT_SUFFIX)])
+
+
+def list_segments(stream_dir: str) -> List[str]:
+    """Return the segment file paths of a stream in write order"""
+    if not os.path.isdir(stream_dir):
+        return []
+    names = sorted(name for name in os.listdir(stream_dir) if name.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(stream_dir, name) for name in names]
+
+
+def iter_segment_records(segment_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a single segment, skipping a torn trailing line"""
+    with open(segment_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                # Partially written line from an interrupted writer
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[Store] Skipping undecodable line in {segment_path}")
+
+
+def line_seq(line: bytes) -> int:
+    """Return the seq of an encoded record; writers put it last"""
+    position = line.rfind(b'"seq":')
+    if position >= 0:
+        try:
+            return int(line[position + 6:].rstrip(b'}\r\n '))
+        except ValueError:
+            pass
+    return int(json.loads(line).get('seq', 0))
+
+
+def seek_after(segment_path: str, after_seq: int) -> int:
+    """Return the byte offset of the first complete record of a segment with a seq above ``after_seq``"""
+    with open(segment_path, 'rb') as f:
+        # lo is always at the start of a line and every record before it has a seq up to after_seq
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while hi - lo > SEEK_LINEAR_SIZE:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()
+            start = f.tell()
+            line = f.readline()
+            if start >= hi or not line.endswith(b'\n'):
+                hi = mid
+            elif line_seq(line) <= after_seq:
+                lo = start + len(line)
+            else:
+                hi = start
+        f.seek(lo)
+        position = lo
+        for line in f:
+            if not line.endswith(b'\n') or line_seq(line) > after_seq:
+                break
+            position += len(line)
+        return position
+
+
+def compress_segment(segment_path: str) -> Dict[str, Any]:
+    """Compress the complete records of a segment to a raw deflate stream next to it and describe both.
+
+    The stream ends with a sync flush instead of a final block, so streams of consecutive
+    segments concatenate into one.
+    """
+    compressor = new_compressor('raw')
+    zone = ZoneMap()
+    sha256 = hashlib.sha256()
+    first_seq = last_seq = None
+    crc = size = records = successful = 0
+    compressed_path = segment_path + COMPRESSED_SUFFIX
+    temp_path = f"{compressed_path}.{threading.get_ident()}.tmp"
+    with open(segment_path, 'rb') as source, open(temp_path, 'wb') as target:
+        pending = b''
+        while True:
+            chunk = source.read(1024 * 1024)
+            if not chunk:
+                break
+            data = pending + chunk
+            end = data.rfind(b'\n') + 1
+            data, pending = data[:end], data[end:]
+            crc = zlib.crc32(data, crc)
+            sha256.update(data)
+            size += len(data)
+            records += data.count(b'\n')
+            successful += data.count(b'"success":true')
+            for line in data.splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                zone.add(record)
+                last_seq = record.get('seq', last_seq)
+                if first_seq is None:
+                    first_seq = last_seq
+            target.write(compressor.compress(data))
+        target.write(compressor.flush(zlib.Z_SYNC_FLUSH))
+    os.replace(temp_path, compressed_path)
+    return {"size": size, "records": records, "successful": successful, "crc32": crc,
+            "compressed_size": os.path.getsize(compressed_path), "sha256": sha256.hexdigest(),
+            "first_seq": first_seq, "last_seq": last_seq, "zone": zone.to_dict()}
+
+
+_sealed_lock = threading.Lock()
+
+
+def read_sealed(stream_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Return the descriptions of a stream's sealed segments, by segment file name"""
+    path = os.path.join(stream_dir, SEALED_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"[Store] Ignoring unreadable sealed segment index {path}: {str(e)}")
+        return {}
+
+
+def seal_segment(segment_path: str) -> Dict[str, Any]:
+    """Compress a sealed segment and add it to its stream's index"""
+    info = compress_segment(segment_path)
+    stream_dir = os.path.dirname(segment_path)
+    with _sealed_lock:
+        sealed = read_sealed(stream_dir)
+        sealed[os.path.basename(segment_path)] = info
+        path = os.path.join(stream_dir, SEALED_FILENAME)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(sealed, f)
+        os.replace(f"{path}.tmp", path)
+    logger.debug(f"[Store] Sealed {segment_path}: {info['size']} bytes compressed to {info['compressed_size']}")
+    return info
+
+
+# Segments waiting to be sealed, compressed one at a time off the writers' threads
+_seal_queue: 'queue.Queue[str]' = queue.Queue()
+_sealer: Optional[threading.Thread] = None
+
+
+def _seal_pending():
+    while True:
+        segment_path = _seal_queue.get()
+        try:
+            seal_segment(segment_path)
+        except Exception as e:
+            logger.error(f"[Store] Error sealing {segment_path}: {str(e)}")
+
+
+def seal_in_background(segment_path: str):
+    """Queue a rolled segment for compression"""
+    global _sealer
+    with _sealed_lock:
+        if _sealer is None or not _sealer.is_alive():
+            _sealer = threading.Thread(target=_seal_pending, daemon=True, name="segment_sealer")
+            _sealer.start()
+    _seal_queue.put(segment_path)
+
+
+class StreamReader:
+    """Reads the encoded records of one stream in seq order from a position on.
+
+    Segments for which ``skip_segment`` returns True are passed over, apart from the last one.
+    """
+
+    def __init__(self, stream_dir: str, segment: int, offset: int,
+                 skip_segment: Optional[Callable[[str], bool]] = None):
+        self.segments = [path for path in list_segments(stream_dir) if segment_index(path) >= segment]
+        self.segment = segment
+        self.offset = offset
+        self.skip_segment = skip_segment
+        # Start of the line last returned by next_line()
+        self.mark = (segment, offset)
+        self._file = None
+
+    def next_line(self) -> Optional[Tuple[int, bytes]]:
+        """Return the (seq, encoded record) of the next complete record, or None at the end of the stream"""
+        while self.segments:
+            path = self.segments[0]
+            if self._file is None:
+                if self.skip_segment is not None and len(self.segments) > 1 and self.skip_segment(path):
+                    self.segments.pop(0)
+                    self.offset = 0
+                    continue
+                self.segment = segment_index(path)
+                self._file = open(path, 'rb')
+                self._file.seek(self.offset)
+            line = self._file.readline()
+            if line.endswith(b'\n'):
+                self.mark = (self.segment, self.offset)
+                self.offset += len(line)
+                return line_seq(line), line
+            # End of the segment, or a record still being written to the last one
+            self._file.close()
+            self._file = None
+            if len(self.segments) == 1:
+                break
+            self.segments.pop(0)
+            self.offset = 0
+        return None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def tail_matches(stream_dir: str, tail: Tuple[int, int, int]) -> bool:
+    """Whether a stream on disk ends exactly at a known (segment index, size, last seq) tail"""
+    segments = list_segments(stream_dir)
+    return bool(segments) and segment_index(segments[-1]) == tail[0] and os.path.getsize(segments[-1]) == tail[1]
+
+
+def read_stream_tail(stream_dir: str) -> Optional[Tuple[int, int, int]]:
+    """Return (last segment index, size up to its last complete record, last seq) of a stream.
+
+    Reads only the end of the last segments, not the whole stream.
+    """
+    segments = list_segments(stream_dir)
+    if not segments:
+        return None
+    last_seq = 0
+    for path in reversed(segments):
+        size = os.path.getsize(path)
+        read_size = TAIL_READ_SIZE
+        while True:
+            start = max(0, size - read_size)
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read(size - start)
+            end = data.rfind(b'\n') + 1
+            line_start = data.rfind(b'\n', 0, max(0, end - 1)) + 1
+            if start == 0 or line_start > 0:
+                break
+            read_size *= 4  # the last record is longer than the chunk
+        if path == segments[-1]:
+            tail_index, tail_size = segment_index(path), start + end
+        if end:
+            try:
+                last_seq = int(json.loads(data[line_start:end]).get('seq', 0))
+                break
+            except json.JSONDecodeError:
+                logger.warning(f"[Store] Undecodable last record in {path}")
+                break
+    return tail_index, tail_size, last_seq
+
+
+class SegmentWriter:
+    """Single writer for one stream of a campaign.
+
+    Sequence numbers start at ``seq_start`` and grow by ``seq_stride``, so that
+    parallel writers can interleave theirs.
+    """
+
+    def __init__(self, stream_dir: str, max_segment_size: int = MAX_SEGMENT_SIZE,
+                 seq_start: int = 1, seq_stride: int = 1, tail: Optional[Tuple[int, int, int]] = None,
+                 on_seal=None):
+        self.stream_dir = stream_dir
+        self.max_segment_size = max_segment_size
+        # Called with the path of every segment the writer rolls
+        self.on_seal = on_seal
+        self.seq_start = seq_start
+        self.seq_stride = seq_stride
+        os.makedirs(stream_dir, exist_ok=True)
+        self.last_seq = 0
+        self.segment_index = 1
+        self._file = None
+        # (segment index, size, last seq) after the last write
+        self.tail = None
+        if tail is not None and tail_matches(stream_dir, tail):
+            # The store already knows where the stream ends, no need to read it back
+            self.segment_index, _, self.last_seq = tail
+            self.tail = tail
+        else:
+            self._recover()
+        if self._rolled(os.path.join(stream_dir, segment_name(self.segment_index))):
+            # Left sealed by an earlier writer that stopped before starting the next segment
+            self.segment_index += 1
+
+    def _recover(self):
+        """Resume after the last complete record of an existing stream"""
+        segments = list_segments(self.stream_dir)
+        if not segments:
+            return
+        self.segment_index = segment_index(segments[-1])
+        last_path = segments[-1]
+        with open(last_path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                logger.warning(f"[Store] Truncating torn record at the end of {last_path}")
+                f.truncate(end)
+        for path in reversed(segments):
+            last_record = None
+            for last_record in iter_segment_records(path):
+                pass
+            if last_record is not None:
+                self.last_seq = int(last_record.get('seq', 0))
+                break
+
+    def _rolled(self, segment_path: str) -> bool:
+        """Whether a segment was rolled: it is full or already sealed, so no record may be added to it"""
+        if not os.path.exists(segment_path):
+            return False
+        return (os.path.getsize(segment_path) >= self.max_segment_size
+                or os.path.basename(segment_path) in read_sealed(self.stream_dir))
+
+    def _open(self):
+        if self._file is None:
+            path = os.path.join(self.stream_dir, segment_name(self.segment_index))
+            self._file = open(path, 'ab')
+        return self._file
+
+    def append_batch(self, records: List[Dict[str, Any]]) -> int:
+        """Assign sequence numbers to the records and append them in one write"""
+        if not records:
+            return self.last_seq
+        chunks = []
+        for record in records:
+            if self.last_seq < self.seq_start:
+                self.last_seq = self.seq_start
+            else:
+                self.last_seq += self.seq_stride
+            record['seq'] = self.last_seq
+            chunks.append(encode_record(record))
+        f = self._open()
+        f.write(b''.join(chunks))
+        f.flush()
+        self.tail = (self.segment_index, f.tell(), self.last_seq)
+        if f.tell() >= self.max_segment_size:
+            self.roll()
+        return self.last_seq
+
+    def roll(self):
+        """Seal the active segment and start a new one"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        path = os.path.join(self.stream_dir, segment_name(self.segment_index))
+        if self.on_seal is not None and os.path.exists(path) and os.path.getsize(path):
+            self.on_seal(path)
+        self.segment_index += 1
+        # The new segment exists from now on, so writers opened later continue in it and not in the sealed one
+        open(os.path.join(self.stream_dir, segment_name(self.segment_index)), 'ab').close()
+        self.tail = (self.segment_index, 0, self.last_seq)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CampaignStore:
+    """Segment storage and in-memory counters for one campaign"""
+
+    def __init__(self, campaign_dir: str):
+        self.campaign_dir = campaign_dir
+        self.segments_dir = os.path.join(campaign_dir, SEGMENTS_DIRNAME)
+        self.lock = threading.RLock()
+        self.writers: Dict[str, SegmentWriter] = {}
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.last_record: Optional[Dict[str, Any]] = None
+        self.max_seq = 0
+        # Known end of each stream: (segment index, size, last seq)
+        self.stream_tails: Dict[str, Tuple[int, int, int]] = {}
+        # Seq of the first record of each segment, by path
+        self.first_seqs: Dict[str, int] = {}
+        # Where each stream continues after the page ending at a seq: {seq: {stream: (segment, offset)}}
+        self.page_hints: Dict[int, Dict[str, Tuple[int, int]]] = {}
+        # Streams other processes are writing side by side, with the seq they continue after
+        self.live_streams: Dict[str, int] = {}
+        self._scan()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.segments_dir, MANIFEST_FILENAME)
+
+    def _scan(self):
+        """Rebuild the counters from the segments already on disk, from the manifest on if there is one"""
+        manifest = self._load_manifest()
+        if manifest is not None:
+            try:
+                self._scan_from_manifest(manifest)
+                return
+            except StaleManifest as e:
+                logger.warning(f"[Store] Rescanning {self.segments_dir}: {str(e)}")
+                self._reset_counters()
+        last_record = None
+        for stream in self.stream_names():
+            last_record = self._scan_stream(stream, last_record=last_record)
+        self.last_record = last_record
+
+    def _reset_counters(self):
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.last_record = None
+        self.max_seq = 0
+        self.stream_tails = {}
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[Store] Ignoring unreadable manifest of {self.segments_dir}: {str(e)}")
+            return None
+
+    def _scan_from_manifest(self, manifest: Dict[str, Any]):
+        """Take the counters from the manifest and count only the records appended after it"""
+        streams = manifest.get('streams', {})
+        on_disk = self.stream_names()
+        missing = set(streams) - set(on_disk)
+        if missing:
+            raise StaleManifest(f"streams {', '.join(sorted(missing))} are gone")
+        for stream, tail in streams.items():
+            segments = list_segments(os.path.join(self.segments_dir, stream))
+            sizes = {segment_index(path): os.path.getsize(path) for path in segments}
+            if sizes.get(tail['segment'], -1) < tail['size']:
+                raise StaleManifest(f"stream {stream} is shorter than its manifest")
+
+        self.total_requests = manifest['total_requests']
+        self.successful_requests = manifest['successful_requests']
+        self.max_seq = manifest['max_seq']
+        self.last_record = manifest.get('last_record')
+        last_record = self.last_record
+        for stream in on_disk:
+            tail = streams.get(stream)
+            if tail is None:
+                last_record = self._scan_stream(stream, last_record=last_record)
+            else:
+                self.stream_tails[stream] = (tail['segment'], tail['size'], tail['last_seq'])
+                last_record = self._scan_stream(stream, tail['segment'], tail['size'], tail['last_seq'], last_record)
+        self.last_record = last_record
+
+    def _scan_stream(self, stream: str, from_segment: int = 0, from_offset: int = 0, last_seq: int = 0,
+                     last_record: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Count the records of a stream from a position on, remembering where the stream ends"""
+        for path in list_segments(os.path.join(self.segments_dir, stream)):
+            index = segment_index(path)
+            if index < from_segment:
+                continue
+            position = from_offset if index == from_segment else 0
+            with open(path, 'rb') as f:
+                f.seek(position)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Partially written line from an interrupted writer
+                        break
+                    position += len(line)
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"[Store] Skipping undecodable line in {path}")
+                        continue
+                    self._count(record)
+                    last_seq = int(record.get('seq', last_seq))
+                    if last_record is None or record.get('seq', 0) >= last_record.get('seq', 0):
+                        last_record = record
+            self.stream_tails[stream] = (index, position, last_seq)
+        return last_record
+
+    def save_manifest(self):
+        """Record the counters and the end of every stream, so the store reopens without a rescan.
+
+        Streams other processes append to are read back from their end, so the manifest is
+        only exact once those writers are done.
+        """
+        with self.lock:
+            streams = {}
+            for stream in self.stream_names():
+                stream_dir = os.path.join(self.segments_dir, stream)
+                tail = self.stream_tails.get(stream)
+                if tail is None or not tail_matches(stream_dir, tail):
+                    tail = read_stream_tail(stream_dir)
+                    if tail is None:
+                        continue
+                    self.stream_tails[stream] = tail
+                streams[stream] = {"segment": tail[0], "size": tail[1], "last_seq": tail[2]}
+            manifest = {
+                "total_requests": self.total_requests,
+                "successful_requests": self.successful_requests,
+                "max_seq": self.max_seq,
+                "last_record": to_dict(self.last_record),
+                "streams": streams
+            }
+            temp_path = f"{self.manifest_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(manifest, f, default=str)
+            os.replace(temp_path, self.manifest_path)
+
+    def _count(self, record: Dict[str, Any]):
+        self.total_requests += 1
+        if record.get('success', False):
+            self.successful_requests += 1
+        self.last_record = record
+        self.max_seq = max(self.max_seq, int(record.get('seq', 0)))
+
+    def count_appended(self, total: int, successful: int, last_record: Optional[Dict[str, Any]]):
+        """Update the counters for records another process appended to one of the streams"""
+        with self.lock:
+            self.total_requests += total
+            self.successful_requests += successful
+            if last_record is not None:
+                self.last_record = last_record
+                self.max_seq = max(self.max_seq, int(last_record.get('seq', 0)))
+
+    def begin_live_streams(self, streams: List[str], seq_base: int):
+        """Mark streams that writers in other processes are about to append to after ``seq_base``"""
+        with self.lock:
+            for stream in streams:
+                self.live_streams[stream] = seq_base
+
+    def end_live_streams(self, streams: List[str]):
+        with self.lock:
+            for stream in streams:
+                self.live_streams.pop(stream, None)
+
+    def committed_seq(self) -> int:
+        """Return the seq up to which every record is stored.
+
+        Streams written side by side interleave their seqs, and a lagging one may still write
+        seqs below the last record of another. A live stream only writes seqs above its own last
+        one, so every record up to the lowest last seq of the live streams is stored; readers
+        return no record above it, so their cursors never pass a record still to come.
+        """
+        with self.lock:
+            live_streams = dict(self.live_streams)
+            max_seq = self.max_seq
+        if not live_streams:
+            # A single writer appends in seq order
+            return max_seq
+        last_seqs = []
+        for stream, seq_base in live_streams.items():
+            tail = read_stream_tail(os.path.join(self.segments_dir, stream))
+            last_seqs.append(max(seq_base, tail[2] if tail else 0))
+        return min(last_seqs)
+
+    def stream_names(self) -> List[str]:
+        if not os.path.isdir(self.segments_dir):
+            return []
+        return sorted(name for name in os.listdir(self.segments_dir)
+                      if os.path.isdir(os.path.join(self.segments_dir, name)))
+
+    def writer(self, stream: str = DEFAULT_STREAM, seq_start: Optional[int] = None,
+               seq_stride: int = 1) -> SegmentWriter:
+        """Get the writer of a stream; new writers continue after the highest seq of the campaign"""
+        with self.lock:
+            if stream not in self.writers:
+                self.writers[stream] = SegmentWriter(os.path.join(self.segments_dir, stream),
+                                                     seq_start=seq_start or self.max_seq + 1,
+                                                     seq_stride=seq_stride, tail=self.stream_tails.get(stream),
+                                                     on_seal=seal_in_background)
+            return self.writers[stream]
+
+    def append_batch(self, records: List[Dict[str, Any]], stream: str = DEFAULT_STREAM) -> int:
+        """Append a batch of records and update the counters"""
+        with self.lock:
+            writer = self.writer(stream)
+            last_seq = writer.append_batch(records)
+            if writer.tail is not None:
+                self.stream_tails[stream] = writer.tail
+            for record in records:
+                self._count(record)
+            return last_seq
+
+    def append(self, record: Dict[str, Any], stream: str = DEFAULT_STREAM) -> int:
+        return self.append_batch([record], stream)
+
+    def has_records(self) -> bool:
+        return self.total_requests > 0
+
+    def counters(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "total_requests": self.total_requests,
+                "successful_requests": self.successful_requests,
+                "last_request": to_dict(self.last_record)
+            }
+
+    def iter_stream(self, stream: str) -> Iterator[Dict[str, Any]]:
+        """Yield the records of one stream in sequence order"""
+        for path in list_segments(os.path.join(self.segments_dir, stream)):
+            yield from iter_segment_records(path)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored record in sequence order, merging the streams"""
+        streams = self.stream_names()
+        if len(streams) == 1:
+            yield from self.iter_stream(streams[0])
+        elif streams:
+            yield from heapq.merge(*(self.iter_stream(stream) for stream in streams),
+                                   key=lambda record: record.get('seq', 0))
+
+    def first_seq(self, segment_path: str) -> Optional[int]:
+        """Return the seq of the first record of a segment, None while it has none"""
+        first = self.first_seqs.get(segment_path)
+        if first is None:
+            with open(segment_path, 'rb') as f:
+                line = f.readline()
+            if not line.endswith(b'\n'):
+                return None
+            first = self.first_seqs[segment_path] = line_seq(line)
+        return first
+
+    def locate(self, stream: str, after_seq: int) -> Tuple[int, int]:
+        """Return the (segment index, byte offset) of the first record of a stream with a seq above ``after_seq``"""
+        segments = list_segments(os.path.join(self.segments_dir, stream))
+        lo, hi = 0, len(segments)
+        # Last segment starting at or below after_seq; segments without records yet sort last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            first = self.first_seq(segments[mid])
+            if first is not None and first <= after_seq:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return (segment_index(segments[0]), 0) if segments else (1, 0)
+        return segment_index(segments[lo - 1]), seek_after(segments[lo - 1], after_seq)
+
+    def read_page(self, after_seq: int = 0, limit: int = 100) -> Tuple[List[Dict[str, Any]], bool]:
+        """Return up to ``limit`` records with a seq above ``after_seq`` in seq order, and whether more follow.
+
+        Records above ``committed_seq()`` are left for a later page.
+        """
+        until_seq = self.committed_seq()
+        hints = self.page_hints.get(after_seq, {})
+        readers = {}
+        heap = []
+        for stream in self.stream_names():
+            segment, offset = hints.get(stream) or self.locate(stream, after_seq)
+            reader = readers[stream] = StreamReader(os.path.join(self.segments_dir, stream), segment, offset)
+            entry = reader.next_line()
+            if entry is not None:
+                heap.append((entry[0], stream, entry[1]))
+        heapq.heapify(heap)
+
+        records = []
+        try:
+            while heap and heap[0][0] <= until_seq and len(records) < limit:
+                seq, stream, line = heapq.heappop(heap)
+                records.append(json.loads(line))
+                entry = readers[stream].next_line()
+                if entry is not None:
+                    heapq.heappush(heap, (entry[0], stream, entry[1]))
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+        if records:
+            # Streams with a record left over continue at that record, the others where they ended
+            pending = {stream for _, stream, _ in heap}
+            hint = {stream: reader.mark if stream in pending else (reader.segment, reader.offset)
+                    for stream, reader in readers.items()}
+            with self.lock:
+                if len(self.page_hints) >= MAX_PAGE_HINTS:
+                    self.page_hints.pop(next(iter(self.page_hints)))
+                self.page_hints[records[-1]['seq']] = hint
+        return records, bool(heap) and heap[0][0] <= until_seq
+
+    def query(self, after_seq: int = 0, limit: int = 100, record_filter: Optional[RecordFilter] = None,
+              fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Return up to ``limit`` records with a seq above ``after_seq`` matching ``record_filter`` in seq order.
+
+        Also returns whether the scan stopped at the limit with records left to scan, and the seq it
+        got to, which the next query continues after. Sealed segments whose zone map rules the filter
+        out are skipped and lines that cannot match are not decoded. Like ``read_page``, the scan
+        stops at ``committed_seq()``.
+        """
+        until_seq = self.committed_seq()
+        readers = {}
+        heap = []
+        for stream in self.stream_names():
+            stream_dir = os.path.join(self.segments_dir, stream)
+            skip_segment = None
+            if record_filter:
+                sealed = read_sealed(stream_dir)
+
+                def skip_segment(path, sealed=sealed):
+                    zone = sealed.get(os.path.basename(path), {}).get('zone')
+                    return zone is not None and not record_filter.matches_zone(zone)
+
+            reader = readers[stream] = StreamReader(stream_dir, *self.locate(stream, after_seq), skip_segment)
+            entry = reader.next_line()
+            if entry is not None:
+                heap.append((entry[0], stream, entry[1]))
+        heapq.heapify(heap)
+
+        records = []
+        scanned = after_seq
+        try:
+            while heap and heap[0][0] <= until_seq and len(records) < limit:
+                scanned, stream, line = heap[0]
+                if not record_filter or record_filter.matches_line(line):
+                    record = json.loads(line)
+                    if not record_filter or record_filter.matches(record):
+                        records.append(project(record, fields))
+                entry = readers[stream].next_line()
+                if entry is None:
+                    heapq.heappop(heap)
+                else:
+                    heapq.heapreplace(heap, (entry[0], stream, entry[1]))
+        finally:
+            for reader in readers.values():
+                reader.close()
+        return records, bool(heap) and heap[0][0] <= until_seq, scanned
+
+    def sealed_segments(self, stream: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return the leading sealed segments of a stream with their descriptions, sealing any not sealed yet.
+
+        Every segment but the last one of a stream is sealed; the last one is once its writer rolled it.
+        Segments sealed before their index kept checksums and zone maps are sealed again.
+        """
+        stream_dir = os.path.join(self.segments_dir, stream)
+        segments = list_segments(stream_dir)
+        index = read_sealed(stream_dir)
+        sealed = []
+        for position, path in enumerate(segments):
+            info = index.get(os.path.basename(path))
+            if (info is None or info['size'] != os.path.getsize(path) or 'sha256' not in info
+                    or not os.path.exists(path + COMPRESSED_SUFFIX)):
+                if position == len(segments) - 1:
+                    break
+                # Rolled before sealing existed, its sealing was interrupted, or records were
+                # appended to it after it was sealed
+                info = seal_segment(path)
+            sealed.append((path, info))
+        return sealed
+
+    def iter_lines(self, after_seq: int = 0) -> Iterator[bytes]:
+        """Yield the encoded records with a seq above ``after_seq`` in seq order, without decoding them.
+
+        Like ``read_page``, stops at ``committed_seq()``.
+        """
+        until_seq = self.committed_seq()
+        readers = {stream: StreamReader(os.path.join(self.segments_dir, stream), *self.locate(stream, after_seq))
+                   for stream in self.stream_names()}
+        heap = []
+        for stream, reader in readers.items():
+            entry = reader.next_line()
+            if entry is not None:
+                heap.append((entry[0], stream, entry[1]))
+        heapq.heapify(heap)
+        try:
+            while heap and heap[0][0] <= until_seq:
+                seq, stream, line = heap[0]
+                yield line
+                entry = readers[stream].next_line()
+                if entry is None:
+                    heapq.heappop(heap)
+                else:
+                    heapq.heapreplace(heap, (entry[0], stream, entry[1]))
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+    def close(self):
+        with self.lock:
+            for writer in self.writers.values():
+                writer.close()
+            self.writers = {}
+
+
+# Open stores, keyed by campaign directory
+_stores: Dict[str, CampaignStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(campaign_dir: str) -> CampaignStore:
+    """Return the store of a campaign directory, opening it on first use"""
+    key = os.path.abspath(campaign_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = CampaignStore(key)
+            _stores[key] = store
+        return store
+
+
+def cached_store(campaign_dir: str) -> Optional[CampaignStore]:
+    """Return the store of a campaign directory if it is open, without touching the disk"""
+    return _stores.get(os.path.abspath(campaign_dir))
+
+
+def has_store(campaign_dir: str) -> bool:
+    """Check whether a campaign directory has segment storage without opening it"""
+    key = os.path.abspath(campaign_dir)
+    return key in _stores or os.path.isdir(os.path.join(key, SEGMENTS_DIRNAME))
+
+
+def close_store(campaign_dir: str):
+    """Close the writers of a campaign store and forget it"""
+    key = os.path.abspath(campaign_dir)
+    with _stores_lock:
+        store = _stores.pop(key, None)
+    if store is not None:
+        store.close()
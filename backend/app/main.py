@@ -4,7 +4,8 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
-from app.api import traffic, sessions, profiles
+from app.api import traffic, sessions, profiles, cluster
+from app.api.compression import compress_response
 
 # Load environment variables
 load_dotenv()
@@ -50,6 +51,7 @@ CORS(app, resources={
 app.register_blueprint(traffic.bp, url_prefix='/api/traffic')
 app.register_blueprint(sessions.bp, url_prefix='/api/sessions')
 app.register_blueprint(profiles.bp, url_prefix='/api/profiles')
+app.register_blueprint(cluster.bp, url_prefix='/api/cluster')
 
 # Add a catch-all route for undefined API endpoints
 @app.route('/api/<path:path>')
@@ -60,6 +62,9 @@ def catch_all(path):
         "message": f"API endpoint /api/{path} does not exist"
     }), 404
 
+# Registered before the logging hook, so it runs after it and responses are logged uncompressed
+app.after_request(compress_response)
+
 @app.before_request
 def log_request_info():
     logger.info('Headers: %s', request.headers)
@@ -67,8 +72,8 @@ def log_request_info():
 
 @app.after_request
 def log_response_info(response):
-    # Only log response data if not in direct passthrough mode (e.g., send_file)
-    if not getattr(response, 'direct_passthrough', False):
+    # Only log buffered response data; reading a streamed response would consume it
+    if not getattr(response, 'direct_passthrough', False) and not response.is_streamed:
         logger.info('Response: %s', response.get_data())
     else:
         logger.info('Response: <direct passthrough file or stream>')